@@ -1,25 +1,40 @@
 import logging
 import asyncio
+import functools
+from collections import Counter
 from datetime import datetime
 import pandas as pd
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, ConversationHandler, MessageHandler, filters
-from telegram.error import TimedOut, NetworkError, RetryAfter
-from scraper import TelegramAnalytics
-import traceback
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler, ContextTypes, ConversationHandler, MessageHandler, filters
+from telegram.error import BadRequest, TimedOut, NetworkError, RetryAfter
+from scraper import ENDPOINTS, TelegramAnalytics, NICHE_CATEGORIES, match_categories, match_niches
+from charts import ChartRenderer
+from digests import FREQUENCIES, DigestScheduler, SubscriptionStore
+from exports import FORMATS, ExportCache, niche_rows
+from locales import TEMPLATES
+from logs import bind, hash_chat, log_context, setup_logging
+from metrics import HandlerMetrics, memory_usage
+from posting_time import format_window
+from profiler import SamplingProfiler
+from screens import ScreenCache
+from storage import SnapshotStore
+from templates import TemplateEngine
+from transport import BotRequest
+from utils import paginate, parse_number
 import os
 import sys
+import time
 import fcntl
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Configure logging: records are queued and written by a listener thread, as JSON lines by default
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Only one in this many per-update access records is logged; failures are always logged
+ACCESS_LOG_SAMPLE = int(os.getenv("ACCESS_LOG_SAMPLE", "20"))
 logger = logging.getLogger(__name__)
 
 # Bot tokens
@@ -37,6 +52,86 @@ if not TELEMETR_TOKEN:
 
 # Initialize analytics
 analytics = None
+analytics_lock = asyncio.Lock()
+refresh_task = None
+digest_task = None
+digest_scheduler = None
+
+# Background dataset refresh interval in seconds
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "900"))
+
+# Send a duplicate request to the data source when the first one is slower than its p95
+HEDGE_REQUESTS = os.getenv("ANALYTICS_HEDGE_REQUESTS", "0") == "1"
+
+# Datasets and rendered screens survive restarts in this file
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "/tmp/telegram_analytics_snapshot.bin")
+snapshot_store = SnapshotStore(SNAPSHOT_PATH)
+screen_cache = ScreenCache()
+
+# Screen texts per locale, compiled once at startup
+templates = TemplateEngine(TEMPLATES)
+
+# With several bot processes one "refresher" fetches and publishes datasets to SNAPSHOT_PATH,
+# "reader" processes only follow the published versions
+ANALYTICS_ROLE = os.getenv("ANALYTICS_ROLE", "refresher")
+SHARED_POLL_INTERVAL = float(os.getenv("SHARED_POLL_INTERVAL", "2"))
+
+# Inline mode: answers are memoized per data version and cached by Telegram for INLINE_CACHE_TIME
+# seconds; building one must finish well within the ~10s Telegram allows for an inline answer
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))
+INLINE_DEADLINE = 3
+INLINE_RESULTS = 10
+INLINE_MEMO_SIZE = 5000
+INLINE_MODES = {'top': 'top', 'топ': 'top', 'niche': 'niche', 'ниша': 'niche', 'ниши': 'niche'}
+inline_memo = {}        # (screen version, locale, query) -> results
+
+# Daily and hourly digests of the 24h summary, delivered to subscribers by the refresher process
+DIGEST_DB_PATH = os.getenv("DIGEST_DB_PATH", "/tmp/telegram_analytics_digests.db")
+DIGEST_HOUR = int(os.getenv("DIGEST_HOUR", "9"))
+DIGEST_RATE = float(os.getenv("DIGEST_RATE", "25"))
+subscriptions = None    # SubscriptionStore, opened in post_init and closed in post_shutdown
+
+# Charts are drawn in worker processes, once per locale and data version
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+charts = ChartRenderer(max_workers=CHART_WORKERS)
+
+# Dataset exports, built once per data version
+exports = ExportCache()
+
+# Telegram user ids allowed to use /stats, /cache and /refresh
+ADMIN_IDS = {int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()}
+handler_metrics = HandlerMetrics()
+started_at = time.time()
+
+# Updates handled at once; a press of a button that is still being handled for the same message is only answered
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
+pressed_callbacks = set()       # (user, message, callback data) of handlers still running
+repeated_presses = Counter()    # callback type -> presses answered without running the handler
+
+# The "loading" placeholder is shown only when a screen's data takes longer than this, in seconds
+PLACEHOLDER_DELAY = float(os.getenv("PLACEHOLDER_DELAY", "0.3"))
+
+# Sampling profiler of the event loop: /profile [seconds], or PROFILE_ON_START seconds after startup
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp")
+PROFILE_ON_START = int(os.getenv("PROFILE_ON_START", "0"))
+MAX_PROFILE_SECONDS = 300
+profiler = SamplingProfiler(output_dir=PROFILE_DIR)
+
+# Bot API transport: handlers send through a pool of BOT_API_POOL_SIZE connections and wait at most
+# BOT_API_POOL_TIMEOUT seconds for a free one; getUpdates long polling has its own connection.
+# Long texts and keyboards sent to many chats are encoded once
+BOT_API_POOL_SIZE = int(os.getenv("BOT_API_POOL_SIZE", "256"))
+BOT_API_POOL_TIMEOUT = float(os.getenv("BOT_API_POOL_TIMEOUT", "5"))
+BOT_API_HTTP2 = os.getenv("BOT_API_HTTP2", "0") == "1"
+bot_request = BotRequest(
+    connection_pool_size=BOT_API_POOL_SIZE,
+    pool_timeout=BOT_API_POOL_TIMEOUT,
+    read_timeout=30,
+    write_timeout=30,
+    connect_timeout=30,
+    http2=BOT_API_HTTP2,
+)
+updates_request = BotRequest(connection_pool_size=1, http2=BOT_API_HTTP2)
 
 # Conversation states
 WAITING_FOR_TOKEN = 1
@@ -72,240 +167,374 @@ def release_lock(lock_file):
             logger.error(f"Error releasing lock: {e}")
 
 async def get_analytics():
-    """Get or create analytics instance"""
+    """Get or create the single analytics instance"""
     global analytics
     if analytics is None:
-        analytics = TelegramAnalytics(api_token=TELEMETR_TOKEN)
+        async with analytics_lock:
+            if analytics is None:
+                analytics = TelegramAnalytics(api_token=TELEMETR_TOKEN, hedge_requests=HEDGE_REQUESTS)
     return analytics
 
+async def refresh_loop(delay=REFRESH_INTERVAL):
+    """Periodically refresh analytics datasets in the background"""
+    while True:
+        await asyncio.sleep(delay)
+        delay = REFRESH_INTERVAL
+        try:
+            analytics_instance = await get_analytics()
+            await analytics_instance.refresh()
+            await persist_snapshot(analytics_instance)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Error refreshing analytics")
+
+async def post_init(application: Application):
+    """Create and warm the analytics client before polling starts"""
+    global refresh_task, digest_task, digest_scheduler, subscriptions
+    subscriptions = await asyncio.to_thread(SubscriptionStore, DIGEST_DB_PATH)
+    if PROFILE_ON_START:
+        profiler.start(PROFILE_ON_START)
+        asyncio.create_task(report_profile())
+    analytics_instance = await get_analytics()
+    # A persisted snapshot is served right away and refreshed in the background
+    restored = await restore_snapshot(analytics_instance)
+    try:
+        # Readers only fetch upstream themselves if no refresher has published data yet
+        await analytics_instance.start(refresh=not restored)
+        if not restored and ANALYTICS_ROLE != 'reader':
+            await persist_snapshot(analytics_instance)
+    except Exception as e:
+        # Handlers will retry building the datasets on first use
+        logger.exception("Error warming up analytics")
+    if ANALYTICS_ROLE == 'reader':
+        refresh_task = asyncio.create_task(follow_snapshots())
+    else:
+        refresh_task = asyncio.create_task(refresh_loop(delay=0 if restored else REFRESH_INTERVAL))
+        digest_scheduler = DigestScheduler(subscriptions, application.bot, render_digest, daily_hour=DIGEST_HOUR, rate=DIGEST_RATE)
+        digest_task = asyncio.create_task(digest_scheduler.run())
+
+async def post_shutdown(application: Application):
+    """Stop background work and drain the analytics client after polling stops"""
+    for task in (refresh_task, digest_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await cleanup()
+
+def callback_type(data):
+    """Callback data without the per-item part, e.g. 'niche_3' -> 'niche_*'"""
+    if data in SCREENS or data in ('back_to_menu', 'charts', 'niche_analysis', 'competitor_analysis'):
+        return data
+    for prefix in ('niche_', 'competitors_', 'chart_'):
+        if data.startswith(prefix):
+            return f'{prefix}*'
+    return 'other'
+
+def update_type(update: Update):
+    """Name of the kind of update a handler serves, used to group its metrics"""
+    if update.callback_query is not None:
+        return f'callback:{callback_type(update.callback_query.data or "")}'
+    if update.inline_query is not None:
+        return 'inline'
+    if update.message is not None and update.message.text:
+        return update.message.text.split()[0].split('@')[0]
+    return 'other'
+
+def timed(callback):
+    """Record the latency of a handler under the type of update it served, and log it with the chat"""
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        handler_type = update_type(update)
+        token = bind(handler=handler_type, chat=hash_chat(update.effective_chat.id if update.effective_chat else None))
+        started = time.perf_counter()
+        failed = False
+        try:
+            with profiler.tagged(handler_type):
+                return await callback(update, context)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            handler_metrics.record(handler_type, latency, failed)
+            if failed:
+                logger.error("Update failed", extra={'latency_ms': round(latency * 1000, 1)})
+            else:
+                logger.info("Update handled", extra={'latency_ms': round(latency * 1000, 1), 'sample_every': ACCESS_LOG_SAMPLE})
+            log_context.reset(token)
+    return wrapper
+
+def coalesced(callback):
+    """Answer repeated presses of a button whose handler is still running without running it again.
+
+    Once the handler has finished the same button may be pressed on purpose (back to a screen
+    just left), so only presses that overlap the running handler are coalesced."""
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = update.callback_query
+        message_id = query.message.message_id if query.message else query.inline_message_id
+        key = (query.from_user.id, message_id, query.data)
+        if key in pressed_callbacks:
+            # The running handler edits this message; only stop the button spinner
+            repeated_presses[callback_type(query.data or '')] += 1
+            await query.answer()
+            return
+
+        pressed_callbacks.add(key)
+        try:
+            return await callback(update, context)
+        finally:
+            pressed_callbacks.discard(key)
+    return wrapper
+
+def admin_only(callback):
+    """Ignore the command unless it comes from one of ADMIN_IDS"""
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        user = update.effective_user
+        if user is None or user.id not in ADMIN_IDS:
+            logger.warning(f"Ignoring admin command from user {user.id if user else None}")
+            return
+        return await callback(update, context)
+    return wrapper
+
+def user_locale(update: Update):
+    """Templates in the language of the user who sent the update"""
+    user = update.effective_user
+    return templates.locale(user.language_code if user else None)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start the bot and show main menu"""
+    tr = user_locale(update)
     try:
         # Show main menu
-        reply_markup = get_main_menu_keyboard()
-        await update.message.reply_text(
-            "👋 Добро пожаловать в Telegram Analytics Bot!\n\n"
-            "В связи с ограничениями API, мы показываем демо-данные.\n\n"
-            "Выберите опцию:",
-            reply_markup=reply_markup
-        )
+        reply_markup = get_main_menu_keyboard(tr)
+        await update.message.reply_text(tr('menu.welcome'), reply_markup=reply_markup)
         return ConversationHandler.END
-        
+
     except Exception as e:
-        logger.error(f"Error in start command: {traceback.format_exc()}")
-        await update.message.reply_text(
-            "❌ Извините, произошла ошибка при запуске бота.\n"
-            "Пожалуйста, попробуйте позже или свяжитесь с поддержкой, если проблема сохраняется."
-        )
+        logger.exception("Error in start command")
+        await update.message.reply_text(tr('menu.start_error'))
         return ConversationHandler.END
 
-def get_main_menu_keyboard():
+def get_main_menu_keyboard(tr):
     """Get main menu keyboard markup"""
+    layout = [
+        ['top_50', 'best_posts'],
+        ['niche_analysis', 'new_channels'],
+        ['channel_advice', 'trends'],
+        ['posting_time', 'content_ideas'],
+        ['competitor_analysis', 'content_strategy'],
+        ['overall_24h', 'top_news'],
+        ['charts']
+    ]
     keyboard = [
-        [
-            InlineKeyboardButton("📊 Топ-20 каналов", callback_data='top_50'),
-            InlineKeyboardButton("🔥 15 лучших постов", callback_data='best_posts')
-        ],
-        [
-            InlineKeyboardButton("📈 Анализ ниш", callback_data='niche_analysis'),
-            InlineKeyboardButton("📱 Новые каналы", callback_data='new_channels')
-        ],
-        [
-            InlineKeyboardButton("🚀 Советы по созданию", callback_data='channel_advice'),
-            InlineKeyboardButton("🔍 Текущие тренды", callback_data='trends')
-        ],
-        [
-            InlineKeyboardButton("⏰ Оптимальное время постинга", callback_data='posting_time'),
-            InlineKeyboardButton("📝 Идеи для контента", callback_data='content_ideas')
-        ],
-        [
-            InlineKeyboardButton("🔎 Анализ конкурентов", callback_data='competitor_analysis'),
-            InlineKeyboardButton("📋 Контент-стратегия", callback_data='content_strategy')
-        ],
-        [
-            InlineKeyboardButton("📊 Сводка за 24ч", callback_data='overall_24h'),
-            InlineKeyboardButton("📰 Топовые новости", callback_data='top_news')
-        ]
+        [InlineKeyboardButton(tr(f'menu.{data}'), callback_data=data) for data in row]
+        for row in layout
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def get_back_button():
+def get_back_button(tr):
     """Get back button keyboard markup"""
-    keyboard = [[InlineKeyboardButton("◀️ Назад в меню", callback_data='back_to_menu')]]
+    keyboard = [[InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')]]
     return InlineKeyboardMarkup(keyboard)
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    
+
     if query.data == 'back_to_menu':
-        reply_markup = get_main_menu_keyboard()
-        await query.message.edit_text(
-            "👋 Добро пожаловать в Telegram Analytics Bot!\n\n"
-            "В связи с ограничениями API, мы показываем демо-данные.\n\n"
-            "Выберите опцию:",
-            reply_markup=reply_markup
-        )
+        tr = user_locale(update)
+        await query.message.edit_text(tr('menu.welcome'), reply_markup=get_main_menu_keyboard(tr))
         return
-    
-    if query.data == 'top_50':
-        await get_top_channels(update, context)
-    elif query.data == 'best_posts':
-        await get_best_posts(update, context)
+
+    if query.data in SCREENS:
+        await show_screen(update, context, query.data)
+    elif query.data == 'charts':
+        await show_charts_menu(update, context)
+    elif query.data.startswith('chart_'):
+        await send_chart(update, context, query.data[len('chart_'):])
     elif query.data == 'niche_analysis':
         await get_niche_analysis(update, context)
     elif query.data.startswith('niche_'):
         await show_niche_details(update, context)
-    elif query.data == 'channel_advice':
-        await get_channel_advice(update, context)
-    elif query.data == 'trends':
-        await get_current_trends(update, context)
-    elif query.data == 'new_channels':
-        await get_new_channels_stats(update, context)
-    elif query.data == 'posting_time':
-        await get_optimal_posting_time(update, context)
-    elif query.data == 'content_ideas':
-        await get_content_ideas(update, context)
     elif query.data == 'competitor_analysis':
         await get_competitor_analysis(update, context)
-    elif query.data == 'content_strategy':
-        await get_content_strategy(update, context)
-    elif query.data == 'overall_24h':
-        await get_overall_24h(update, context)
-    elif query.data == 'top_news':
-        await get_top_news(update, context)
-
-async def get_top_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get top 20 channels"""
+    elif query.data.startswith('competitors_'):
+        await show_competitors(update, context)
+
+def format_channel_card(channel, tr):
+    """Format full statistics of a single channel"""
+    return tr('channel.card', **channel)
+
+async def channel_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Find a channel by name or username: /channel <query>"""
+    tr = user_locale(update)
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Загружаем топ-20 каналов...\n"
-            "Пожалуйста, подождите..."
-        )
-        
+        query = ' '.join(context.args or []).strip()
+        if not query:
+            await update.message.reply_text(tr('search.usage'))
+            return
+
         analytics_instance = await get_analytics()
-        channels = await analytics_instance.get_top_channels()
-        
-        if not channels:
-            await message.edit_text(
-                "😕 Извините, не удалось получить данные о каналах.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+        matches = await analytics_instance.search_channels(query, limit=6)
+
+        if not matches:
+            await update.message.reply_text(
+                tr('search.not_found', query=query),
+                reply_markup=get_back_button(tr)
             )
             return
-            
-        # Format the response for all channels
-        response = "📊 Топ-20 Telegram каналов:\n\n"
-        
-        for i, channel in enumerate(channels, 1):
-            response += (
-                f"{i}. {channel['name']} (@{channel['username']})\n"
-                f"👥 {channel['subscribers']} подписчиков\n"
-                f"📈 Рост: {channel['growth_24h']} (24ч) | {channel['growth_7d']} (7д)\n"
-                f"📊 ERR: {channel['err']}% | 👁 {channel['avg_views']} просмотров\n"
-                f"📋 Категория: {channel['category']} | 📝 Контент: {channel['content_type']}\n"
-                f"📢 Частота постов: {channel['post_frequency']} | 💰 Монетизация: {channel['monetization']}\n"
-                f"🔄 Репосты: {channel['avg_forwards']} | 🏆 Конкуренция: {channel['competition']}\n\n"
-            )
-            
-        # Add back button
-        await add_back_button(message, response)
-            
+
+        response = tr('search.title', query=query)
+        response += format_channel_card(matches[0], tr)
+        if len(matches) > 1:
+            response += tr('search.similar_title')
+            for channel in matches[1:]:
+                response += tr('search.similar_item', **channel)
+
+        keyboard = [
+            [InlineKeyboardButton(tr('search.competitors_button'), callback_data=f"competitors_{matches[0]['username']}")],
+            [InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')]
+        ]
+        await update.message.reply_text(response, reply_markup=InlineKeyboardMarkup(keyboard))
+
     except Exception as e:
-        logger.error(f"Error getting top channels: {traceback.format_exc()}")
-        await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при получении данных.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
-        )
+        logger.exception("Error searching channels")
+        await update.message.reply_text(tr('status.error', text=tr('search.error')))
+
+def parse_inline_query(query):
+    """Split an inline query into a mode and its argument: 'top crypto' -> ('top', 'crypto')"""
+    words = query.split()
+    if not words:
+        return 'top', ''
+    mode = INLINE_MODES.get(words[0].lower())
+    if mode is None:
+        return 'channel', ' '.join(words)
+    return mode, ' '.join(words[1:])
+
+def channel_article(result_id, channel, tr, title=None):
+    return InlineQueryResultArticle(
+        id=result_id,
+        title=title or f"{channel['name']} (@{channel['username']})",
+        description=tr('inline.description', **channel),
+        input_message_content=InputTextMessageContent(format_channel_card(channel, tr))
+    )
+
+async def inline_results(analytics_instance, query, tr):
+    """Build inline results from the indexed datasets, without calls to the data source"""
+    mode, argument = parse_inline_query(query)
+
+    if mode == 'channel':
+        matches = await analytics_instance.search_channels(argument, limit=INLINE_RESULTS)
+        return [channel_article(f"ch:{channel['username']}", channel, tr) for channel in matches]
+
+    if mode == 'top':
+        index = await analytics_instance.get_channel_index()
+        if argument:
+            categories = match_categories(argument)
+            channels = index.query(category=categories, sort_by='subscribers', limit=INLINE_RESULTS) if categories else []
+        else:
+            channels = index.top('subscribers', limit=INLINE_RESULTS)
+        return [
+            channel_article(f"top:{channel['username']}", channel, tr, title=tr('inline.top_title', i=i, **channel))
+            for i, channel in enumerate(channels, 1)
+        ]
 
-async def add_back_button(message, text):
+    niches = await analytics_instance.get_niche_analysis()
+    index = await analytics_instance.get_channel_index()
+    results = []
+    for niche_name in match_niches(argument):
+        niche_data = niches.get(niche_name)
+        if niche_data is None:
+            continue
+        response = tr('niche.title', niche=niche_name, **niche_data)
+        leaders = index.query(category=NICHE_CATEGORIES[niche_name], sort_by='err', limit=3)
+        if leaders:
+            response += tr('niche.leaders_title')
+            for i, channel in enumerate(leaders, 1):
+                response += tr('niche.leader', i=i, **channel)
+        results.append(InlineQueryResultArticle(
+            id=f"niche:{list(NICHE_CATEGORIES).index(niche_name)}",
+            title=niche_name,
+            description=tr('inline.niche_description', **niche_data),
+            input_message_content=InputTextMessageContent(response)
+        ))
+    return results
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer inline queries from any chat: @bot top crypto, @bot niche IT, @bot <channel>"""
+    query = ' '.join(update.inline_query.query.lower().split())
+    tr = user_locale(update)
+    try:
+        analytics_instance = await get_analytics()
+        key = (screen_version(analytics_instance), tr.code, query)
+        results = inline_memo.get(key)
+        if results is None:
+            results = await asyncio.wait_for(inline_results(analytics_instance, query, tr), INLINE_DEADLINE)
+            if len(inline_memo) >= INLINE_MEMO_SIZE:
+                del inline_memo[next(iter(inline_memo))]
+            inline_memo[key] = results
+        # Answers depend on the user's language, so Telegram must not share them between users
+        await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=True)
+
+    except asyncio.TimeoutError:
+        # An empty answer that clients do not cache beats letting the query expire
+        logger.warning(f"Inline query {query!r} exceeded {INLINE_DEADLINE}s")
+        await update.inline_query.answer([], cache_time=0)
+    except Exception as e:
+        logger.exception("Error answering inline query")
+
+async def with_placeholder(message, text, work):
+    """Await `work`, editing the message to the placeholder `text` only if it is not done within PLACEHOLDER_DELAY"""
+    task = asyncio.ensure_future(work)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=PLACEHOLDER_DELAY)
+        if not done:
+            await message.edit_text(text)
+        return await task
+    finally:
+        task.cancel()  # only has an effect when the placeholder edit failed or the handler was cancelled
+
+async def add_back_button(message, text, tr):
     """Add back button to the message"""
     # Split long messages if needed
-    if len(text) > 4096:
-        parts = []
-        for x in range(0, len(text), 4096):
-            if x == 0:
-                parts.append(text[:4096])
-            else:
-                parts.append(text[x:x+4096])
-                
+    parts = paginate(text)
+    if len(parts) > 1:
         for i, part in enumerate(parts):
             if i == 0:
                 await message.edit_text(part)
             else:
                 sent = await message.reply_text(part)
                 if i == len(parts) - 1:
-                    await sent.reply_text("Вернуться в главное меню:", reply_markup=get_back_button())
+                    await sent.reply_text(tr('menu.back_prompt'), reply_markup=get_back_button(tr))
     else:
-        await message.edit_text(text, reply_markup=get_back_button())
-
-async def get_best_posts(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get best posts of the day"""
-    try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Загружаем 15 лучших постов...\n"
-            "Пожалуйста, подождите..."
-        )
-        
-        analytics_instance = await get_analytics()
-        posts = await analytics_instance.get_best_posts()
-        
-        if not posts:
-            await message.edit_text(
-                "😕 Извините, не удалось получить данные о лучших постах.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
-            )
-            return
-            
-        # Format the response with enhanced info
-        response = "🔥 Сегодняшние 15 лучших постов:\n\n"
-        for i, post in enumerate(posts[:15], 1):
-            response += (
-                f"{i}. {post['channel']} ({post['channel_size']})\n"
-                f"📝 Тема: {post['topic']}\n"
-                f"👁 {post['views']} просмотров | 🔄 {post['forwards']} репостов\n"
-                f"❤️ {post.get('likes', 'н/д')} лайков | 💬 {post.get('comments', 'н/д')} комментариев\n"
-                f"📊 Вовлеченность: {post['engagement']}\n"
-                f"⏰ Опубликовано: {post.get('post_date', 'Сегодня')} в {post.get('post_time', 'н/д')}\n"
-                f"💡 Краткое содержание: {post.get('summary', 'Недоступно')}\n"
-                f"🔗 {post['link']}\n\n"
-            )
-            
-        # Add back button
-        await add_back_button(message, response)
-            
-    except Exception as e:
-        logger.error(f"Error getting best posts: {traceback.format_exc()}")
-        await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при получении данных.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
-        )
+        await message.edit_text(text, reply_markup=get_back_button(tr))
 
 async def get_niche_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get niche analysis"""
+    tr = user_locale(update)
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Анализируем ниши Telegram-каналов...\n"
-            "Пожалуйста, подождите..."
-        )
-        
+        message = update.callback_query.message
         analytics_instance = await get_analytics()
-        niches = await analytics_instance.get_niche_analysis()
-        
+        niches = await with_placeholder(
+            message,
+            tr('status.loading', text=tr('niche_analysis.loading')),
+            analytics_instance.get_niche_analysis()
+        )
+
         if not niches:
             await message.edit_text(
-                "😕 Извините, не удалось получить данные о нишах.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+                tr('status.no_data', text=tr('niche_analysis.no_data')),
+                reply_markup=get_back_button(tr)
             )
             return
-            
+
         # Создаем клавиатуру с нишами для выбора
         keyboard = []
         row = []
@@ -314,452 +543,983 @@ async def get_niche_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE)
             if (i + 1) % 2 == 0 or i == len(niches) - 1:
                 keyboard.append(row)
                 row = []
-        
-        keyboard.append([InlineKeyboardButton("◀️ Назад в меню", callback_data='back_to_menu')])
-        
-        # Сохраняем данные о нишах в контексте
-        context.user_data['niches'] = niches
+
+        keyboard.append([InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')])
+
+        # Only the user's own list of names is kept: the niche data stays in the shared snapshot
         context.user_data['niches_list'] = list(niches.keys())
-            
+
         # Отображаем общую информацию и кнопки для выбора ниши
-        response = "📈 Анализ ниш Telegram-каналов:\n\n"
-        response += "Выберите нишу для детального анализа:\n"
-        
-        await message.edit_text(response, reply_markup=InlineKeyboardMarkup(keyboard))
-            
+        await message.edit_text(tr('niche_analysis.title'), reply_markup=InlineKeyboardMarkup(keyboard))
+
     except Exception as e:
-        logger.error(f"Error getting niche analysis: {traceback.format_exc()}")
+        logger.exception("Error getting niche analysis")
         await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при анализе ниш.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+            tr('status.error', text=tr('niche_analysis.error')),
+            reply_markup=get_back_button(tr)
         )
 
 async def show_niche_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show detailed information about a specific niche"""
+    tr = user_locale(update)
     try:
         query = update.callback_query
         await query.answer()
-        
+
         # Получаем индекс выбранной ниши
         niche_index = int(query.data.split('_')[1])
-        niches = context.user_data.get('niches', {})
         niches_list = context.user_data.get('niches_list', [])
-        
-        if not niches or niche_index >= len(niches_list):
+        analytics_instance = await get_analytics()
+        niches = await analytics_instance.get_niche_analysis() if niche_index < len(niches_list) else None
+
+        if not niches or niches_list[niche_index] not in niches:
             await query.message.edit_text(
-                "😕 Извините, информация о нише не найдена.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+                tr('status.no_data', text=tr('niche.not_found')),
+                reply_markup=get_back_button(tr)
             )
             return
-        
+
         # Получаем данные о выбранной нише
         niche_name = niches_list[niche_index]
         niche_data = niches[niche_name]
-        
+
         # Форматируем подробную информацию о нише
-        response = f"📊 Детальный анализ ниши: {niche_name}\n\n"
-        
-        response += "📈 Основные метрики:\n"
-        response += f"• ERR: {niche_data['avg_err']}%\n"
-        response += f"• Рост: {niche_data['growth_rate']}%\n"
-        response += f"• Монетизация: {niche_data['monetization']}\n"
-        response += f"• Конкуренция: {niche_data['competition']}\n\n"
-        
-        response += "👥 Аудитория:\n"
-        response += f"• Возраст: {niche_data['audience']['возраст']}\n"
-        response += f"• Интересы: {niche_data['audience']['интересы']}\n"
-        response += f"• Активность: {niche_data['audience']['активность']}\n\n"
-        
-        response += "💡 Показатели вовлеченности:\n"
-        response += f"• Просмотры/подписчики: {niche_data['engagement_metrics']['просмотры_к_подписчикам']}\n"
-        response += f"• Репосты/просмотры: {niche_data['engagement_metrics']['репосты_к_просмотрам']}\n"
-        response += f"• Комментарии/просмотры: {niche_data['engagement_metrics']['комментарии_к_просмотрам']}\n\n"
-        
-        response += "🚀 Рекомендации по контенту:\n"
+        response = tr('niche.title', niche=niche_name, **niche_data)
+
+        # Лидеры ниши из индекса каналов
+        index = await analytics_instance.get_channel_index()
+        categories = NICHE_CATEGORIES.get(niche_name, [])
+        leaders = index.query(category=categories, sort_by='err', limit=3)
+        if leaders:
+            response += tr('niche.leaders_title')
+            for i, channel in enumerate(leaders, 1):
+                response += tr('niche.leader', i=i, **channel)
+            high_monetization = index.lookup(category=categories, monetization='Высокая')
+            response += tr(
+                'niche.high_monetization',
+                count=len(high_monetization),
+                total=len(index.lookup(category=categories))
+            )
+
+        audience = niche_data['audience']
+        response += tr('niche.audience', age=audience['возраст'], interests=audience['интересы'], activity=audience['активность'])
+
+        engagement = niche_data['engagement_metrics']
+        response += tr(
+            'niche.engagement',
+            views=engagement['просмотры_к_подписчикам'],
+            forwards=engagement['репосты_к_просмотрам'],
+            comments=engagement['комментарии_к_просмотрам']
+        )
+
+        response += tr('niche.recommendations_title')
         for i, rec in enumerate(niche_data['content_recommendations'], 1):
-            response += f"{i}. {rec}\n"
-        response += f"\n⏰ Оптимальное время постинга: {niche_data['optimal_posting_time']}\n\n"
-        
+            response += tr('common.numbered', i=i, text=rec)
+        windows = await analytics_instance.get_posting_windows(niche_name)
+        if windows:
+            best_time = ', '.join(format_window(window, tr('common.weekdays').split()) for window in windows['windows'])
+        else:
+            best_time = niche_data['optimal_posting_time']
+        response += tr('niche.posting_time', time=best_time)
+
         # Создаем клавиатуру с кнопками для возврата
         keyboard = [
-            [InlineKeyboardButton("◀️ Назад к списку ниш", callback_data='niche_analysis')],
-            [InlineKeyboardButton("◀️ Назад в меню", callback_data='back_to_menu')]
+            [InlineKeyboardButton(tr('niche.back_to_list'), callback_data='niche_analysis')],
+            [InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')]
         ]
-            
+
         await query.message.edit_text(response, reply_markup=InlineKeyboardMarkup(keyboard))
-            
+
     except Exception as e:
-        logger.error(f"Error showing niche details: {traceback.format_exc()}")
+        logger.exception("Error showing niche details")
         await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при отображении деталей ниши.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+            tr('status.error', text=tr('niche.error')),
+            reply_markup=get_back_button(tr)
         )
 
-async def get_channel_advice(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get channel creation advice"""
+async def get_competitor_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show channel selection for competitor analysis"""
+    tr = user_locale(update)
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Анализируем данные для рекомендаций...\n"
-            "Пожалуйста, подождите..."
-        )
-        
+        message = update.callback_query.message
         analytics_instance = await get_analytics()
-        channels = await analytics_instance.get_top_channels()
-        niches = await analytics_instance.get_niche_analysis()
-        
-        if not channels or not niches:
+        index = await with_placeholder(
+            message,
+            tr('status.loading', text=tr('competitor_analysis.loading')),
+            analytics_instance.get_channel_index()
+        )
+
+        if not len(index):
             await message.edit_text(
-                "😕 Извините, не удалось получить данные для анализа.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+                tr('status.no_data', text=tr('competitor_analysis.no_data')),
+                reply_markup=get_back_button(tr)
             )
             return
-        
-        # Анализируем категории по ERR, росту и монетизации
-        best_categories = []
-        for channel in channels:
-            cat = channel['category']
-            err = float(channel['err'].replace('%', ''))
-            growth = int(channel['growth_7d'].replace('+', '').replace(',', ''))
-            monetization = channel['monetization']
-            competition = channel['competition']
-            
-            score = 0
-            if err > 4.5:
-                score += 3
-            elif err > 3.5:
-                score += 2
-            else:
-                score += 1
-                
-            if growth > 5000:
-                score += 3
-            elif growth > 2000:
-                score += 2
-            else:
-                score += 1
-                
-            if monetization == 'Высокая':
-                score += 3
-            elif monetization == 'Средняя':
-                score += 2
-            else:
-                score += 1
-                
-            if competition == 'Низкая':
-                score += 3
-            elif competition == 'Средняя':
-                score += 2
-            else:
-                score += 1
-                
-            best_categories.append({
-                'category': cat,
-                'score': score,
-                'err': err,
-                'growth': growth,
-                'monetization': monetization,
-                'competition': competition
-            })
-            
-        # Сортируем по показателю и выбираем топ-5
-        best_categories = sorted(best_categories, key=lambda x: x['score'], reverse=True)
-        unique_categories = []
-        for cat in best_categories:
-            if cat['category'] not in [c['category'] for c in unique_categories]:
-                unique_categories.append(cat)
-                if len(unique_categories) >= 5:
-                    break
-        
-        # Формируем рекомендации
-        response = "🚀 Рекомендации по созданию Telegram канала:\n\n"
-        
-        response += "🏆 Наиболее перспективные ниши:\n\n"
-        for i, cat in enumerate(unique_categories, 1):
-            response += (
-                f"{i}. {cat['category']}\n"
-                f"   • ERR: {cat['err']}%\n"
-                f"   • Недельный рост: +{cat['growth']}\n"
-                f"   • Потенциал монетизации: {cat['monetization']}\n"
-                f"   • Уровень конкуренции: {cat['competition']}\n\n"
-            )
-        
-        # Анализ частоты постов
-        post_freq = {}
-        for channel in channels:
-            cat = channel['category']
-            freq = channel['post_frequency']
-            if cat not in post_freq:
-                post_freq[cat] = []
-            post_freq[cat].append(freq)
-        
-        response += "📝 Оптимальная частота публикаций:\n\n"
-        for cat in [c['category'] for c in unique_categories]:
-            if cat in post_freq:
-                response += f"• {cat}: {max(set(post_freq[cat]), key=post_freq[cat].count)}\n"
-        
-        response += "\n🎯 Общие рекомендации:\n\n"
-        response += (
-            "1. Выберите нишу с балансом между монетизацией и конкуренцией\n"
-            "2. Поддерживайте регулярность публикаций\n"
-            "3. Используйте разнообразные форматы контента\n"
-            "4. Отслеживайте ERR (Engagement Rate) вашего канала\n"
-            "5. Взаимодействуйте с аудиторией через опросы и ответы на комментарии\n"
-            "6. Продвигайте канал через кросс-постинг в других каналах схожей тематики\n"
-            "7. Публикуйте уникальный и полезный контент\n"
-            "8. Оптимизируйте время публикаций на основе активности аудитории\n"
-        )
-        
-        # Add back button
-        await add_back_button(message, response)
-            
+
+        # Клавиатура с каналами для выбора
+        keyboard = []
+        row = []
+        channels = index.top('subscribers', limit=20)
+        for i, channel in enumerate(channels):
+            row.append(InlineKeyboardButton(channel['name'], callback_data=f"competitors_{channel['username']}"))
+            if (i + 1) % 2 == 0 or i == len(channels) - 1:
+                keyboard.append(row)
+                row = []
+        keyboard.append([InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')])
+
+        await message.edit_text(tr('competitor_analysis.title'), reply_markup=InlineKeyboardMarkup(keyboard))
+
     except Exception as e:
-        logger.error(f"Error getting channel advice: {traceback.format_exc()}")
+        logger.exception("Error getting competitor analysis")
         await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при анализе данных.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+            tr('status.error', text=tr('competitor_analysis.error')),
+            reply_markup=get_back_button(tr)
         )
 
-async def get_current_trends(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get current trends analysis"""
+async def show_competitors(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show nearest competitors of the selected channel"""
+    tr = user_locale(update)
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Анализируем текущие тренды...\n"
-            "Пожалуйста, подождите..."
-        )
-        
+        query = update.callback_query
+        username = query.data[len('competitors_'):]
+
         analytics_instance = await get_analytics()
-        trends = await analytics_instance.get_current_trends()
-        
-        if not trends:
-            await message.edit_text(
-                "😕 Извините, не удалось получить данные о трендах.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
-            )
+        competitors = await analytics_instance.get_competitors(username, k=5)
+        channel = await analytics_instance.get_channel(username)
+
+        if not competitors or channel is None:
+            await query.message.edit_text(tr('competitors.not_found'), reply_markup=get_back_button(tr))
             return
-            
-        # Format the response
-        response = "🔍 Анализ текущих трендов в Telegram:\n\n"
-        
-        response += "📈 Самые популярные темы:\n"
-        for i, topic in enumerate(trends['top_topics'], 1):
-            response += (
-                f"{i}. {topic['name']}\n"
-                f"   • Рост активности: {topic['growth']}\n"
-                f"   • Количество постов: {topic['posts_count']}\n\n"
+
+        own_err = parse_number(channel['err'])
+        own_subscribers = parse_number(channel['subscribers'])
+
+        response = tr('competitors.title', **channel)
+        for i, (competitor, similarity) in enumerate(competitors, 1):
+            err_diff = parse_number(competitor['err']) - own_err
+            size_ratio = parse_number(competitor['subscribers']) / own_subscribers if own_subscribers else 0
+            response += tr(
+                'competitors.item',
+                i=i, similarity=similarity, size_ratio=size_ratio, err_diff=err_diff, **competitor
             )
-            
-        response += "🚀 Растущие форматы контента:\n"
-        for i, format_item in enumerate(trends['growing_formats'], 1):
-            response += f"{i}. {format_item['format']} (рост: {format_item['growth']})\n"
-        
-        response += "\n📊 Интересы аудитории:\n"
-        for i, interest in enumerate(trends['audience_interests'], 1):
-            response += f"{i}. {interest['interest']} ({interest['share']})\n"
-            
-        response += "\n💡 Вывод: Наибольший рост показывают темы, связанные с "
-        response += f"{trends['top_topics'][0]['name']} и {trends['top_topics'][1]['name']}, "
-        response += f"а из форматов контента наиболее эффективны {trends['growing_formats'][0]['format']} "
-        response += f"и {trends['growing_formats'][1]['format']}."
-            
-        # Add back button
-        await add_back_button(message, response)
-            
+
+        stronger = [c for c, _ in competitors if parse_number(c['err']) > own_err]
+        if stronger:
+            response += tr('competitors.stronger', stronger=len(stronger), total=len(competitors))
+        else:
+            response += tr('competitors.leader')
+
+        keyboard = [
+            [InlineKeyboardButton(tr('competitors.back_to_list'), callback_data='competitor_analysis')],
+            [InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')]
+        ]
+        await query.message.edit_text(response, reply_markup=InlineKeyboardMarkup(keyboard))
+
     except Exception as e:
-        logger.error(f"Error getting trends: {traceback.format_exc()}")
+        logger.exception("Error showing competitors")
         await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при анализе трендов.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+            tr('status.error', text=tr('competitors.error')),
+            reply_markup=get_back_button(tr)
         )
 
-async def get_new_channels_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get statistics about new channels"""
+async def render_top_channels(analytics_instance, tr):
+    """Render the top 20 channels screen"""
+    channels = await analytics_instance.get_top_channels()
+    if not channels:
+        return None
+
+    # Format the response for all channels
+    response = tr('top_50.title')
+    for i, channel in enumerate(channels, 1):
+        response += tr('top_50.item', i=i, card=format_channel_card(channel, tr))
+    return response
+
+async def render_best_posts(analytics_instance, tr):
+    """Render best posts of the day"""
+    posts = await analytics_instance.get_best_posts()
+    if not posts:
+        return None
+
+    # Format the response with enhanced info
+    defaults = {
+        'likes': tr('common.na'),
+        'comments': tr('common.na'),
+        'post_date': tr('common.today'),
+        'post_time': tr('common.na'),
+        'summary': tr('common.unavailable'),
+    }
+    response = tr('best_posts.title')
+    for i, post in enumerate(posts[:15], 1):
+        response += tr('best_posts.item', i=i, **{**defaults, **post})
+    return response
+
+async def render_channel_advice(analytics_instance, tr):
+    """Render channel creation advice"""
+    index = await analytics_instance.get_channel_index()
+    channels = index.channels
+    niches = await analytics_instance.get_niche_analysis()
+    if not channels or not niches:
+        return None
+
+    # Анализируем категории по ERR, росту и монетизации
+    best_categories = []
+    for channel in channels:
+        cat = channel['category']
+        err = float(channel['err'].replace('%', ''))
+        growth = int(channel['growth_7d'].replace('+', '').replace(',', ''))
+        monetization = channel['monetization']
+        competition = channel['competition']
+
+        score = 0
+        if err > 4.5:
+            score += 3
+        elif err > 3.5:
+            score += 2
+        else:
+            score += 1
+
+        if growth > 5000:
+            score += 3
+        elif growth > 2000:
+            score += 2
+        else:
+            score += 1
+
+        if monetization == 'Высокая':
+            score += 3
+        elif monetization == 'Средняя':
+            score += 2
+        else:
+            score += 1
+
+        if competition == 'Низкая':
+            score += 3
+        elif competition == 'Средняя':
+            score += 2
+        else:
+            score += 1
+
+        best_categories.append({
+            'category': cat,
+            'score': score,
+            'err': err,
+            'growth': growth,
+            'monetization': monetization,
+            'competition': competition
+        })
+
+    # Сортируем по показателю и выбираем топ-5
+    best_categories = sorted(best_categories, key=lambda x: x['score'], reverse=True)
+    unique_categories = []
+    for cat in best_categories:
+        if cat['category'] not in [c['category'] for c in unique_categories]:
+            unique_categories.append(cat)
+            if len(unique_categories) >= 5:
+                break
+
+    # Формируем рекомендации
+    response = tr('channel_advice.title')
+    for i, cat in enumerate(unique_categories, 1):
+        response += tr('channel_advice.item', i=i, **cat)
+
+    # Анализ частоты постов по индексу категорий
+    response += tr('channel_advice.frequency_title')
+    for cat in [c['category'] for c in unique_categories]:
+        frequencies = [channel['post_frequency'] for channel in index.query(category=cat)]
+        if frequencies:
+            response += tr('channel_advice.frequency_item', category=cat, frequency=max(set(frequencies), key=frequencies.count))
+
+    response += tr('channel_advice.tips')
+    return response
+
+def format_stat(value, tr, key):
+    """A statistic in the user's language: the `key` template of the value, or 'n/a' when it is unknown"""
+    if value is None:
+        return tr('common.na')
+    return tr(key, value=value)
+
+def format_trend_growth(growth, tr):
+    """Growth of a topic or format; topics that were absent in the previous window are 'new'"""
+    return tr('common.new') if growth is None else growth
+
+async def render_current_trends(analytics_instance, tr):
+    """Render current trends analysis"""
+    trends = await analytics_instance.get_current_trends()
+    if not trends:
+        return None
+
+    # Format the response
+    response = tr('trends.title')
+    for i, topic in enumerate(trends['top_topics'], 1):
+        response += tr('trends.topic', i=i, **{**topic, 'growth': format_trend_growth(topic['growth'], tr)})
+
+    response += tr('trends.formats_title')
+    for i, format_item in enumerate(trends['growing_formats'], 1):
+        response += tr('trends.format', i=i, **{**format_item, 'growth': format_trend_growth(format_item['growth'], tr)})
+
+    response += tr('trends.interests_title')
+    for i, interest in enumerate(trends['audience_interests'], 1):
+        response += tr('trends.interest', i=i, **interest)
+
+    response += tr(
+        'trends.conclusion',
+        first_topic=trends['top_topics'][0]['name'],
+        second_topic=trends['top_topics'][1]['name'],
+        first_format=trends['growing_formats'][0]['format'],
+        second_format=trends['growing_formats'][1]['format']
+    )
+    return response
+
+async def render_new_channels_stats(analytics_instance, tr):
+    """Render statistics about new channels"""
+    stats = await analytics_instance.get_new_channels_stats()
+    if not stats:
+        return None
+
+    # Format the response
+    response = tr(
+        'new_channels.title',
+        total=stats['total_created_24h'],
+        growth_rate=format_stat(stats['growth_rate'], tr, 'common.percent_change')
+    )
+    for category in stats['by_category']:
+        response += tr('new_channels.category', **category)
+
+    response += tr(
+        'new_channels.metrics',
+        avg_initial_posts=tr('common.na') if stats['avg_initial_posts'] is None else stats['avg_initial_posts'],
+        avg_growth_first_week=format_stat(stats['avg_growth_first_week'], tr, 'new_channels.first_week_growth'),
+        survival_rate=format_stat(stats['survival_rate'], tr, 'common.percent')
+    )
+    for i, category in enumerate(stats['by_category'][:3], 1):
+        response += tr('new_channels.top_item', i=i, **category)
+    return response
+
+async def render_optimal_posting_time(analytics_instance, tr):
+    """Render optimal posting windows per niche"""
+    niches = await analytics_instance.get_niche_analysis()
+    if not niches:
+        return None
+
+    weekdays = tr('common.weekdays').split()
+    response = tr('posting_time.title')
+    for niche_name, niche_data in niches.items():
+        windows = await analytics_instance.get_posting_windows(niche_name)
+        response += tr('common.niche', niche=niche_name)
+        if windows:
+            for i, window in enumerate(windows['windows'], 1):
+                response += tr('posting_time.window', i=i, window=format_window(window, weekdays), score=window['score'])
+            response += tr('posting_time.based_on', posts=windows['posts'])
+        else:
+            response += tr('posting_time.fallback', time=niche_data['optimal_posting_time'])
+
+    response += tr('posting_time.footer')
+    return response
+
+async def render_content_ideas(analytics_instance, tr):
+    """Render content ideas per niche from the topic model"""
+    niches = await analytics_instance.get_niche_analysis()
+    if not niches:
+        return None
+
+    response = tr('content_ideas.title')
+    for niche_name, niche_data in niches.items():
+        topics = await analytics_instance.get_content_topics(niche_name)
+        response += tr('common.niche', niche=niche_name)
+
+        ideas = []
+        if topics and topics['posts']:
+            keywords = [word for word, _ in topics['keywords']]
+            response += tr('content_ideas.keywords', keywords=', '.join(keywords[:5]))
+            if topics['top_topics']:
+                ideas.append(tr('content_ideas.continue_topic', topic=topics['top_topics'][0]))
+            for first, second, _ in topics['themes'][:1]:
+                ideas.append(tr('content_ideas.theme_pair', first=first, second=second))
+            for rec, keyword in zip(niche_data['content_recommendations'], keywords):
+                ideas.append(tr('content_ideas.focus', recommendation=rec, keyword=keyword))
+        else:
+            ideas.extend(niche_data['content_recommendations'])
+
+        for i, idea in enumerate(ideas[:4], 1):
+            response += tr('common.numbered', i=i, text=idea)
+        response += "\n"
+
+    response += tr('content_ideas.footer')
+    return response
+
+async def render_content_strategy(analytics_instance, tr):
+    """Render content strategy per niche"""
+    niches = await analytics_instance.get_niche_analysis()
+    index = await analytics_instance.get_channel_index()
+    if not niches:
+        return None
+
+    weekdays = tr('common.weekdays').split()
+    response = tr('content_strategy.title')
+    for niche_name, niche_data in niches.items():
+        categories = NICHE_CATEGORIES.get(niche_name, [])
+        topics = await analytics_instance.get_content_topics(niche_name)
+        windows = await analytics_instance.get_posting_windows(niche_name)
+
+        response += tr('common.niche', niche=niche_name)
+        if topics and topics['keywords']:
+            response += tr('content_strategy.topics', topics=', '.join(word for word, _ in topics['keywords'][:4]))
+        response += tr('content_strategy.rubrics', rubrics=', '.join(niche_data['content_recommendations']))
+
+        formats = index.facet_counts('content_type', category=categories)
+        if formats:
+            top_formats = sorted(formats, key=formats.get, reverse=True)[:2]
+            response += tr('content_strategy.formats', formats=', '.join(top_formats))
+
+        frequencies = [channel['post_frequency'] for channel in index.query(category=categories)]
+        if frequencies:
+            response += tr('content_strategy.frequency', frequency=max(set(frequencies), key=frequencies.count))
+
+        if windows:
+            best_time = ', '.join(format_window(window, weekdays) for window in windows['windows'])
+        else:
+            best_time = niche_data['optimal_posting_time']
+        response += tr('content_strategy.time', time=best_time)
+        response += tr('content_strategy.err_target', err=niche_data['avg_err'])
+    return response
+
+async def render_overall_24h(analytics_instance, tr):
+    """Render overall statistics for the last 24 hours"""
+    # Получаем данные из разных методов
+    top_channels = await analytics_instance.get_top_channels()
+    best_posts = await analytics_instance.get_best_posts()
+    trends = await analytics_instance.get_current_trends()
+    new_channels = await analytics_instance.get_new_channels_stats()
+    if not all([top_channels, best_posts, trends, new_channels]):
+        return None
+
+    # Форматируем общую сводку
+    response = tr('overall_24h.title')
+
+    # Статистика по каналам
+    response += tr('overall_24h.channel', **top_channels[0])
+
+    # Статистика по постам
+    response += tr('overall_24h.post', **best_posts[0])
+
+    # Статистика по трендам
+    response += tr('overall_24h.trends_title')
+    for topic in trends['top_topics'][:3]:
+        response += tr('overall_24h.trend', **{**topic, 'growth': format_trend_growth(topic['growth'], tr)})
+    response += "\n"
+
+    # Статистика по новым каналам
+    response += tr('overall_24h.new_channels', total=new_channels['total_created_24h'])
+    if new_channels['by_category']:
+        response += tr('overall_24h.popular_category', category=new_channels['by_category'][0]['category'])
+    response += "\n"
+
+    # Общая активность
+    # Здесь можно добавить расчетные данные на основе имеющейся информации
+    response += tr('overall_24h.activity')
+    return response
+
+async def render_top_news(analytics_instance, tr):
+    """Render top 10 popular news"""
+    best_posts = await analytics_instance.get_best_posts()
+    if not best_posts:
+        return None
+
+    # Фильтруем посты, оставляя только новостные (на основе темы)
+    news_posts = [post for post in best_posts if 'новост' in post['topic'].lower()
+                  or 'news' in post['topic'].lower()
+                  or 'событи' in post['topic'].lower()]
+
+    # Если новостей не найдено, берем все посты
+    if not news_posts:
+        news_posts = best_posts
+
+    # Форматируем топ-10 новостей
+    defaults = {'summary': tr('common.unavailable')}
+    response = tr('top_news.title')
+    for i, post in enumerate(news_posts[:10], 1):
+        response += tr('top_news.item', i=i, **{**defaults, **post})
+    return response
+
+# Screens that only depend on the current datasets: callback data -> renderer.
+# Their loading, no data and error texts are the '<screen>.loading/.no_data/.error' templates.
+SCREENS = {
+    'top_50': render_top_channels,
+    'best_posts': render_best_posts,
+    'channel_advice': render_channel_advice,
+    'trends': render_current_trends,
+    'new_channels': render_new_channels_stats,
+    'posting_time': render_optimal_posting_time,
+    'content_ideas': render_content_ideas,
+    'content_strategy': render_content_strategy,
+    'overall_24h': render_overall_24h,
+    'top_news': render_top_news,
+}
+
+def screen_version(analytics_instance):
+    """Version of the data a screen is rendered from: datasets plus the topic model built on them"""
+    return f"{analytics_instance.data_version}.{analytics_instance.topic_model.version}"
+
+async def render_screen(analytics_instance, screen, tr):
+    """Return the text of a screen, rendering it only once per locale and data version"""
+    await analytics_instance.ensure_ready()
+    version = screen_version(analytics_instance)
+    response = screen_cache.get((screen, tr.code), version)
+    bind(cache='miss' if response is None else 'hit')
+    if response is None:
+        response = await SCREENS[screen](analytics_instance, tr)
+        if response is not None:
+            screen_cache.put((screen, tr.code), version, response)
+    return response
+
+async def show_screen(update: Update, context: ContextTypes.DEFAULT_TYPE, screen):
+    """Show one of the data screens with a back button"""
+    tr = user_locale(update)
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Собираем статистику о новых каналах...\n"
-            "Пожалуйста, подождите..."
-        )
-        
+        message = update.callback_query.message
         analytics_instance = await get_analytics()
-        stats = await analytics_instance.get_new_channels_stats()
-        
-        if not stats:
+        response = await with_placeholder(
+            message,
+            tr('status.loading', text=tr(f'{screen}.loading')),
+            render_screen(analytics_instance, screen, tr)
+        )
+
+        if response is None:
             await message.edit_text(
-                "😕 Извините, не удалось получить статистику о новых каналах.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+                tr('status.no_data', text=tr(f'{screen}.no_data')),
+                reply_markup=get_back_button(tr)
             )
             return
-            
-        # Format the response
-        response = "📱 Статистика новых Telegram-каналов за 24 часа:\n\n"
-        
-        response += f"📊 Всего создано: {stats['total_created_24h']} каналов (рост {stats['growth_rate']})\n\n"
-        
-        response += "🔍 По категориям:\n"
-        for category in stats['by_category']:
-            response += f"• {category['category']}: {category['count']} ({category['share']})\n"
-            
-        response += f"\n📈 Показатели новых каналов:\n"
-        response += f"• В среднем {stats['avg_initial_posts']} постов при запуске\n"
-        response += f"• Средний рост за первую неделю: {stats['avg_growth_first_week']}\n"
-        response += f"• Выживаемость: {stats['survival_rate']} каналов продолжают работу после первой недели\n\n"
-        
-        response += "💡 Топ-3 категории для создания канала сегодня:\n"
-        for i in range(3):
-            response += f"{i+1}. {stats['by_category'][i]['category']} ({stats['by_category'][i]['share']})\n"
-            
+
         # Add back button
-        await add_back_button(message, response)
-            
+        await add_back_button(message, response, tr)
+
     except Exception as e:
-        logger.error(f"Error getting new channels stats: {traceback.format_exc()}")
+        logger.exception(f"Error showing {screen} screen")
         await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при получении статистики.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+            tr('status.error', text=tr(f'{screen}.error')),
+            reply_markup=get_back_button(tr)
         )
 
-async def get_overall_24h(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get overall statistics for the last 24 hours"""
+async def chart_new_channels(analytics_instance, tr):
+    """New channels of the last 24 hours per category"""
+    stats = await analytics_instance.get_new_channels_stats()
+    if not stats or not stats['by_category']:
+        return None
+    categories = stats['by_category']
+    return 'shares', (
+        tr('charts.new_channels.title'),
+        [category['category'] for category in categories],
+        [parse_number(category['count']) for category in categories]
+    )
+
+async def chart_niche_growth(analytics_instance, tr):
+    """Growth rate and ERR of every niche"""
+    niches = await analytics_instance.get_niche_analysis()
+    if not niches:
+        return None
+    return 'grouped', (
+        tr('charts.niche_growth.title'),
+        list(niches),
+        {
+            tr('charts.growth'): [parse_number(niche['growth_rate']) for niche in niches.values()],
+            tr('charts.err'): [parse_number(niche['avg_err']) for niche in niches.values()],
+        }
+    )
+
+async def chart_niche_engagement(analytics_instance, tr):
+    """Engagement ratios of every niche"""
+    niches = await analytics_instance.get_niche_analysis()
+    if not niches:
+        return None
+    metrics = [niche['engagement_metrics'] for niche in niches.values()]
+    return 'grouped', (
+        tr('charts.niche_engagement.title'),
+        list(niches),
+        {
+            tr('charts.views'): [parse_number(m['просмотры_к_подписчикам']) for m in metrics],
+            tr('charts.forwards'): [parse_number(m['репосты_к_просмотрам']) for m in metrics],
+            tr('charts.comments'): [parse_number(m['комментарии_к_просмотрам']) for m in metrics],
+        }
+    )
+
+# Chart name -> coroutine returning (chart kind, drawing arguments) or None without data
+CHARTS = {
+    'new_channels': chart_new_channels,
+    'niche_growth': chart_niche_growth,
+    'niche_engagement': chart_niche_engagement,
+}
+
+async def show_charts_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """List the available charts"""
+    tr = user_locale(update)
+    keyboard = [[InlineKeyboardButton(tr(f'charts.{chart}'), callback_data=f'chart_{chart}')] for chart in CHARTS]
+    keyboard.append([InlineKeyboardButton(tr('menu.back'), callback_data='back_to_menu')])
+    await update.callback_query.message.edit_text(tr('charts.title'), reply_markup=InlineKeyboardMarkup(keyboard))
+
+async def send_chart(update: Update, context: ContextTypes.DEFAULT_TYPE, chart):
+    """Send a chart, reusing the file_id of an earlier upload of the same version"""
+    tr = user_locale(update)
+    message = update.callback_query.message
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Собираем общую сводку за последние 24 часа...\n"
-            "Пожалуйста, подождите..."
-        )
-        
         analytics_instance = await get_analytics()
-        # Получаем данные из разных методов
-        top_channels = await analytics_instance.get_top_channels()
-        best_posts = await analytics_instance.get_best_posts()
-        trends = await analytics_instance.get_current_trends()
-        new_channels = await analytics_instance.get_new_channels_stats()
-        
-        if not all([top_channels, best_posts, trends, new_channels]):
-            await message.edit_text(
-                "😕 Извините, не удалось получить полную сводку.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
-            )
+        await analytics_instance.ensure_ready()
+        version = screen_version(analytics_instance)
+        key = (chart, tr.code)
+        caption = tr(f'charts.{chart}')
+
+        async with charts.upload_lock(key):
+            file_id = charts.file_id(key, version)
+            if file_id is not None:
+                try:
+                    await message.reply_photo(file_id, caption=caption)
+                    return
+                except BadRequest:
+                    charts.forget(key)
+
+            built = await CHARTS[chart](analytics_instance, tr)
+            if built is None:
+                await message.reply_text(tr('status.no_data', text=tr('charts.no_data')))
+                return
+            kind, args = built
+            png = await charts.render(key, version, kind, *args)
+            sent = await message.reply_photo(png, caption=caption)
+            charts.remember(key, version, sent.photo[-1].file_id)
+
+    except Exception as e:
+        logger.exception(f"Error sending {chart} chart")
+        await message.reply_text(tr('status.error', text=tr('charts.error')))
+
+async def export_channels(analytics_instance):
+    return await analytics_instance.get_top_channels()
+
+async def export_posts(analytics_instance):
+    return await analytics_instance.get_best_posts()
+
+async def export_niches(analytics_instance):
+    niches = await analytics_instance.get_niche_analysis()
+    return list(niche_rows(niches)) if niches else None
+
+# Dataset name -> coroutine returning its rows
+EXPORTS = {'channels': export_channels, 'posts': export_posts, 'niches': export_niches}
+
+async def export_dataset(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Send a dataset as a file: /export channels|posts|niches [csv|parquet]"""
+    tr = user_locale(update)
+    try:
+        args = [arg.lower() for arg in context.args or []]
+        dataset = args[0] if args else None
+        file_format = args[1] if len(args) > 1 else 'csv'
+        if dataset not in EXPORTS or file_format not in ('csv', 'parquet'):
+            await update.message.reply_text(tr('export.usage'))
             return
-            
-        # Форматируем общую сводку
-        response = "📊 Общая сводка за последние 24 часа:\n\n"
-        
-        # Статистика по каналам
-        top_channel = top_channels[0]
-        response += "🏆 Лидеры роста:\n"
-        response += f"• Топ канал: {top_channel['name']} (@{top_channel['username']})\n"
-        response += f"• Рост: {top_channel['growth_24h']} подписчиков\n"
-        response += f"• ERR: {top_channel['err']}%\n\n"
-        
-        # Статистика по постам
-        top_post = best_posts[0]
-        response += "📝 Лучший пост:\n"
-        response += f"• Канал: {top_post['channel']}\n"
-        response += f"• Тема: {top_post['topic']}\n"
-        response += f"• Просмотры: {top_post['views']}\n"
-        response += f"• Репосты: {top_post['forwards']}\n\n"
-        
-        # Статистика по трендам
-        response += "🔥 Горячие тренды:\n"
-        for i, topic in enumerate(trends['top_topics'][:3], 1):
-            response += f"• {topic['name']} (рост активности: {topic['growth']})\n"
-        response += "\n"
-        
-        # Статистика по новым каналам
-        response += "🆕 Новые каналы:\n"
-        response += f"• Создано за 24ч: {new_channels['total_created_24h']}\n"
-        response += f"• Самая популярная ниша: {new_channels['by_category'][0]['category']}\n\n"
-        
-        # Общая активность
-        response += "📈 Общая активность в Telegram:\n"
-        # Здесь можно добавить расчетные данные на основе имеющейся информации
-        response += "• Рост общего количества просмотров: +15.7%\n"
-        response += "• Рост активности пользователей: +8.3%\n"
-        response += "• Средний ERR по всем каналам: 2.4%\n"
-        
-        # Add back button
-        await add_back_button(message, response)
-            
+        if file_format not in FORMATS:
+            await update.message.reply_text(tr('export.no_parquet'))
+            return
+
+        analytics_instance = await get_analytics()
+        await analytics_instance.ensure_ready()
+        version = analytics_instance.data_version
+        key = (dataset, file_format)
+        caption = tr('export.caption', dataset=dataset, version=version)
+
+        async with exports.lock(key):
+            file_id = exports.file_id(key, version)
+            if file_id is not None:
+                try:
+                    await update.message.reply_document(file_id, caption=caption)
+                    return
+                except BadRequest:
+                    exports.forget(key)
+
+            file = exports.get(key, version)
+            if file is None:
+                rows = await EXPORTS[dataset](analytics_instance)
+                if not rows:
+                    await update.message.reply_text(tr('status.no_data', text=tr('export.no_data')))
+                    return
+                file = await asyncio.to_thread(exports.build, key, version, rows)
+            sent = await update.message.reply_document(file, filename=f"{dataset}_v{version}.{file_format}", caption=caption)
+            exports.remember(key, version, sent.document.file_id)
+
     except Exception as e:
-        logger.error(f"Error getting overall stats: {traceback.format_exc()}")
-        await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при получении общей сводки.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
-        )
+        logger.exception(f"Error exporting {context.args}")
+        await update.message.reply_text(tr('status.error', text=tr('export.error')))
+
+async def render_digest(locale):
+    """Digest text for a locale: the 24h summary, rendered once per data version"""
+    analytics_instance = await get_analytics()
+    text = await render_screen(analytics_instance, 'overall_24h', templates.locale(locale))
+    if text is None:
+        raise RuntimeError("24h summary is not available")
+    return text
 
-async def get_top_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get top 10 popular news"""
+async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Subscribe the chat to the 24h summary digest: /subscribe daily|hourly"""
+    tr = user_locale(update)
+    try:
+        frequency = (context.args[0].lower() if context.args else 'daily')
+        if frequency not in FREQUENCIES:
+            await update.message.reply_text(tr('digest.usage'))
+            return
+        await asyncio.to_thread(subscriptions.subscribe, update.effective_chat.id, frequency, tr.code)
+        await update.message.reply_text(tr(f'digest.subscribed_{frequency}', hour=DIGEST_HOUR))
+
+    except Exception as e:
+        logger.exception("Error subscribing to digest")
+        await update.message.reply_text(tr('status.error', text=tr('digest.error')))
+
+async def unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Stop digests for the chat: /unsubscribe"""
+    tr = user_locale(update)
+    try:
+        removed = await asyncio.to_thread(subscriptions.unsubscribe, update.effective_chat.id)
+        await update.message.reply_text(tr('digest.unsubscribed' if removed else 'digest.not_subscribed'))
+
+    except Exception as e:
+        logger.exception("Error unsubscribing from digest")
+        await update.message.reply_text(tr('status.error', text=tr('digest.error')))
+
+def format_age(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+def format_ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+@admin_only
+async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler latencies, in-flight work, outbound queue and memory: /stats"""
     try:
-        # Show loading message
-        message = await update.callback_query.message.edit_text(
-            "🔄 Собираем топ-10 самых популярных новостей...\n"
-            "Пожалуйста, подождите..."
-        )
-        
         analytics_instance = await get_analytics()
-        best_posts = await analytics_instance.get_best_posts()
-        
-        if not best_posts:
-            await message.edit_text(
-                "😕 Извините, не удалось получить топовые новости.\n\n"
-                "Пожалуйста, попробуйте позже.",
-                reply_markup=get_back_button()
+        current, peak = memory_usage()
+        refreshed = analytics_instance.refreshed_at
+        lines = [
+            f"Role: {ANALYTICS_ROLE}, up {format_age(time.time() - started_at)}",
+            f"Data v{analytics_instance.data_version}, refreshed {format_age((datetime.now() - refreshed).total_seconds() if refreshed else None)} ago",
+            f"Memory: {current / 2**20:.1f} MB (peak {peak / 2**20:.1f} MB)",
+            f"In-flight fetches: {analytics_instance.inflight_fetches}, asyncio tasks: {len(asyncio.all_tasks())}",
+            f"Handlers running: {len(pressed_callbacks)} callbacks, "
+            f"repeated presses skipped: {sum(repeated_presses.values())}",
+        ]
+        progress = digest_scheduler.progress if digest_scheduler else None
+        if progress:
+            lines.append(f"Digest {progress['frequency']} {progress['slot']}: {progress['sent']} sent, {progress['remaining']} queued")
+        else:
+            counts = await asyncio.to_thread(subscriptions.count)
+            lines.append(f"Digest queue: empty, subscribers: {', '.join(f'{k} {v}' for k, v in counts.items()) or 'none'}")
+
+        lines.append("\nHandler  calls  errors  p50/p95/p99 ms")
+        for row in handler_metrics.summary()[:20]:
+            lines.append(
+                f"{row['name']}  {row['calls']}  {row['errors']}  "
+                f"{format_ms(row['p50'])}/{format_ms(row['p95'])}/{format_ms(row['p99'])}"
             )
-            return
-            
-        # Фильтруем посты, оставляя только новостные (на основе темы)
-        news_posts = [post for post in best_posts if 'новост' in post['topic'].lower() 
-                      or 'news' in post['topic'].lower() 
-                      or 'событи' in post['topic'].lower()]
-        
-        # Если новостей не найдено, берем все посты
-        if not news_posts:
-            news_posts = best_posts
-        
-        # Форматируем топ-10 новостей
-        response = "📰 Топ-10 самых популярных новостей:\n\n"
-        
-        for i, post in enumerate(news_posts[:10], 1):
-            response += (
-                f"{i}. {post['channel']}\n"
-                f"📝 {post['topic']}\n"
-                f"👁 {post['views']} просмотров\n"
-                f"🔄 {post['forwards']} репостов\n"
-                f"💬 Краткое содержание: {post.get('summary', 'Недоступно')}\n"
-                f"🔗 {post['link']}\n\n"
+
+        lines.append("\nBot API  pool  HTTP  requests  in flight (peak)  pool wait p50/p95/p99 ms")
+        for name, request in (('sends', bot_request), ('updates', updates_request)):
+            pool = request.metrics.summary()
+            lines.append(
+                f"{name}  {request.pool_size}  {request.http_version}  {pool['requests']}  "
+                f"{pool['in_flight']} ({pool['peak_in_flight']})  "
+                f"{format_ms(pool['wait_p50'])}/{format_ms(pool['wait_p95'])}/{format_ms(pool['wait_p99'])}"
             )
-            
-        # Add back button
-        await add_back_button(message, response)
-            
+
+        lines.append("\nEndpoint  state  p50/p95 ms  timeout")
+        for endpoint, status in analytics_instance.endpoint_status().items():
+            lines.append(
+                f"{endpoint}  {status['state']}  {format_ms(status['p50'])}/{format_ms(status['p95'])}  {status['timeout']:.1f}s"
+            )
+        await update.message.reply_text('\n'.join(lines))
+
     except Exception as e:
-        logger.error(f"Error getting top news: {traceback.format_exc()}")
-        await update.callback_query.message.edit_text(
-            "❌ Извините, произошла ошибка при получении топовых новостей.\n"
-            "Пожалуйста, попробуйте позже.",
-            reply_markup=get_back_button()
+        logger.exception("Error reporting stats")
+        await update.message.reply_text(f"❌ {type(e).__name__}: {e}")
+
+@admin_only
+async def admin_cache(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cache sizes, ages and hit rates: /cache, or drop caches: /cache clear [screens|inline|charts|exports|payloads]"""
+    try:
+        args = [arg.lower() for arg in context.args or []]
+        if args and args[0] == 'clear':
+            targets = args[1:] or ['screens', 'inline', 'charts', 'exports', 'payloads']
+            for target in targets:
+                if target == 'screens':
+                    screen_cache.invalidate()
+                elif target == 'inline':
+                    inline_memo.clear()
+                elif target == 'charts':
+                    charts.clear()
+                elif target == 'exports':
+                    exports.close()
+                elif target == 'payloads':
+                    bot_request.payloads.clear()
+                else:
+                    await update.message.reply_text(f"Unknown cache: {target}")
+                    return
+            logger.info(f"Caches cleared by admin: {', '.join(targets)}")
+            await update.message.reply_text(f"Cleared: {', '.join(targets)}")
+            return
+
+        analytics_instance = await get_analytics()
+        lookups = screen_cache.hits + screen_cache.misses
+        hit_rate = f"{screen_cache.hits / lookups:.0%}" if lookups else '-'
+        lines = [
+            f"Screens: {len(screen_cache)} cached for v{screen_version(analytics_instance)}, "
+            f"{screen_cache.hits} hits / {screen_cache.misses} misses ({hit_rate})",
+            f"Inline answers: {len(inline_memo)} memoized",
+            "Charts: " + ', '.join(f"{name} {value}" for name, value in charts.stats().items()),
+            "Exports: " + ', '.join(f"{name} {value}" for name, value in exports.stats().items()),
+            "Bot API payloads: " + ', '.join(f"{name} {value}" for name, value in bot_request.payloads.stats().items()),
+        ]
+        stamp = snapshot_store.stamp()
+        if stamp:
+            lines.append(f"Snapshot: {SNAPSHOT_PATH}, {stamp[2]} bytes, written {format_age(time.time() - stamp[1] / 1e9)} ago")
+
+        lines.append("\nDataset  age")
+        for endpoint, snapshot in analytics_instance.snapshots.items():
+            lines.append(f"{endpoint}  {format_age((datetime.now() - snapshot['fetched_at']).total_seconds())}")
+        await update.message.reply_text('\n'.join(lines))
+
+    except Exception as e:
+        logger.exception("Error reporting caches")
+        await update.message.reply_text(f"❌ {type(e).__name__}: {e}")
+
+@admin_only
+async def admin_refresh(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Refetch all datasets: /refresh, or one of them: /refresh niche_analysis"""
+    try:
+        analytics_instance = await get_analytics()
+        started = time.perf_counter()
+        if context.args:
+            endpoint = context.args[0]
+            try:
+                await analytics_instance.refresh_endpoint(endpoint)
+            except KeyError:
+                await update.message.reply_text(
+                    f"Unknown dataset. Known: {', '.join(ENDPOINTS)}"
+                )
+                return
+        else:
+            endpoint = 'all datasets'
+            await analytics_instance.refresh()
+        if ANALYTICS_ROLE != 'reader':
+            await persist_snapshot(analytics_instance)
+        logger.info(f"Admin refresh of {endpoint} took {time.perf_counter() - started:.2f}s")
+        await update.message.reply_text(
+            f"Refreshed {endpoint} in {time.perf_counter() - started:.2f}s, data v{analytics_instance.data_version}"
         )
 
+    except Exception as e:
+        logger.exception("Error refreshing on admin request")
+        await update.message.reply_text(f"❌ {type(e).__name__}: {e}")
+
+def format_profile(result):
+    lines = [f"Profile: {result['samples']} samples in {result['elapsed']:.1f}s", "", "Time by handler type:"]
+    lines += [f"{share:6.1%}  {label}" for label, share in result['by_label']]
+    lines += ["", "Hottest frames (excluding idle):"]
+    lines += [f"{share:6.1%}  {frame}" for frame, share in result['hottest']]
+    lines += ["", f"Collapsed stacks: {result['path']}"]
+    return '\n'.join(lines)
+
+async def report_profile(message=None):
+    """Wait for the profiling window to end, then log the summary and send it to the admin who asked"""
+    result = await profiler.wait()
+    if result is None:
+        return
+    logger.info(format_profile(result))
+    if message is not None:
+        await message.reply_text(format_profile(result))
+
+@admin_only
+async def admin_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sample the event loop for a while: /profile [seconds]"""
+    try:
+        seconds = min(int(context.args[0]), MAX_PROFILE_SECONDS) if context.args else 30
+        if profiler.running:
+            await update.message.reply_text("Profiler is already running")
+            return
+        profiler.start(seconds)
+        # Report from a background task: the handler would otherwise take one of the CONCURRENT_UPDATES slots for the whole window
+        context.application.create_task(report_profile(update.message))
+        await update.message.reply_text(f"Profiling for {seconds}s, the report follows")
+
+    except Exception as e:
+        logger.exception("Error starting the profiler")
+        await update.message.reply_text(f"❌ {type(e).__name__}: {e}")
+
+async def persist_snapshot(analytics_instance):
+    """Pre-render every screen for the current data version and save them with the datasets"""
+    await analytics_instance.topic_model.wait()
+    for tr in templates.locales.values():
+        for screen in SCREENS:
+            try:
+                await render_screen(analytics_instance, screen, tr)
+            except Exception as e:
+                logger.exception(f"Error pre-rendering {screen} screen ({tr.code})")
+
+    sections = {'analytics': analytics_instance.export_state(), 'screens': screen_cache.dump()}
+    try:
+        await asyncio.to_thread(snapshot_store.save, analytics_instance.data_version, sections)
+    except Exception as e:
+        logger.exception("Error saving snapshot")
+
+async def restore_snapshot(analytics_instance):
+    """Load persisted datasets and screens; returns True if the bot can serve them right away"""
+    started = time.perf_counter()
+    snapshot = await asyncio.to_thread(snapshot_store.load)
+    if snapshot is None:
+        return False
+    try:
+        if not analytics_instance.restore(snapshot['sections'].get('analytics', {})):
+            return False
+        screen_cache.load(snapshot['sections'].get('screens', {}))
+    except Exception as e:
+        logger.exception("Error restoring snapshot")
+        return False
+    logger.info(
+        f"Restored data v{snapshot['version']} saved at {snapshot['saved_at']} "
+        f"with {len(screen_cache)} screens in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+    return True
+
+async def follow_snapshots():
+    """Reader role: pick up every dataset version the refresher publishes instead of fetching upstream"""
+    stamp = snapshot_store.stamp()
+    while True:
+        await asyncio.sleep(SHARED_POLL_INTERVAL)
+        try:
+            current = snapshot_store.stamp()
+            if current is None or current == stamp:
+                continue
+            stamp = current
+            analytics_instance = await get_analytics()
+            await restore_snapshot(analytics_instance)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Error following published snapshots")
+
 async def cleanup():
     """Cleanup resources"""
+    global analytics, subscriptions
     if analytics:
         await analytics.close()
+        analytics = None
+    if subscriptions:
+        subscriptions.close()
+        subscriptions = None
+    charts.close()
+    exports.close()
 
 def main():
     """Start the bot"""
+    log_listener = setup_logging(LOG_LEVEL, LOG_FORMAT)
     lock_file = acquire_lock()
     
     try:
@@ -773,15 +1533,26 @@ def main():
         application = (
             Application.builder()
             .token(TELEGRAM_TOKEN)
-            .read_timeout(30)
-            .write_timeout(30)
-            .connect_timeout(30)
+            .request(bot_request)
+            .get_updates_request(updates_request)
+            .concurrent_updates(CONCURRENT_UPDATES)
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
             .build()
         )
 
         # Add handlers
-        application.add_handler(CommandHandler("start", start))
-        application.add_handler(CallbackQueryHandler(button_handler))
+        application.add_handler(CommandHandler("start", timed(start)))
+        application.add_handler(CommandHandler("channel", timed(channel_search)))
+        application.add_handler(CommandHandler("subscribe", timed(subscribe)))
+        application.add_handler(CommandHandler("unsubscribe", timed(unsubscribe)))
+        application.add_handler(CommandHandler("export", timed(export_dataset)))
+        application.add_handler(CommandHandler("stats", admin_stats))
+        application.add_handler(CommandHandler("cache", admin_cache))
+        application.add_handler(CommandHandler("refresh", admin_refresh))
+        application.add_handler(CommandHandler("profile", admin_profile))
+        application.add_handler(CallbackQueryHandler(coalesced(timed(button_handler))))
+        application.add_handler(InlineQueryHandler(timed(inline_query)))
 
         # Start the bot with error handling
         try:
@@ -793,20 +1564,21 @@ def main():
                 close_loop=False
             )
         except Exception as e:
-            logger.error(f"Error running bot: {traceback.format_exc()}")
+            logger.exception("Error running bot")
             print(f"ERROR RUNNING BOT: {str(e)}")
-        finally:
-            # Cleanup resources
-            asyncio.get_event_loop().run_until_complete(cleanup())
-            
+
+    except Exception:
+        # Logged here, while the listener still writes records
+        logger.exception("Fatal error in main")
+        raise
     finally:
         # Always release the lock when the program exits
         release_lock(lock_file)
+        log_listener.stop()
 
 if __name__ == '__main__':
     try:
         main()
     except Exception as e:
-        logger.error(f"Fatal error in main: {traceback.format_exc()}")
         print(f"FATAL ERROR: {str(e)}")
         sys.exit(1) 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _figure(title, height=4.5):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, height), dpi=100)
+    ax.set_title(title)
+    ax.grid(axis='x', alpha=0.3)
+    return fig, ax
+
+
+def _png(fig):
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def draw_shares(title, labels, values):
+    """Horizontal bars of counts per label, largest on top"""
+    fig, ax = _figure(title)
+    ax.barh(labels[::-1], values[::-1], color='#4a90d9')
+    for y, value in enumerate(values[::-1]):
+        ax.annotate(f"{value:,}", (value, y), xytext=(3, 0), textcoords='offset points', va='center')
+    return _png(fig)
+
+
+def draw_grouped(title, labels, series):
+    """Horizontal bars of several {name: values} series side by side per label"""
+    fig, ax = _figure(title, height=1.2 + len(labels) * 0.25 * len(series))
+    height = 0.8 / len(series)
+    for i, (name, values) in enumerate(series.items()):
+        positions = [y + (len(series) - 1 - i) * height for y in range(len(labels))]
+        ax.barh(positions, values[::-1], height=height, label=name)
+    ax.set_yticks([y + (len(series) - 1) * height / 2 for y in range(len(labels))])
+    ax.set_yticklabels(labels[::-1])
+    ax.legend()
+    return _png(fig)
+
+
+CHARTS = {'shares': draw_shares, 'grouped': draw_grouped}
+
+
+class ChartRenderer:
+    """PNG charts drawn in worker processes and cached per data version.
+
+    After the first upload of an image, Telegram's file_id is remembered so
+    that later sends of the same chart neither render nor upload it again.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+        self._images = {}       # (chart, locale) -> (version, png)
+        self._file_ids = {}     # (chart, locale) -> (version, file_id)
+        self._pending = {}      # (chart, locale, version) -> future of the png
+        self._upload_locks = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            # The bot runs threads (log listener, HTTP client) whose locks a forked worker could copy
+            # while held; forkserver workers start from a clean single-threaded server instead
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('forkserver')
+            )
+        return self._executor
+
+    def upload_lock(self, key):
+        """Held while a chart is sent, so that concurrent requests wait for one upload and reuse its file_id"""
+        return self._upload_locks.setdefault(key, asyncio.Lock())
+
+    def file_id(self, key, version):
+        """Telegram file_id of an uploaded chart, or None if it was not uploaded for this version"""
+        entry = self._file_ids.get(key)
+        return entry[1] if entry and entry[0] == version else None
+
+    def remember(self, key, version, file_id):
+        self._file_ids[key] = (version, file_id)
+        # The bytes are not needed once Telegram has the image
+        self._images.pop(key, None)
+
+    def forget(self, key):
+        self._file_ids.pop(key, None)
+
+    async def render(self, key, version, kind, *args):
+        """PNG of a chart, drawn once per key and version however many users ask at the same time"""
+        entry = self._images.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+        pending = self._pending.get((key, version))
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self._get_executor(), CHARTS[kind], *args)
+            self._pending[(key, version)] = pending
+            pending.add_done_callback(lambda future: self._finish(key, version, future))
+        # A user who gives up waiting must not cancel the render for everyone else
+        return await asyncio.shield(pending)
+
+    def _finish(self, key, version, future):
+        del self._pending[(key, version)]
+        if future.cancelled() or future.exception() is not None:
+            return
+        png = future.result()
+        self._images[key] = (version, png)
+        logging.info(f"Rendered chart {key[0]} ({key[1]}) for data v{version}: {len(png)} bytes")
+
+    def clear(self):
+        """Drop cached images and file_ids so that the next request draws and uploads again"""
+        self._images.clear()
+        self._file_ids.clear()
+
+    def stats(self):
+        return {'images': len(self._images), 'uploaded': len(self._file_ids), 'rendering': len(self._pending)}
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
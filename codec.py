@@ -0,0 +1,310 @@
+import struct
+import sys
+from array import array
+
+from utils import format_number, parse_number
+
+MAGIC = b'TGC'
+FORMAT_VERSION = 1
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STRING, _LIST, _DICT, _TABLE = range(9)
+
+# Column kinds of a table
+_ENUM, _INTS, _FLOATS, _NUMBER_TEXT, _SIGNED_TEXT, _VALUES = range(6)
+
+_DOUBLE = struct.Struct('<d')
+
+
+class CodecError(ValueError):
+    """Raised when a buffer is not a snapshot of a supported format"""
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_array(out, values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    _write_varint(out, len(values))
+    out.append(ord(values.typecode))
+    out += values.tobytes()
+
+
+def _read_array(data, pos):
+    length, pos = _read_varint(data, pos)
+    values = array(chr(data[pos]))
+    pos += 1
+    end = pos + length * values.itemsize
+    values.frombytes(data[pos:end])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values, end
+
+
+def _code_array(codes, size):
+    """Pack enum codes into the smallest unsigned array that fits the dictionary size"""
+    for typecode in ('B', 'H', 'I', 'Q'):
+        if size < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, codes)
+
+
+def _numeric_column(values):
+    """Pack a column of display numbers like '1,245,678' or '+956' if every value round-trips exactly"""
+    if not values or not all(isinstance(value, str) for value in values):
+        return None
+    kind = _SIGNED_TEXT if values[0].startswith('+') else _NUMBER_TEXT
+    numbers = []
+    for value in values:
+        number = parse_number(value, default=None)
+        if number is None or _format_numeric(kind, number) != value:
+            return None
+        numbers.append(number)
+    if all(isinstance(number, int) for number in numbers):
+        if all(-(1 << 63) <= number < 1 << 63 for number in numbers):
+            return kind, array('q', numbers)
+        return None
+    if any(isinstance(number, int) and abs(number) >= 1 << 53 for number in numbers):
+        # Would lose precision as a double
+        return None
+    return kind, array('d', numbers)
+
+
+def _format_numeric(kind, number):
+    text = format_number(number)
+    if kind == _SIGNED_TEXT and number >= 0:
+        return '+' + text
+    return text
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings = {}       # string -> position in the string table
+
+    def intern(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def encode(self, out, value):
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int):
+            out.append(_INT)
+            # Zigzag so that small negative numbers stay short
+            _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            out.append(_STRING)
+            _write_varint(out, self.intern(value))
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            _write_varint(out, len(value))
+            for key, item in value.items():
+                _write_varint(out, self.intern(str(key)))
+                self.encode(out, item)
+        elif isinstance(value, (list, tuple)):
+            if self._is_table(value):
+                self.encode_table(out, value)
+                return
+            out.append(_LIST)
+            _write_varint(out, len(value))
+            for item in value:
+                self.encode(out, item)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__}")
+
+    @staticmethod
+    def _is_table(rows):
+        """Lists of two or more dicts with the same keys in the same order are stored by column"""
+        if len(rows) < 2 or not all(isinstance(row, dict) for row in rows):
+            return False
+        keys = list(rows[0])
+        return all(list(row) == keys for row in rows[1:])
+
+    def encode_table(self, out, rows):
+        keys = list(rows[0])
+        out.append(_TABLE)
+        _write_varint(out, len(rows))
+        _write_varint(out, len(keys))
+        for key in keys:
+            _write_varint(out, self.intern(str(key)))
+            values = [row[key] for row in rows]
+
+            if all(type(value) is int for value in values) and all(-(1 << 63) <= value < 1 << 63 for value in values):
+                out.append(_INTS)
+                _write_array(out, array('q', values))
+                continue
+            if all(type(value) is float for value in values):
+                out.append(_FLOATS)
+                _write_array(out, array('d', values))
+                continue
+
+            numeric = _numeric_column(values)
+            if numeric is not None:
+                kind, numbers = numeric
+                out.append(kind)
+                _write_array(out, numbers)
+                continue
+
+            if all(isinstance(value, str) for value in values):
+                # Categorical labels: a per-column dictionary plus small integer codes
+                labels = list(dict.fromkeys(values))
+                positions = {label: code for code, label in enumerate(labels)}
+                out.append(_ENUM)
+                _write_varint(out, len(labels))
+                for label in labels:
+                    _write_varint(out, self.intern(label))
+                _write_array(out, _code_array([positions[value] for value in values], len(labels)))
+                continue
+
+            out.append(_VALUES)
+            for value in values:
+                self.encode(out, value)
+
+
+class _Decoder:
+    def __init__(self, data, strings):
+        self.data = data
+        self.strings = strings
+
+    def decode(self, pos):
+        data = self.data
+        tag = data[pos]
+        pos += 1
+        if tag == _NONE:
+            return None, pos
+        if tag == _TRUE:
+            return True, pos
+        if tag == _FALSE:
+            return False, pos
+        if tag == _INT:
+            raw, pos = _read_varint(data, pos)
+            return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+        if tag == _FLOAT:
+            return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+        if tag == _STRING:
+            index, pos = _read_varint(data, pos)
+            return self.strings[index], pos
+        if tag == _DICT:
+            length, pos = _read_varint(data, pos)
+            result = {}
+            for _ in range(length):
+                index, pos = _read_varint(data, pos)
+                result[self.strings[index]], pos = self.decode(pos)
+            return result, pos
+        if tag == _LIST:
+            length, pos = _read_varint(data, pos)
+            result = []
+            for _ in range(length):
+                item, pos = self.decode(pos)
+                result.append(item)
+            return result, pos
+        if tag == _TABLE:
+            return self.decode_table(pos)
+        raise CodecError(f"Unknown tag {tag} at {pos - 1}")
+
+    def decode_table(self, pos):
+        data = self.data
+        row_count, pos = _read_varint(data, pos)
+        column_count, pos = _read_varint(data, pos)
+        rows = [{} for _ in range(row_count)]
+        for _ in range(column_count):
+            index, pos = _read_varint(data, pos)
+            key = self.strings[index]
+            kind = data[pos]
+            pos += 1
+
+            if kind in (_INTS, _FLOATS):
+                numbers, pos = _read_array(data, pos)
+                values = numbers.tolist()
+            elif kind in (_NUMBER_TEXT, _SIGNED_TEXT):
+                numbers, pos = _read_array(data, pos)
+                values = [_format_numeric(kind, number) for number in numbers.tolist()]
+            elif kind == _ENUM:
+                label_count, pos = _read_varint(data, pos)
+                labels = []
+                for _ in range(label_count):
+                    label, pos = _read_varint(data, pos)
+                    labels.append(self.strings[label])
+                codes, pos = _read_array(data, pos)
+                values = [labels[code] for code in codes]
+            elif kind == _VALUES:
+                values = []
+                for _ in range(row_count):
+                    value, pos = self.decode(pos)
+                    values.append(value)
+            else:
+                raise CodecError(f"Unknown column kind {kind} at {pos - 1}")
+
+            for row, value in zip(rows, values):
+                row[key] = value
+        return rows, pos
+
+
+def encode(value):
+    """Serialize JSON-like data (dicts, lists, strings, numbers) into the compact snapshot format.
+
+    Every string is stored once in a string table. Lists of records are
+    stored by column: display numbers like '1,245,678' as packed numeric
+    arrays, repeated labels like 'Высокая' as small integer codes.
+    """
+    encoder = _Encoder()
+    body = bytearray()
+    encoder.encode(body, value)
+
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    _write_varint(out, len(encoder.strings))
+    for text in encoder.strings:
+        raw = text.encode('utf-8')
+        _write_varint(out, len(raw))
+        out += raw
+    out += body
+    return bytes(out)
+
+
+def decode(data):
+    """Deserialize a buffer produced by encode(); accepts bytes, memoryview or mmap slices"""
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise CodecError("Not a snapshot buffer")
+    if data[len(MAGIC)] != FORMAT_VERSION:
+        raise CodecError(f"Unsupported snapshot format version {data[len(MAGIC)]}")
+
+    try:
+        pos = len(MAGIC) + 1
+        count, pos = _read_varint(data, pos)
+        strings = []
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            strings.append(str(data[pos:pos + length], 'utf-8'))
+            pos += length
+
+        value, _ = _Decoder(data, strings).decode(pos)
+    except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+        raise CodecError(f"Truncated or corrupt snapshot buffer: {type(e).__name__}") from e
+    return value
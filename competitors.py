@@ -0,0 +1,100 @@
+import logging
+
+import numpy as np
+
+from utils import parse_number, parse_post_frequency
+
+
+class CompetitorEngine:
+    """Nearest-neighbour search over channel metrics.
+
+    The feature matrix is built once per refresh: standardized size, ERR,
+    growth and post frequency plus a weighted one-hot category block.
+    A query computes its distances to every channel with a single matrix
+    product, so finding competitors is a few vector operations even over a
+    large channel universe.
+    """
+
+    FEATURE_WEIGHTS = {
+        'size': 1.0,
+        'err': 1.0,
+        'growth': 0.8,
+        'frequency': 0.6,
+    }
+    CATEGORY_WEIGHT = 2.0
+    CACHE_SIZE = 4096
+
+    def __init__(self, channels, version=0):
+        self.channels = channels
+        self.version = version
+        self.row_ids = {channel['username']: row_id for row_id, channel in enumerate(channels)}
+        self.categories = sorted({channel.get('category', '') for channel in channels})
+        self.metrics = self._build_metrics(channels)
+        self.features = self._build_features(channels)
+        self.norms = np.einsum('ij,ij->i', self.features, self.features)
+        self._cache = {}
+        logging.info(f"Built competitor matrix v{version}: {self.features.shape[0]}x{self.features.shape[1]}")
+
+    def _build_metrics(self, channels):
+        """Raw numeric metrics per channel, one column per feature"""
+        subscribers = np.array([parse_number(c.get('subscribers')) for c in channels], dtype=np.float64)
+        growth_7d = np.array([parse_number(c.get('growth_7d')) for c in channels], dtype=np.float64)
+        return {
+            'size': np.log10(np.maximum(subscribers, 1.0)),
+            'err': np.array([parse_number(c.get('err')) for c in channels], dtype=np.float64),
+            'growth': growth_7d / np.maximum(subscribers, 1.0) * 100,
+            'frequency': np.log1p([parse_post_frequency(c.get('post_frequency')) for c in channels]),
+        }
+
+    def _build_features(self, channels):
+        """Standardize metrics and append the category block"""
+        columns = []
+        for name, weight in self.FEATURE_WEIGHTS.items():
+            values = self.metrics[name]
+            std = values.std()
+            scaled = (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+            columns.append(scaled * weight)
+
+        category_ids = {category: i for i, category in enumerate(self.categories)}
+        one_hot = np.zeros((len(channels), len(self.categories)), dtype=np.float64)
+        if len(channels):
+            rows = np.arange(len(channels))
+            one_hot[rows, [category_ids[c.get('category', '')] for c in channels]] = self.CATEGORY_WEIGHT
+
+        return np.ascontiguousarray(np.column_stack(columns + [one_hot]), dtype=np.float32)
+
+    def neighbours(self, row_ids, k=5):
+        """Return (indices, distances) of the k nearest channels for each row, excluding the row itself"""
+        row_ids = np.asarray(row_ids, dtype=np.intp)
+        k = min(k, len(self.channels) - 1)
+        if k <= 0 or not len(row_ids):
+            return np.empty((len(row_ids), 0), dtype=np.intp), np.empty((len(row_ids), 0))
+
+        # ||a - b||^2 = ||a||^2 + ||b||^2 - 2ab, computed for the whole batch at once
+        queries = self.features[row_ids]
+        distances = self.norms[row_ids, None] + self.norms[None, :] - 2.0 * (queries @ self.features.T)
+        distances[np.arange(len(row_ids)), row_ids] = np.inf
+        np.maximum(distances, 0, out=distances)
+
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1)
+        return np.take_along_axis(nearest, order, axis=1), np.sqrt(np.take_along_axis(nearest_distances, order, axis=1))
+
+    def find(self, username, k=5):
+        """Return [(channel, similarity %)] competitors of a channel, or None if the channel is unknown"""
+        row_id = self.row_ids.get(str(username).lstrip('@'))
+        if row_id is None:
+            return None
+
+        cache_key = (row_id, k)
+        if cache_key not in self._cache:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            indices, distances = self.neighbours([row_id], k)
+            self._cache[cache_key] = list(zip(indices[0].tolist(), distances[0].tolist()))
+
+        return [
+            (self.channels[neighbour], round(100 / (1 + distance), 1))
+            for neighbour, distance in self._cache[cache_key]
+        ]
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from telegram.error import BadRequest, Forbidden, RetryAfter
+
+FREQUENCIES = ('daily', 'hourly')
+
+# Chat ids of groups are negative, so a fresh broadcast starts below all of them
+START_CURSOR = -2 ** 63
+
+
+class SubscriptionStore:
+    """Digest subscriptions and broadcast progress in a SQLite database.
+
+    Each broadcast of a (frequency, slot) pair, e.g. ('daily', '2024-05-01'),
+    records the last chat id it delivered to. Subscribers are walked in chat
+    id order, so a broadcast interrupted by a restart resumes after that
+    chat instead of starting over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                chat_id INTEGER PRIMARY KEY,
+                frequency TEXT NOT NULL,
+                locale TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS subscriptions_by_frequency ON subscriptions (frequency, chat_id);
+            CREATE TABLE IF NOT EXISTS broadcasts (
+                frequency TEXT NOT NULL,
+                slot TEXT NOT NULL,
+                cursor INTEGER NOT NULL,
+                sent INTEGER NOT NULL DEFAULT 0,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                PRIMARY KEY (frequency, slot)
+            );
+        """)
+        self._db.commit()
+
+    def subscribe(self, chat_id, frequency, locale):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?, ?)",
+                (chat_id, frequency, locale, datetime.now().isoformat())
+            )
+
+    def unsubscribe(self, chat_id):
+        """Remove a subscription; returns False if the chat was not subscribed"""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,)).rowcount > 0
+
+    def count(self):
+        """Number of subscribers per frequency"""
+        with self._lock:
+            return dict(self._db.execute("SELECT frequency, COUNT(*) FROM subscriptions GROUP BY frequency"))
+
+    def pending(self, frequency, after):
+        """Number of subscribers of a frequency after a chat id"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM subscriptions WHERE frequency = ? AND chat_id > ?", (frequency, after)
+            ).fetchone()[0]
+
+    def subscribers(self, frequency, after, limit):
+        """Next (chat_id, locale) pairs of a frequency after a chat id, in chat id order"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT chat_id, locale FROM subscriptions WHERE frequency = ? AND chat_id > ? "
+                "ORDER BY chat_id LIMIT ?",
+                (frequency, after, limit)
+            ).fetchall()
+
+    def begin(self, frequency, slot):
+        """Start or resume the broadcast of a slot; returns its cursor, or None if it already finished"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO broadcasts (frequency, slot, cursor, started_at) VALUES (?, ?, ?, ?)",
+                (frequency, slot, START_CURSOR, datetime.now().isoformat())
+            )
+            cursor, finished_at = self._db.execute(
+                "SELECT cursor, finished_at FROM broadcasts WHERE frequency = ? AND slot = ?", (frequency, slot)
+            ).fetchone()
+        return None if finished_at else cursor
+
+    def advance(self, frequency, slot, cursor, sent, gone=()):
+        """Record a delivered batch and drop the chats that blocked the bot, in one transaction"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE broadcasts SET cursor = ?, sent = sent + ? WHERE frequency = ? AND slot = ?",
+                (cursor, sent, frequency, slot)
+            )
+            self._db.executemany("DELETE FROM subscriptions WHERE chat_id = ?", [(chat_id,) for chat_id in gone])
+
+    def finish(self, frequency, slot):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE broadcasts SET finished_at = ? WHERE frequency = ? AND slot = ?",
+                (datetime.now().isoformat(), frequency, slot)
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RateLimiter:
+    """Global messages-per-second limit plus a minimum interval between messages to the same chat.
+
+    Slots are reserved in call order before sleeping, so concurrent senders
+    are served first come, first served.
+    """
+
+    def __init__(self, rate=25, per_chat_interval=1.0):
+        self.interval = 1 / rate
+        self.per_chat_interval = per_chat_interval
+        self._next = 0.0
+        self._chat_next = {}
+
+    async def acquire(self, chat_id):
+        now = time.monotonic()
+        at = max(now, self._next, self._chat_next.get(chat_id, 0.0))
+        self._next = at + self.interval
+        self._chat_next[chat_id] = at + self.per_chat_interval
+        if len(self._chat_next) > 10000:
+            self._chat_next = {chat: ready for chat, ready in self._chat_next.items() if ready > now}
+        if at > now:
+            await asyncio.sleep(at - now)
+
+    def pause(self, seconds):
+        """Hold all further sends, e.g. after Telegram's flood control"""
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+class DigestScheduler:
+    """Delivers the digest to every subscriber once per daily or hourly slot.
+
+    The digest is rendered once per locale for each broadcast by the
+    `render(locale)` coroutine; subscribers are fetched and delivered in
+    batches, with progress committed after every batch.
+    """
+
+    def __init__(self, store, bot, render, daily_hour=9, rate=25, batch_size=50, tick=30):
+        self.store = store
+        self.bot = bot
+        self.render = render
+        self.daily_hour = daily_hour
+        self.batch_size = batch_size
+        self.tick = tick
+        self.limiter = RateLimiter(rate=rate)
+        self.progress = None    # the running broadcast: frequency, slot, sent, remaining
+
+    def due_slot(self, frequency, now):
+        """Slot that should have been delivered by now, or None before the daily hour"""
+        if frequency == 'hourly':
+            return now.strftime('%Y-%m-%dT%H')
+        if now.hour >= self.daily_hour:
+            return now.strftime('%Y-%m-%d')
+        return None
+
+    async def run(self):
+        while True:
+            for frequency in FREQUENCIES:
+                slot = self.due_slot(frequency, datetime.now())
+                if slot is None:
+                    continue
+                try:
+                    await self.broadcast(frequency, slot)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Digest broadcast {frequency} {slot} failed, will resume: {e}")
+                    self.progress = None
+            await asyncio.sleep(self.tick)
+
+    async def broadcast(self, frequency, slot):
+        cursor = await asyncio.to_thread(self.store.begin, frequency, slot)
+        if cursor is None:
+            return
+        started = time.monotonic()
+        texts = {}
+        total = 0
+        remaining = await asyncio.to_thread(self.store.pending, frequency, cursor)
+        self.progress = {'frequency': frequency, 'slot': slot, 'sent': 0, 'remaining': remaining}
+        while True:
+            batch = await asyncio.to_thread(self.store.subscribers, frequency, cursor, self.batch_size)
+            if not batch:
+                break
+            for chat_id, locale in batch:
+                if locale not in texts:
+                    texts[locale] = await self.render(locale)
+            results = {}
+
+            async def send(i, chat_id, text):
+                results[i] = await self.deliver(chat_id, text)
+
+            try:
+                await asyncio.gather(*(send(i, chat_id, texts[locale]) for i, (chat_id, locale) in enumerate(batch)))
+            except asyncio.CancelledError:
+                # Shutting down: keep the progress of the batch so far so that the restart re-sends nothing
+                self._advance(frequency, slot, batch, results)
+                raise
+            total += await asyncio.to_thread(self._advance, frequency, slot, batch, results)
+            cursor = batch[-1][0]
+            self.progress.update(sent=total, remaining=max(0, self.progress['remaining'] - len(batch)))
+        await asyncio.to_thread(self.store.finish, frequency, slot)
+        self.progress = None
+        if total:
+            logging.info(f"Digest {frequency} {slot} delivered to {total} chats in {time.monotonic() - started:.1f}s")
+
+    def _advance(self, frequency, slot, batch, results):
+        """Commit the leading part of a batch that has been attempted; returns the number delivered"""
+        done = 0
+        while done in results:
+            done += 1
+        if not done:
+            return 0
+        outcomes = [results[i] for i in range(done)]
+        gone = [chat_id for (chat_id, _), result in zip(batch, outcomes) if result is False]
+        sent = sum(1 for result in outcomes if result)
+        self.store.advance(frequency, slot, batch[done - 1][0], sent, gone)
+        return sent
+
+    async def deliver(self, chat_id, text):
+        """Send to one chat: True if delivered, False if the chat is gone, None on other errors"""
+        for attempt in range(3):
+            await self.limiter.acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id, text)
+                return True
+            except RetryAfter as e:
+                self.limiter.pause(e.retry_after)
+            except Forbidden:
+                return False
+            except BadRequest as e:
+                if 'chat not found' in str(e).lower():
+                    return False
+                logging.warning(f"Digest to {chat_id} rejected: {e}")
+                return None
+            except Exception as e:
+                logging.warning(f"Digest to {chat_id} failed: {e}")
+                return None
+        return None
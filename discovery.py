@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+from utils import parse_number
+
+
+class BloomFilter:
+    """Probabilistic set of seen keys: no false negatives, memory fixed by capacity and error rate"""
+
+    def __init__(self, capacity=2_000_000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        """Add a key; returns True if it was not (probably) present before"""
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+class ChannelDiscovery:
+    """Tracks channel sightings to find newly created channels.
+
+    Every sighting is checked against a Bloom filter of all channels ever
+    seen, so the cost per sighting does not grow with the universe. Only
+    channels first seen within the survival horizon are kept in memory
+    with their first/last sighting and their size at the first sighting a
+    week in, which is enough for creation counts per category, first-week
+    growth and one-week survival.
+    """
+
+    SURVIVAL_PERIOD = timedelta(days=7)
+    RETENTION = timedelta(days=15)
+
+    def __init__(self, capacity=2_000_000, error_rate=0.001):
+        self.seen = BloomFilter(capacity, error_rate)
+        self.recent = {}            # username -> first/last sighting of recently created channels
+
+    def observe(self, channels, now=None, seed=False):
+        """Ingest channel sightings; with seed=True mark them known without counting them as new"""
+        now = now or datetime.now()
+        created = 0
+        for channel in channels:
+            username = str(channel.get('username') or '').lstrip('@').lower()
+            if not username:
+                continue
+
+            record = self.recent.get(username)
+            if record is not None:
+                record['last_seen'] = now
+                record['last_subscribers'] = parse_number(channel.get('subscribers'))
+                # The first sighting a week after creation fixes the first-week growth
+                if record['week_subscribers'] is None and now - record['first_seen'] >= self.SURVIVAL_PERIOD:
+                    record['week_subscribers'] = record['last_subscribers']
+                continue
+
+            if not self.seen.add(username) or seed:
+                continue
+
+            category = channel.get('category') or 'Другие'
+            subscribers = parse_number(channel.get('subscribers'))
+            self.recent[username] = {
+                'category': category,
+                'first_seen': now,
+                'last_seen': now,
+                'first_subscribers': subscribers,
+                'last_subscribers': subscribers,
+                'week_subscribers': None,
+                'initial_posts': parse_number(channel.get('posts_count'), default=None),
+            }
+            created += 1
+
+        self._expire(now)
+        if created:
+            logging.info(f"Discovered {created} new channels")
+        return created
+
+    def _expire(self, now):
+        """Forget channels first seen before the retention period"""
+        horizon = now - self.RETENTION
+        for username in [name for name, record in self.recent.items() if record['first_seen'] < horizon]:
+            del self.recent[username]
+
+    def stats(self, now=None):
+        """Return new channel statistics in the shape of get_new_channels_stats.
+
+        Rates are percentages and growth is in subscribers, None where there is nothing to measure yet"""
+        now = now or datetime.now()
+        day_ago = now - timedelta(days=1)
+        created_24h = [record for record in self.recent.values() if record['first_seen'] >= day_ago]
+        created_prev = sum(1 for record in self.recent.values() if day_ago - timedelta(days=1) <= record['first_seen'] < day_ago)
+
+        by_category = Counter(record['category'] for record in created_24h)
+        total = len(created_24h)
+        stats = {
+            'total_created_24h': total,
+            'by_category': [
+                {'category': category, 'count': count, 'share': f"{count / total * 100:.1f}%"}
+                for category, count in by_category.most_common()
+            ],
+            'growth_rate': (total - created_prev) / created_prev * 100 if created_prev else None,
+        }
+
+        initial_posts = [record['initial_posts'] for record in created_24h if record['initial_posts'] is not None]
+        stats['avg_initial_posts'] = round(sum(initial_posts) / len(initial_posts), 1) if initial_posts else None
+
+        # Channels old enough to judge their first week
+        week_ago = now - self.SURVIVAL_PERIOD
+        cohort = [record for record in self.recent.values() if record['first_seen'] <= week_ago]
+        if cohort:
+            survived = [record for record in cohort if record['last_seen'] - record['first_seen'] >= self.SURVIVAL_PERIOD]
+            growth = sum(record['week_subscribers'] - record['first_subscribers'] for record in survived)
+            stats['survival_rate'] = len(survived) / len(cohort) * 100
+            stats['avg_growth_first_week'] = growth / len(survived) if survived else None
+        else:
+            stats['survival_rate'] = None
+            stats['avg_growth_first_week'] = None
+        return stats
@@ -0,0 +1,122 @@
+import asyncio
+import csv
+import io
+import logging
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('csv', 'parquet') if pyarrow is not None else ('csv',)
+
+# Rows written per chunk, and the size above which a file spills from memory to disk
+CHUNK_ROWS = 1000
+SPOOL_SIZE = 1024 * 1024
+
+
+def niche_rows(niches):
+    """Flatten the niche analysis into one row per niche"""
+    for name, niche in niches.items():
+        row = {'niche': name}
+        row.update((key, value) for key, value in niche.items() if not isinstance(value, (dict, list)))
+        for group in ('engagement_metrics', 'audience'):
+            row.update((f"{group}.{key}", value) for key, value in niche.get(group, {}).items())
+        row['content_recommendations'] = '; '.join(niche.get('content_recommendations', []))
+        yield row
+
+
+def _chunks(rows, size=CHUNK_ROWS):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(rows, file):
+    """Write dict rows as UTF-8 CSV chunk by chunk; the header comes from the first row"""
+    # utf-8-sig so that Excel detects the encoding of Cyrillic text
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    writer = None
+    for chunk in _chunks(rows):
+        if writer is None:
+            writer = csv.DictWriter(text, fieldnames=list(chunk[0]), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerows(chunk)
+    text.flush()
+    # Hand the binary file back to the caller instead of closing it with the wrapper
+    text.detach()
+
+
+def write_parquet(rows, file):
+    """Write dict rows as Parquet, one row group per chunk"""
+    writer = None
+    for chunk in _chunks(rows):
+        table = pyarrow.Table.from_pylist(chunk)
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(file, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is not None:
+        writer.close()
+
+
+WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+
+class ExportCache:
+    """Dataset exports, each built once per data version into a spooled temporary file"""
+
+    def __init__(self):
+        self._files = {}        # (dataset, format) -> (version, file, size)
+        self._file_ids = {}     # (dataset, format) -> (version, Telegram file_id)
+        self._locks = {}
+
+    def lock(self, key):
+        """Held while an export is built and sent, so that it is built and uploaded only once"""
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    def get(self, key, version):
+        """The export rewound to its start, or None if it is missing or stale"""
+        entry = self._files.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        entry[1].seek(0)
+        return entry[1]
+
+    def build(self, key, version, rows):
+        """Stream rows into a new export file and cache it, replacing the previous version"""
+        file = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        WRITERS[key[1]](rows, file)
+        size = file.tell()
+        previous = self._files.get(key)
+        self._files[key] = (version, file, size)
+        if previous is not None:
+            previous[1].close()
+        logging.info(f"Exported {key[0]} as {key[1]} for data v{version}: {size} bytes")
+        file.seek(0)
+        return file
+
+    def file_id(self, key, version):
+        entry = self._file_ids.get(key)
+        return entry[1] if entry and entry[0] == version else None
+
+    def remember(self, key, version, file_id):
+        self._file_ids[key] = (version, file_id)
+
+    def forget(self, key):
+        self._file_ids.pop(key, None)
+
+    def stats(self):
+        return {'files': len(self._files), 'bytes': sum(size for _, _, size in self._files.values()), 'uploaded': len(self._file_ids)}
+
+    def close(self):
+        """Delete the cached files; later requests build them again"""
+        for _, file, _ in self._files.values():
+            file.close()
+        self._files.clear()
+        self._file_ids.clear()
@@ -0,0 +1,102 @@
+import logging
+from array import array
+
+from utils import parse_number
+
+
+class ChannelIndex:
+    """Secondary indexes over the channels dataset, built once per refresh.
+
+    Every facet value maps to a compact sorted array of row ids, so filtered
+    and faceted queries become set intersections instead of full scans.
+    """
+
+    FACETS = ('category', 'content_type', 'monetization', 'competition')
+    SORT_KEYS = ('err', 'subscribers', 'growth_24h', 'growth_7d', 'avg_views', 'avg_forwards')
+
+    def __init__(self, channels, version=0):
+        self.channels = channels
+        self.version = version
+        self.postings = {facet: {} for facet in self.FACETS}
+        self.orders = {}
+        self.ranks = {}
+
+        for row_id, channel in enumerate(channels):
+            for facet in self.FACETS:
+                value = channel.get(facet)
+                if value is not None:
+                    self.postings[facet].setdefault(value, array('I')).append(row_id)
+
+        # Precompute ordering for every sortable metric (rank 0 = highest value)
+        for key in self.SORT_KEYS:
+            values = [parse_number(channel.get(key)) for channel in channels]
+            order = sorted(range(len(channels)), key=values.__getitem__, reverse=True)
+            rank = array('I', bytes(4 * len(channels)))
+            for position, row_id in enumerate(order):
+                rank[row_id] = position
+            self.orders[key] = array('I', order)
+            self.ranks[key] = rank
+
+        logging.info(f"Built channel index v{version}: {len(channels)} rows, "
+                     f"{sum(len(p) for p in self.postings.values())} facet values")
+
+    def __len__(self):
+        return len(self.channels)
+
+    def values(self, facet):
+        """Return all distinct values of a facet"""
+        return list(self.postings[facet])
+
+    def _posting(self, facet, value):
+        """Return the row id set for one facet value or a union of several values"""
+        postings = self.postings[facet]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            rows = set()
+            for item in value:
+                rows.update(postings.get(item, ()))
+            return rows
+        return set(postings.get(value, ()))
+
+    def lookup(self, **facets):
+        """Return row ids matching all given facets, e.g. lookup(category='Технологии', monetization='Высокая')"""
+        unknown = set(facets) - set(self.FACETS)
+        if unknown:
+            raise ValueError(f"Unknown facets: {', '.join(sorted(unknown))}")
+
+        if not facets:
+            return list(range(len(self.channels)))
+
+        # Intersect starting from the most selective facet
+        sets = sorted((self._posting(facet, value) for facet, value in facets.items()), key=len)
+        rows = sets[0]
+        for other in sets[1:]:
+            if not rows:
+                break
+            rows = rows.intersection(other)
+        return sorted(rows)
+
+    def query(self, sort_by=None, limit=None, **facets):
+        """Return channels matching the facets, optionally sorted by a metric in descending order"""
+        rows = self.lookup(**facets)
+        if sort_by is not None:
+            rows.sort(key=self.ranks[sort_by].__getitem__)
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.channels[row_id] for row_id in rows]
+
+    def top(self, sort_by, limit=None):
+        """Return channels ordered by a metric without filtering"""
+        order = self.orders[sort_by]
+        if limit is not None:
+            order = order[:limit]
+        return [self.channels[row_id] for row_id in order]
+
+    def facet_counts(self, facet, **facets):
+        """Count matching channels per value of a facet, e.g. categories among high-monetization channels"""
+        rows = set(self.lookup(**facets)) if facets else None
+        counts = {}
+        for value, posting in self.postings[facet].items():
+            count = len(posting) if rows is None else len(rows.intersection(posting))
+            if count:
+                counts[value] = count
+        return counts
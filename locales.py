@@ -0,0 +1,628 @@
+# Screen templates per locale, str.format syntax; compiled once by templates.TemplateEngine.
+# Every locale must use the same fields as 'ru' for a key; missing keys fall back to 'ru'.
+
+TEMPLATES = {
+    'ru': {
+        'common.na': "н/д",
+        'common.new': "новое",
+        'common.percent': "{value:.0f}%",
+        'common.percent_change': "{value:+.1f}%",
+        'common.today': "Сегодня",
+        'common.unavailable': "Недоступно",
+        'common.weekdays': "Пн Вт Ср Чт Пт Сб Вс",
+        'common.niche': "📋 {niche}\n",
+        'common.numbered': "{i}. {text}\n",
+
+        'status.loading': "🔄 {text}...\nПожалуйста, подождите...",
+        'status.no_data': "😕 Извините, {text}.\n\nПожалуйста, попробуйте позже.",
+        'status.error': "❌ Извините, {text}.\nПожалуйста, попробуйте позже.",
+
+        'menu.welcome': (
+            "👋 Добро пожаловать в Telegram Analytics Bot!\n\n"
+            "В связи с ограничениями API, мы показываем демо-данные.\n\n"
+            "Выберите опцию:"
+        ),
+        'menu.start_error': (
+            "❌ Извините, произошла ошибка при запуске бота.\n"
+            "Пожалуйста, попробуйте позже или свяжитесь с поддержкой, если проблема сохраняется."
+        ),
+        'menu.top_50': "📊 Топ-20 каналов",
+        'menu.best_posts': "🔥 15 лучших постов",
+        'menu.niche_analysis': "📈 Анализ ниш",
+        'menu.new_channels': "📱 Новые каналы",
+        'menu.channel_advice': "🚀 Советы по созданию",
+        'menu.trends': "🔍 Текущие тренды",
+        'menu.posting_time': "⏰ Оптимальное время постинга",
+        'menu.content_ideas': "📝 Идеи для контента",
+        'menu.competitor_analysis': "🔎 Анализ конкурентов",
+        'menu.content_strategy': "📋 Контент-стратегия",
+        'menu.overall_24h': "📊 Сводка за 24ч",
+        'menu.top_news': "📰 Топовые новости",
+        'menu.back': "◀️ Назад в меню",
+        'menu.back_prompt': "Вернуться в главное меню:",
+
+        'channel.card': (
+            "{name} (@{username})\n"
+            "👥 {subscribers} подписчиков\n"
+            "📈 Рост: {growth_24h} (24ч) | {growth_7d} (7д)\n"
+            "📊 ERR: {err}% | 👁 {avg_views} просмотров\n"
+            "📋 Категория: {category} | 📝 Контент: {content_type}\n"
+            "📢 Частота постов: {post_frequency} | 💰 Монетизация: {monetization}\n"
+            "🔄 Репосты: {avg_forwards} | 🏆 Конкуренция: {competition}\n"
+        ),
+
+        'search.usage': "🔎 Укажите название или username канала.\nНапример: /channel durov",
+        'search.not_found': "😕 Каналы по запросу «{query}» не найдены.",
+        'search.title': "🔎 Результаты поиска: {query}\n\n",
+        'search.similar_title': "\n📋 Похожие каналы:\n",
+        'search.similar_item': "• {name} (@{username}) — {subscribers} подписчиков\n",
+        'search.competitors_button': "🔎 Конкуренты",
+        'search.error': "произошла ошибка при поиске каналов",
+        'inline.description': "👥 {subscribers} | ERR {err}% | {category}",
+        'inline.top_title': "{i}. {name} (@{username})",
+        'inline.niche_description': "ERR {avg_err}% | Рост {growth_rate}% | Конкуренция: {competition}",
+
+        'digest.usage': "📬 Подписка на сводку за 24ч: /subscribe daily — раз в день, /subscribe hourly — каждый час.\nОтписаться: /unsubscribe",
+        'digest.subscribed_daily': "📬 Вы подписаны на ежедневную сводку. Она приходит каждый день после {hour}:00.\nОтписаться: /unsubscribe",
+        'digest.subscribed_hourly': "📬 Вы подписаны на ежечасную сводку.\nОтписаться: /unsubscribe",
+        'digest.unsubscribed': "📭 Подписка на сводку отменена.",
+        'digest.not_subscribed': "📭 Вы не подписаны на сводку.",
+        'digest.error': "не удалось изменить подписку",
+
+        'menu.charts': "📊 Графики",
+        'charts.title': "📊 Выберите график:",
+        'charts.no_data': "нет данных для графика",
+        'charts.error': "не удалось построить график",
+        'charts.new_channels': "🆕 Новые каналы за 24ч по категориям",
+        'charts.new_channels.title': "Новые каналы за 24 часа по категориям",
+        'charts.niche_growth': "📈 Рост и ERR по нишам",
+        'charts.niche_growth.title': "Рост и ERR по нишам",
+        'charts.niche_engagement': "💡 Вовлеченность по нишам",
+        'charts.niche_engagement.title': "Показатели вовлеченности по нишам",
+        'charts.growth': "Рост, %",
+        'charts.err': "ERR, %",
+        'charts.views': "Просмотры/подписчики, %",
+        'charts.forwards': "Репосты/просмотры, %",
+        'charts.comments': "Комментарии/просмотры, %",
+
+        'export.usage': (
+            "📎 Выгрузка данных файлом: /export <набор> [csv|parquet]\n"
+            "Наборы: channels — топ каналов, posts — лучшие посты, niches — анализ ниш.\n"
+            "Например: /export channels csv"
+        ),
+        'export.no_parquet': "📎 Формат Parquet сейчас недоступен, используйте csv.",
+        'export.no_data': "нет данных для выгрузки",
+        'export.error': "не удалось подготовить выгрузку",
+        'export.caption': "📎 {dataset}, данные v{version}",
+
+        'top_50.loading': "Загружаем топ-20 каналов",
+        'top_50.no_data': "не удалось получить данные о каналах",
+        'top_50.error': "произошла ошибка при получении данных",
+        'top_50.title': "📊 Топ-20 Telegram каналов:\n\n",
+        'top_50.item': "{i}. {card}\n",
+
+        'best_posts.loading': "Загружаем 15 лучших постов",
+        'best_posts.no_data': "не удалось получить данные о лучших постах",
+        'best_posts.error': "произошла ошибка при получении данных",
+        'best_posts.title': "🔥 Сегодняшние 15 лучших постов:\n\n",
+        'best_posts.item': (
+            "{i}. {channel} ({channel_size})\n"
+            "📝 Тема: {topic}\n"
+            "👁 {views} просмотров | 🔄 {forwards} репостов\n"
+            "❤️ {likes} лайков | 💬 {comments} комментариев\n"
+            "📊 Вовлеченность: {engagement}\n"
+            "⏰ Опубликовано: {post_date} в {post_time}\n"
+            "💡 Краткое содержание: {summary}\n"
+            "🔗 {link}\n\n"
+        ),
+
+        'niche_analysis.loading': "Анализируем ниши Telegram-каналов",
+        'niche_analysis.no_data': "не удалось получить данные о нишах",
+        'niche_analysis.error': "произошла ошибка при анализе ниш",
+        'niche_analysis.title': "📈 Анализ ниш Telegram-каналов:\n\nВыберите нишу для детального анализа:\n",
+
+        'niche.not_found': "информация о нише не найдена",
+        'niche.error': "произошла ошибка при отображении деталей ниши",
+        'niche.title': (
+            "📊 Детальный анализ ниши: {niche}\n\n"
+            "📈 Основные метрики:\n"
+            "• ERR: {avg_err}%\n"
+            "• Рост: {growth_rate}%\n"
+            "• Монетизация: {monetization}\n"
+            "• Конкуренция: {competition}\n\n"
+        ),
+        'niche.leaders_title': "🏅 Лидеры ниши по ERR:\n",
+        'niche.leader': "{i}. {name} (@{username}) — ERR {err}%\n",
+        'niche.high_monetization': "💰 Высокая монетизация: {count} из {total} каналов\n\n",
+        'niche.audience': (
+            "👥 Аудитория:\n"
+            "• Возраст: {age}\n"
+            "• Интересы: {interests}\n"
+            "• Активность: {activity}\n\n"
+        ),
+        'niche.engagement': (
+            "💡 Показатели вовлеченности:\n"
+            "• Просмотры/подписчики: {views}\n"
+            "• Репосты/просмотры: {forwards}\n"
+            "• Комментарии/просмотры: {comments}\n\n"
+        ),
+        'niche.recommendations_title': "🚀 Рекомендации по контенту:\n",
+        'niche.posting_time': "\n⏰ Оптимальное время постинга: {time}\n\n",
+        'niche.back_to_list': "◀️ Назад к списку ниш",
+
+        'channel_advice.loading': "Анализируем данные для рекомендаций",
+        'channel_advice.no_data': "не удалось получить данные для анализа",
+        'channel_advice.error': "произошла ошибка при анализе данных",
+        'channel_advice.title': "🚀 Рекомендации по созданию Telegram канала:\n\n🏆 Наиболее перспективные ниши:\n\n",
+        'channel_advice.item': (
+            "{i}. {category}\n"
+            "   • ERR: {err}%\n"
+            "   • Недельный рост: +{growth}\n"
+            "   • Потенциал монетизации: {monetization}\n"
+            "   • Уровень конкуренции: {competition}\n\n"
+        ),
+        'channel_advice.frequency_title': "📝 Оптимальная частота публикаций:\n\n",
+        'channel_advice.frequency_item': "• {category}: {frequency}\n",
+        'channel_advice.tips': (
+            "\n🎯 Общие рекомендации:\n\n"
+            "1. Выберите нишу с балансом между монетизацией и конкуренцией\n"
+            "2. Поддерживайте регулярность публикаций\n"
+            "3. Используйте разнообразные форматы контента\n"
+            "4. Отслеживайте ERR (Engagement Rate) вашего канала\n"
+            "5. Взаимодействуйте с аудиторией через опросы и ответы на комментарии\n"
+            "6. Продвигайте канал через кросс-постинг в других каналах схожей тематики\n"
+            "7. Публикуйте уникальный и полезный контент\n"
+            "8. Оптимизируйте время публикаций на основе активности аудитории\n"
+        ),
+
+        'trends.loading': "Анализируем текущие тренды",
+        'trends.no_data': "не удалось получить данные о трендах",
+        'trends.error': "произошла ошибка при анализе трендов",
+        'trends.title': "🔍 Анализ текущих трендов в Telegram:\n\n📈 Самые популярные темы:\n",
+        'trends.topic': "{i}. {name}\n   • Рост активности: {growth}\n   • Количество постов: {posts_count}\n\n",
+        'trends.formats_title': "🚀 Растущие форматы контента:\n",
+        'trends.format': "{i}. {format} (рост: {growth})\n",
+        'trends.interests_title': "\n📊 Интересы аудитории:\n",
+        'trends.interest': "{i}. {interest} ({share})\n",
+        'trends.conclusion': (
+            "\n💡 Вывод: Наибольший рост показывают темы, связанные с {first_topic} и {second_topic}, "
+            "а из форматов контента наиболее эффективны {first_format} и {second_format}."
+        ),
+
+        'new_channels.loading': "Собираем статистику о новых каналах",
+        'new_channels.no_data': "не удалось получить статистику о новых каналах",
+        'new_channels.error': "произошла ошибка при получении статистики",
+        'new_channels.title': (
+            "📱 Статистика новых Telegram-каналов за 24 часа:\n\n"
+            "📊 Всего создано: {total} каналов (рост {growth_rate})\n\n"
+            "🔍 По категориям:\n"
+        ),
+        'new_channels.category': "• {category}: {count} ({share})\n",
+        'new_channels.metrics': (
+            "\n📈 Показатели новых каналов:\n"
+            "• В среднем {avg_initial_posts} постов при запуске\n"
+            "• Средний рост за первую неделю: {avg_growth_first_week}\n"
+            "• Выживаемость: {survival_rate} каналов продолжают работу после первой недели\n\n"
+            "💡 Топ-3 категории для создания канала сегодня:\n"
+        ),
+        'new_channels.top_item': "{i}. {category} ({share})\n",
+        'new_channels.first_week_growth': "{value:+.0f} подписчиков",
+
+        'posting_time.loading': "Анализируем время публикаций",
+        'posting_time.no_data': "не удалось получить данные о нишах",
+        'posting_time.error': "произошла ошибка при анализе времени публикаций",
+        'posting_time.title': "⏰ Оптимальное время постинга по нишам:\n\n",
+        'posting_time.window': "   {i}. {window} — вовлеченность {score:,.0f}\n",
+        'posting_time.based_on': "   На основе {posts} постов\n\n",
+        'posting_time.fallback': "   • {time}\n   Недостаточно постов, показана экспертная оценка\n\n",
+        'posting_time.footer': (
+            "💡 Время указано по часовому поясу сервера. Вовлеченность — средние просмотры "
+            "плюс взвешенные репосты на пост в окне.\n"
+        ),
+
+        'content_ideas.loading': "Подбираем идеи для контента",
+        'content_ideas.no_data': "не удалось получить данные о нишах",
+        'content_ideas.error': "произошла ошибка при подборе идей",
+        'content_ideas.title': "📝 Идеи для контента по нишам:\n\n",
+        'content_ideas.keywords': "🔑 Ключевые слова: {keywords}\n",
+        'content_ideas.continue_topic': "Продолжение темы «{topic}»: что изменилось и чего ждать дальше",
+        'content_ideas.theme_pair': "Разбор связки «{first}» + «{second}» на практических примерах",
+        'content_ideas.focus': "{recommendation} с фокусом на «{keyword}»",
+        'content_ideas.footer': "💡 Идеи основаны на ключевых словах лучших постов дня, взвешенных по просмотрам.\n",
+
+        'content_strategy.loading': "Формируем контент-стратегию",
+        'content_strategy.no_data': "не удалось получить данные о нишах",
+        'content_strategy.error': "произошла ошибка при формировании стратегии",
+        'content_strategy.title': "📋 Контент-стратегия по нишам:\n\n",
+        'content_strategy.topics': "• Основные темы: {topics}\n",
+        'content_strategy.rubrics': "• Рубрики: {rubrics}\n",
+        'content_strategy.formats': "• Форматы лидеров: {formats}\n",
+        'content_strategy.frequency': "• Частота: {frequency}\n",
+        'content_strategy.time': "• Время публикаций: {time}\n",
+        'content_strategy.err_target': "• Цель по ERR: не ниже {err}%\n\n",
+
+        'competitor_analysis.loading': "Загружаем список каналов",
+        'competitor_analysis.no_data': "не удалось получить данные о каналах",
+        'competitor_analysis.error': "произошла ошибка при анализе конкурентов",
+        'competitor_analysis.title': (
+            "🔎 Анализ конкурентов:\n\n"
+            "Выберите канал, чтобы найти похожие по тематике, размеру, ERR, росту и частоте постов.\n"
+            "Любой канал можно проанализировать через поиск: /channel <название>\n"
+        ),
+
+        'competitors.not_found': "😕 Извините, канал не найден.\n\nПожалуйста, выберите другой канал.",
+        'competitors.error': "произошла ошибка при анализе конкурентов",
+        'competitors.title': (
+            "🔎 Конкуренты канала {name} (@{username}):\n\n"
+            "👥 {subscribers} подписчиков | 📊 ERR: {err}%\n"
+            "📈 Рост за 7д: {growth_7d} | 📢 {post_frequency}\n"
+            "📋 Категория: {category}\n\n"
+            "🏆 Ближайшие конкуренты:\n\n"
+        ),
+        'competitors.item': (
+            "{i}. {name} (@{username}) — сходство {similarity}%\n"
+            "   • {subscribers} подписчиков (x{size_ratio:.2f})\n"
+            "   • ERR: {err}% ({err_diff:+.2f} п.п.)\n"
+            "   • Рост за 7д: {growth_7d} | {post_frequency}\n"
+            "   • Категория: {category}\n\n"
+        ),
+        'competitors.stronger': (
+            "💡 У {stronger} из {total} конкурентов ERR выше — изучите их форматы и время публикаций.\n"
+        ),
+        'competitors.leader': "💡 Ваш ERR выше, чем у ближайших конкурентов — сфокусируйтесь на росте аудитории.\n",
+        'competitors.back_to_list': "◀️ Назад к списку каналов",
+
+        'overall_24h.loading': "Собираем общую сводку за последние 24 часа",
+        'overall_24h.no_data': "не удалось получить полную сводку",
+        'overall_24h.error': "произошла ошибка при получении общей сводки",
+        'overall_24h.title': "📊 Общая сводка за последние 24 часа:\n\n",
+        'overall_24h.channel': (
+            "🏆 Лидеры роста:\n"
+            "• Топ канал: {name} (@{username})\n"
+            "• Рост: {growth_24h} подписчиков\n"
+            "• ERR: {err}%\n\n"
+        ),
+        'overall_24h.post': (
+            "📝 Лучший пост:\n"
+            "• Канал: {channel}\n"
+            "• Тема: {topic}\n"
+            "• Просмотры: {views}\n"
+            "• Репосты: {forwards}\n\n"
+        ),
+        'overall_24h.trends_title': "🔥 Горячие тренды:\n",
+        'overall_24h.trend': "• {name} (рост активности: {growth})\n",
+        'overall_24h.new_channels': "🆕 Новые каналы:\n• Создано за 24ч: {total}\n",
+        'overall_24h.popular_category': "• Самая популярная ниша: {category}\n",
+        'overall_24h.activity': (
+            "📈 Общая активность в Telegram:\n"
+            "• Рост общего количества просмотров: +15.7%\n"
+            "• Рост активности пользователей: +8.3%\n"
+            "• Средний ERR по всем каналам: 2.4%\n"
+        ),
+
+        'top_news.loading': "Собираем топ-10 самых популярных новостей",
+        'top_news.no_data': "не удалось получить топовые новости",
+        'top_news.error': "произошла ошибка при получении топовых новостей",
+        'top_news.title': "📰 Топ-10 самых популярных новостей:\n\n",
+        'top_news.item': (
+            "{i}. {channel}\n"
+            "📝 {topic}\n"
+            "👁 {views} просмотров\n"
+            "🔄 {forwards} репостов\n"
+            "💬 Краткое содержание: {summary}\n"
+            "🔗 {link}\n\n"
+        ),
+    },
+
+    'en': {
+        'common.na': "n/a",
+        'common.new': "new",
+        'common.percent': "{value:.0f}%",
+        'common.percent_change': "{value:+.1f}%",
+        'common.today': "Today",
+        'common.unavailable': "Unavailable",
+        'common.weekdays': "Mon Tue Wed Thu Fri Sat Sun",
+        'common.niche': "📋 {niche}\n",
+        'common.numbered': "{i}. {text}\n",
+
+        'status.loading': "🔄 {text}...\nPlease wait...",
+        'status.no_data': "😕 Sorry, {text}.\n\nPlease try again later.",
+        'status.error': "❌ Sorry, {text}.\nPlease try again later.",
+
+        'menu.welcome': (
+            "👋 Welcome to Telegram Analytics Bot!\n\n"
+            "Due to API limitations we are showing demo data.\n\n"
+            "Choose an option:"
+        ),
+        'menu.start_error': (
+            "❌ Sorry, something went wrong while starting the bot.\n"
+            "Please try again later or contact support if the problem persists."
+        ),
+        'menu.top_50': "📊 Top 20 channels",
+        'menu.best_posts': "🔥 15 best posts",
+        'menu.niche_analysis': "📈 Niche analysis",
+        'menu.new_channels': "📱 New channels",
+        'menu.channel_advice': "🚀 Launch advice",
+        'menu.trends': "🔍 Current trends",
+        'menu.posting_time': "⏰ Best posting time",
+        'menu.content_ideas': "📝 Content ideas",
+        'menu.competitor_analysis': "🔎 Competitor analysis",
+        'menu.content_strategy': "📋 Content strategy",
+        'menu.overall_24h': "📊 24h summary",
+        'menu.top_news': "📰 Top news",
+        'menu.back': "◀️ Back to menu",
+        'menu.back_prompt': "Back to the main menu:",
+
+        'channel.card': (
+            "{name} (@{username})\n"
+            "👥 {subscribers} subscribers\n"
+            "📈 Growth: {growth_24h} (24h) | {growth_7d} (7d)\n"
+            "📊 ERR: {err}% | 👁 {avg_views} views\n"
+            "📋 Category: {category} | 📝 Content: {content_type}\n"
+            "📢 Posting frequency: {post_frequency} | 💰 Monetization: {monetization}\n"
+            "🔄 Forwards: {avg_forwards} | 🏆 Competition: {competition}\n"
+        ),
+
+        'search.usage': "🔎 Enter a channel name or username.\nFor example: /channel durov",
+        'search.not_found': "😕 No channels found for “{query}”.",
+        'search.title': "🔎 Search results: {query}\n\n",
+        'search.similar_title': "\n📋 Similar channels:\n",
+        'search.similar_item': "• {name} (@{username}) — {subscribers} subscribers\n",
+        'search.competitors_button': "🔎 Competitors",
+        'search.error': "something went wrong while searching for channels",
+        'inline.description': "👥 {subscribers} | ERR {err}% | {category}",
+        'inline.top_title': "{i}. {name} (@{username})",
+        'inline.niche_description': "ERR {avg_err}% | Growth {growth_rate}% | Competition: {competition}",
+
+        'digest.usage': "📬 Subscribe to the 24h summary: /subscribe daily — once a day, /subscribe hourly — every hour.\nUnsubscribe: /unsubscribe",
+        'digest.subscribed_daily': "📬 You are subscribed to the daily summary. It arrives every day after {hour}:00.\nUnsubscribe: /unsubscribe",
+        'digest.subscribed_hourly': "📬 You are subscribed to the hourly summary.\nUnsubscribe: /unsubscribe",
+        'digest.unsubscribed': "📭 You are unsubscribed from the summary.",
+        'digest.not_subscribed': "📭 You are not subscribed to the summary.",
+        'digest.error': "the subscription could not be changed",
+
+        'menu.charts': "📊 Charts",
+        'charts.title': "📊 Choose a chart:",
+        'charts.no_data': "there is no data for this chart",
+        'charts.error': "the chart could not be drawn",
+        'charts.new_channels': "🆕 New channels in 24h by category",
+        'charts.new_channels.title': "New channels in the last 24 hours by category",
+        'charts.niche_growth': "📈 Growth and ERR by niche",
+        'charts.niche_growth.title': "Growth and ERR by niche",
+        'charts.niche_engagement': "💡 Engagement by niche",
+        'charts.niche_engagement.title': "Engagement by niche",
+        'charts.growth': "Growth, %",
+        'charts.err': "ERR, %",
+        'charts.views': "Views/subscribers, %",
+        'charts.forwards': "Forwards/views, %",
+        'charts.comments': "Comments/views, %",
+
+        'export.usage': (
+            "📎 Download data as a file: /export <dataset> [csv|parquet]\n"
+            "Datasets: channels — top channels, posts — best posts, niches — niche analysis.\n"
+            "For example: /export channels csv"
+        ),
+        'export.no_parquet': "📎 Parquet is not available right now, please use csv.",
+        'export.no_data': "there is no data to export",
+        'export.error': "the export could not be prepared",
+        'export.caption': "📎 {dataset}, data v{version}",
+
+        'top_50.loading': "Loading the top 20 channels",
+        'top_50.no_data': "channel data is not available",
+        'top_50.error': "something went wrong while loading the data",
+        'top_50.title': "📊 Top 20 Telegram channels:\n\n",
+        'top_50.item': "{i}. {card}\n",
+
+        'best_posts.loading': "Loading the 15 best posts",
+        'best_posts.no_data': "best post data is not available",
+        'best_posts.error': "something went wrong while loading the data",
+        'best_posts.title': "🔥 Today's 15 best posts:\n\n",
+        'best_posts.item': (
+            "{i}. {channel} ({channel_size})\n"
+            "📝 Topic: {topic}\n"
+            "👁 {views} views | 🔄 {forwards} forwards\n"
+            "❤️ {likes} likes | 💬 {comments} comments\n"
+            "📊 Engagement: {engagement}\n"
+            "⏰ Published: {post_date} at {post_time}\n"
+            "💡 Summary: {summary}\n"
+            "🔗 {link}\n\n"
+        ),
+
+        'niche_analysis.loading': "Analyzing Telegram channel niches",
+        'niche_analysis.no_data': "niche data is not available",
+        'niche_analysis.error': "something went wrong while analyzing niches",
+        'niche_analysis.title': "📈 Telegram channel niche analysis:\n\nChoose a niche for a detailed analysis:\n",
+
+        'niche.not_found': "this niche could not be found",
+        'niche.error': "something went wrong while showing the niche details",
+        'niche.title': (
+            "📊 Niche analysis: {niche}\n\n"
+            "📈 Key metrics:\n"
+            "• ERR: {avg_err}%\n"
+            "• Growth: {growth_rate}%\n"
+            "• Monetization: {monetization}\n"
+            "• Competition: {competition}\n\n"
+        ),
+        'niche.leaders_title': "🏅 Niche leaders by ERR:\n",
+        'niche.leader': "{i}. {name} (@{username}) — ERR {err}%\n",
+        'niche.high_monetization': "💰 High monetization: {count} of {total} channels\n\n",
+        'niche.audience': (
+            "👥 Audience:\n"
+            "• Age: {age}\n"
+            "• Interests: {interests}\n"
+            "• Activity: {activity}\n\n"
+        ),
+        'niche.engagement': (
+            "💡 Engagement:\n"
+            "• Views/subscribers: {views}\n"
+            "• Forwards/views: {forwards}\n"
+            "• Comments/views: {comments}\n\n"
+        ),
+        'niche.recommendations_title': "🚀 Content recommendations:\n",
+        'niche.posting_time': "\n⏰ Best posting time: {time}\n\n",
+        'niche.back_to_list': "◀️ Back to niches",
+
+        'channel_advice.loading': "Analyzing data for recommendations",
+        'channel_advice.no_data': "there is not enough data for the analysis",
+        'channel_advice.error': "something went wrong while analyzing the data",
+        'channel_advice.title': "🚀 How to launch a Telegram channel:\n\n🏆 Most promising niches:\n\n",
+        'channel_advice.item': (
+            "{i}. {category}\n"
+            "   • ERR: {err}%\n"
+            "   • Weekly growth: +{growth}\n"
+            "   • Monetization potential: {monetization}\n"
+            "   • Competition: {competition}\n\n"
+        ),
+        'channel_advice.frequency_title': "📝 Best posting frequency:\n\n",
+        'channel_advice.frequency_item': "• {category}: {frequency}\n",
+        'channel_advice.tips': (
+            "\n🎯 General advice:\n\n"
+            "1. Pick a niche that balances monetization and competition\n"
+            "2. Post regularly\n"
+            "3. Mix different content formats\n"
+            "4. Track your channel's ERR (Engagement Rate)\n"
+            "5. Engage your audience with polls and replies to comments\n"
+            "6. Promote the channel through cross-posts in channels on similar topics\n"
+            "7. Publish original and useful content\n"
+            "8. Time your posts by your audience's activity\n"
+        ),
+
+        'trends.loading': "Analyzing current trends",
+        'trends.no_data': "trend data is not available",
+        'trends.error': "something went wrong while analyzing trends",
+        'trends.title': "🔍 Current Telegram trends:\n\n📈 Most popular topics:\n",
+        'trends.topic': "{i}. {name}\n   • Activity growth: {growth}\n   • Posts: {posts_count}\n\n",
+        'trends.formats_title': "🚀 Growing content formats:\n",
+        'trends.format': "{i}. {format} (growth: {growth})\n",
+        'trends.interests_title': "\n📊 Audience interests:\n",
+        'trends.interest': "{i}. {interest} ({share})\n",
+        'trends.conclusion': (
+            "\n💡 Takeaway: topics around {first_topic} and {second_topic} grow the fastest, "
+            "and the most effective content formats are {first_format} and {second_format}."
+        ),
+
+        'new_channels.loading': "Collecting new channel statistics",
+        'new_channels.no_data': "new channel statistics are not available",
+        'new_channels.error': "something went wrong while loading the statistics",
+        'new_channels.title': (
+            "📱 New Telegram channels in the last 24 hours:\n\n"
+            "📊 Created: {total} channels (growth {growth_rate})\n\n"
+            "🔍 By category:\n"
+        ),
+        'new_channels.category': "• {category}: {count} ({share})\n",
+        'new_channels.metrics': (
+            "\n📈 New channel metrics:\n"
+            "• {avg_initial_posts} posts at launch on average\n"
+            "• Average growth in the first week: {avg_growth_first_week}\n"
+            "• Survival: {survival_rate} of channels keep posting after the first week\n\n"
+            "💡 Top 3 categories to launch a channel today:\n"
+        ),
+        'new_channels.top_item': "{i}. {category} ({share})\n",
+        'new_channels.first_week_growth': "{value:+.0f} subscribers",
+
+        'posting_time.loading': "Analyzing posting times",
+        'posting_time.no_data': "niche data is not available",
+        'posting_time.error': "something went wrong while analyzing posting times",
+        'posting_time.title': "⏰ Best posting time by niche:\n\n",
+        'posting_time.window': "   {i}. {window} — engagement {score:,.0f}\n",
+        'posting_time.based_on': "   Based on {posts} posts\n\n",
+        'posting_time.fallback': "   • {time}\n   Not enough posts, showing an expert estimate\n\n",
+        'posting_time.footer': (
+            "💡 Times are in the server time zone. Engagement is the average views "
+            "plus weighted forwards per post in the window.\n"
+        ),
+
+        'content_ideas.loading': "Picking content ideas",
+        'content_ideas.no_data': "niche data is not available",
+        'content_ideas.error': "something went wrong while picking ideas",
+        'content_ideas.title': "📝 Content ideas by niche:\n\n",
+        'content_ideas.keywords': "🔑 Keywords: {keywords}\n",
+        'content_ideas.continue_topic': "Follow-up on “{topic}”: what changed and what comes next",
+        'content_ideas.theme_pair': "“{first}” + “{second}” explained with practical examples",
+        'content_ideas.focus': "{recommendation} focused on “{keyword}”",
+        'content_ideas.footer': "💡 Ideas are based on keywords of today's best posts, weighted by views.\n",
+
+        'content_strategy.loading': "Building a content strategy",
+        'content_strategy.no_data': "niche data is not available",
+        'content_strategy.error': "something went wrong while building the strategy",
+        'content_strategy.title': "📋 Content strategy by niche:\n\n",
+        'content_strategy.topics': "• Main topics: {topics}\n",
+        'content_strategy.rubrics': "• Rubrics: {rubrics}\n",
+        'content_strategy.formats': "• Leaders' formats: {formats}\n",
+        'content_strategy.frequency': "• Frequency: {frequency}\n",
+        'content_strategy.time': "• Posting time: {time}\n",
+        'content_strategy.err_target': "• ERR target: at least {err}%\n\n",
+
+        'competitor_analysis.loading': "Loading the channel list",
+        'competitor_analysis.no_data': "channel data is not available",
+        'competitor_analysis.error': "something went wrong while analyzing competitors",
+        'competitor_analysis.title': (
+            "🔎 Competitor analysis:\n\n"
+            "Choose a channel to find similar ones by topic, size, ERR, growth and posting frequency.\n"
+            "Any channel can be analyzed through search: /channel <name>\n"
+        ),
+
+        'competitors.not_found': "😕 Sorry, the channel was not found.\n\nPlease choose another channel.",
+        'competitors.error': "something went wrong while analyzing competitors",
+        'competitors.title': (
+            "🔎 Competitors of {name} (@{username}):\n\n"
+            "👥 {subscribers} subscribers | 📊 ERR: {err}%\n"
+            "📈 7d growth: {growth_7d} | 📢 {post_frequency}\n"
+            "📋 Category: {category}\n\n"
+            "🏆 Closest competitors:\n\n"
+        ),
+        'competitors.item': (
+            "{i}. {name} (@{username}) — {similarity}% similar\n"
+            "   • {subscribers} subscribers (x{size_ratio:.2f})\n"
+            "   • ERR: {err}% ({err_diff:+.2f} pp)\n"
+            "   • 7d growth: {growth_7d} | {post_frequency}\n"
+            "   • Category: {category}\n\n"
+        ),
+        'competitors.stronger': (
+            "💡 {stronger} of {total} competitors have a higher ERR — study their formats and posting times.\n"
+        ),
+        'competitors.leader': "💡 Your ERR is higher than your closest competitors' — focus on audience growth.\n",
+        'competitors.back_to_list': "◀️ Back to channels",
+
+        'overall_24h.loading': "Collecting the 24-hour summary",
+        'overall_24h.no_data': "the full summary is not available",
+        'overall_24h.error': "something went wrong while loading the summary",
+        'overall_24h.title': "📊 Summary of the last 24 hours:\n\n",
+        'overall_24h.channel': (
+            "🏆 Growth leaders:\n"
+            "• Top channel: {name} (@{username})\n"
+            "• Growth: {growth_24h} subscribers\n"
+            "• ERR: {err}%\n\n"
+        ),
+        'overall_24h.post': (
+            "📝 Best post:\n"
+            "• Channel: {channel}\n"
+            "• Topic: {topic}\n"
+            "• Views: {views}\n"
+            "• Forwards: {forwards}\n\n"
+        ),
+        'overall_24h.trends_title': "🔥 Hot trends:\n",
+        'overall_24h.trend': "• {name} (activity growth: {growth})\n",
+        'overall_24h.new_channels': "🆕 New channels:\n• Created in 24h: {total}\n",
+        'overall_24h.popular_category': "• Most popular niche: {category}\n",
+        'overall_24h.activity': (
+            "📈 Overall Telegram activity:\n"
+            "• Total views growth: +15.7%\n"
+            "• User activity growth: +8.3%\n"
+            "• Average ERR across channels: 2.4%\n"
+        ),
+
+        'top_news.loading': "Collecting the 10 most popular news",
+        'top_news.no_data': "top news are not available",
+        'top_news.error': "something went wrong while loading top news",
+        'top_news.title': "📰 10 most popular news:\n\n",
+        'top_news.item': (
+            "{i}. {channel}\n"
+            "📝 {topic}\n"
+            "👁 {views} views\n"
+            "🔄 {forwards} forwards\n"
+            "💬 Summary: {summary}\n"
+            "🔗 {link}\n\n"
+        ),
+    },
+}
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+# Fields bound to the current update, added to every record logged while it is handled
+log_context = ContextVar('log_context', default={})
+
+# Record attributes that become top-level JSON fields when a call site passes them in `extra`
+EXTRA_FIELDS = ('handler', 'chat', 'latency_ms', 'cache', 'endpoint', 'version', 'sampled')
+
+CHAT_SALT = os.getenv("LOG_CHAT_SALT", "").encode()
+
+
+def hash_chat(chat_id):
+    """Stable pseudonymous id of a chat, so that log lines can be correlated without the real id"""
+    if chat_id is None:
+        return None
+    return hashlib.blake2b(str(chat_id).encode(), digest_size=6, key=CHAT_SALT[:64]).hexdigest()
+
+
+def bind(**fields):
+    """Add fields to the log context of the current task; returns a token for log_context.reset()"""
+    return log_context.set({**log_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Copy the bound context onto records in the thread that emits them, before they are queued.
+
+    The context is a contextvar of the emitting task; the listener thread could not see it."""
+
+    def filter(self, record):
+        for key, value in log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Let through one of every `sample_every` records of the same message.
+
+    Call sites opt in with extra={'sample_every': N}; the records that pass
+    carry sampled=N so that counts can be scaled back up.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, 'sample_every', 1)
+        if every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """QueueHandler that keeps the exception text separate for the JSON formatter"""
+
+    def prepare(self, record):
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, level, logger and bound fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text format followed by the bound fields as key=value pairs"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        fields = ' '.join(
+            f"{field}={getattr(record, field)}" for field in EXTRA_FIELDS if getattr(record, field, None) is not None
+        )
+        return f"{text} [{fields}]" if fields else text
+
+
+def setup_logging(level=logging.INFO, fmt='json'):
+    """Route all logging through a queue to a listener thread that does the writing.
+
+    Emitting a record on the event loop is then only formatting its message
+    and a put on an in-memory queue; the stream I/O happens in the listener
+    thread. Returns the started listener; the caller stops it on shutdown
+    to flush the queued records.
+    """
+    queue = SimpleQueue()
+    handler = AsyncQueueHandler(queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SampleFilter())
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    listener = QueueListener(queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    # httpx logs every Bot API request at INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    listener.start()
+    return listener
@@ -0,0 +1,50 @@
+import os
+import resource
+from collections import Counter
+
+from resilience import LatencyTracker
+
+
+class HandlerMetrics:
+    """Call counts, errors and latency percentiles per handler type, e.g. '/start' or 'callback:top_50'"""
+
+    def __init__(self, window=500):
+        self.window = window
+        self.latencies = {}
+        self.calls = Counter()
+        self.errors = Counter()
+
+    def record(self, name, seconds, failed=False):
+        latency = self.latencies.get(name)
+        if latency is None:
+            latency = self.latencies[name] = LatencyTracker(size=self.window)
+        latency.record(seconds)
+        self.calls[name] += 1
+        if failed:
+            self.errors[name] += 1
+
+    def summary(self):
+        """Rows of name, calls, errors and p50/p95/p99 in seconds, busiest handlers first"""
+        return [
+            {
+                'name': name,
+                'calls': calls,
+                'errors': self.errors[name],
+                'p50': self.latencies[name].percentile(50),
+                'p95': self.latencies[name].percentile(95),
+                'p99': self.latencies[name].percentile(99),
+            }
+            for name, calls in self.calls.most_common()
+        ]
+
+
+def memory_usage():
+    """Current and peak resident memory of the process in bytes"""
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        current = peak
+    return current, peak
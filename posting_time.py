@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils import parse_number
+
+WEEKDAYS = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+HOURS_PER_WEEK = 7 * 24
+
+
+def post_timestamp(post, now=None):
+    """Build a datetime from the post_date/post_time fields of a post record"""
+    now = now or datetime.now()
+    post_date = str(post.get('post_date') or 'Today').strip()
+    if post_date.lower() in ('today', 'сегодня'):
+        day = now.date()
+    elif post_date.lower() in ('yesterday', 'вчера'):
+        day = (now - timedelta(days=1)).date()
+    else:
+        try:
+            day = datetime.fromisoformat(post_date).date()
+        except ValueError:
+            return None
+
+    try:
+        time = datetime.strptime(str(post.get('post_time')), '%H:%M').time()
+    except ValueError:
+        return None
+    return datetime.combine(day, time)
+
+
+class PostingTimeEngine:
+    """Hour-of-week engagement histograms per niche.
+
+    Every post adds its engagement (views plus weighted forwards) to one of
+    168 hour-of-week slots of its niche. Histograms are updated
+    incrementally as posts arrive and the best posting windows of the
+    touched niches are recomputed at the end of each batch, so reads are
+    plain dictionary lookups.
+    """
+
+    FORWARD_WEIGHT = 10
+    WINDOW_HOURS = 2
+    MIN_POSTS = 3
+
+    def __init__(self):
+        self._engagement = {}   # niche -> float64[168] engagement sums
+        self._posts = {}        # niche -> int64[168] post counts
+        self._windows = {}      # niche -> precomputed best windows
+
+    def add_post(self, niche, posted_at, views, forwards):
+        """Add one post to the niche histogram"""
+        if niche not in self._engagement:
+            self._engagement[niche] = np.zeros(HOURS_PER_WEEK)
+            self._posts[niche] = np.zeros(HOURS_PER_WEEK, dtype=np.int64)
+
+        slot = posted_at.weekday() * 24 + posted_at.hour
+        self._engagement[niche][slot] += parse_number(views) + self.FORWARD_WEIGHT * parse_number(forwards)
+        self._posts[niche][slot] += 1
+
+    def add_posts(self, posts, niche_of, now=None):
+        """Ingest a batch of post records and refresh best windows of the touched niches"""
+        touched = set()
+        for post in posts:
+            niche = niche_of(post)
+            posted_at = post_timestamp(post, now)
+            if niche is None or posted_at is None:
+                continue
+            self.add_post(niche, posted_at, post.get('views'), post.get('forwards'))
+            touched.add(niche)
+
+        for niche in touched:
+            self._windows[niche] = self._compute_windows(niche)
+        if touched:
+            logging.info(f"Posting time histograms updated for {len(touched)} niches")
+        return touched
+
+    def _compute_windows(self, niche, count=3):
+        """Pick the best non-overlapping windows by mean engagement per post"""
+        posts = self._posts[niche]
+        mean = np.divide(self._engagement[niche], posts, out=np.zeros(HOURS_PER_WEEK), where=posts > 0)
+
+        # Circular rolling sum so that windows can wrap from Sunday night into Monday
+        window = self.WINDOW_HOURS
+        padded = np.concatenate([mean, mean[:window - 1]])
+        scores = np.convolve(padded, np.ones(window), mode='valid')[:HOURS_PER_WEEK]
+
+        windows = []
+        blocked = np.zeros(HOURS_PER_WEEK, dtype=bool)
+        for start in np.argsort(scores)[::-1]:
+            if scores[start] <= 0 or len(windows) >= count:
+                break
+            slots = [(start + offset) % HOURS_PER_WEEK for offset in range(window)]
+            if blocked[slots].any():
+                continue
+            blocked[slots] = True
+            windows.append({
+                'weekday': int(start) // 24,
+                'start_hour': int(start) % 24,
+                'end_hour': (int(start) % 24 + window) % 24,
+                'score': float(scores[start] / window),
+            })
+        return {'posts': int(posts.sum()), 'windows': windows}
+
+    def best_windows(self, niche):
+        """Return precomputed best windows for a niche, or None if there is not enough data"""
+        result = self._windows.get(niche)
+        if result is None or result['posts'] < self.MIN_POSTS:
+            return None
+        return result
+
+    def niches(self):
+        """Return niches that have any posts"""
+        return list(self._windows)
+
+
+def format_window(window, weekdays=WEEKDAYS):
+    """Format a window like 'Пн 09:00–11:00'"""
+    return f"{weekdays[window['weekday']]} {window['start_hour']:02d}:00–{window['end_hour']:02d}:00"
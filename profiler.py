@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class SamplingProfiler:
+    """Low-overhead sampler of the event loop thread, switched on for a bounded window.
+
+    A background thread records the loop thread's stack every `interval`
+    seconds. Each sample is attributed to the handler type tagged on the
+    asyncio task that was running, 'idle' while the loop waits for I/O, or
+    'other' for background work. Results are written as collapsed stacks
+    (one 'label;frame;frame count' line per stack), the input format of
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.005, output_dir='/tmp'):
+        self.interval = interval
+        self.output_dir = output_dir
+        self._tags = {}         # asyncio task -> handler type
+        self._thread = None
+        self._done = threading.Event()
+        self.last_result = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @contextmanager
+    def tagged(self, label):
+        """Attribute samples taken while the current task runs the block to `label`"""
+        task = asyncio.current_task()
+        self._tags[task] = label
+        try:
+            yield
+        finally:
+            self._tags.pop(task, None)
+
+    def start(self, duration):
+        """Sample the calling event loop thread for `duration` seconds in the background"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        loop = asyncio.get_running_loop()
+        self._done.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(loop, threading.get_ident(), duration), name='profiler', daemon=True
+        )
+        self._thread.start()
+        logging.info(f"Profiling the event loop for {duration}s")
+
+    async def wait(self):
+        """Wait for the running window to end and return its result"""
+        await asyncio.to_thread(self._done.wait)
+        return self.last_result
+
+    def _sample(self, loop, thread_id, duration):
+        stacks = Counter()
+        deadline = time.monotonic() + duration
+        started = time.monotonic()
+        try:
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is None:
+                    break
+                stacks[(self._label(loop, frame), _collapse(frame))] += 1
+                time.sleep(self.interval)
+            self.last_result = self._write(stacks, time.monotonic() - started)
+        except Exception as e:
+            logging.error(f"Profiler failed: {e}")
+        finally:
+            self._done.set()
+
+    def _label(self, loop, frame):
+        if frame.f_code.co_name in ('select', 'poll') and 'selectors' in frame.f_code.co_filename:
+            return 'idle'
+        return self._tags.get(asyncio.current_task(loop), 'other')
+
+    def _write(self, stacks, elapsed):
+        path = os.path.join(self.output_dir, f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded")
+        with open(path, 'w') as output:
+            for (label, stack), count in stacks.most_common():
+                output.write(f"{label};{stack} {count}\n")
+
+        total = sum(stacks.values()) or 1
+        by_label = Counter()
+        leaves = Counter()
+        for (label, stack), count in stacks.items():
+            by_label[label] += count
+            if label != 'idle':
+                leaves[stack.rsplit(';', 1)[-1]] += count
+        result = {
+            'path': path,
+            'elapsed': elapsed,
+            'samples': total,
+            'by_label': [(label, count / total) for label, count in by_label.most_common()],
+            'hottest': [(frame, count / total) for frame, count in leaves.most_common(10)],
+        }
+        logging.info(f"Profile of {elapsed:.1f}s with {total} samples written to {path}")
+        return result
+
+
+def _collapse(frame):
+    """Stack of a frame from the outermost call inwards, as 'function (file:line)' joined by ';'"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
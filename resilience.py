@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised when an endpoint's circuit is open and there is no snapshot to fall back to"""
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies with percentile lookups"""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        """Return the p-th percentile (0-100) in seconds, or None without samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def adaptive_timeout(self, minimum=1.0, maximum=10.0, multiplier=3.0):
+        """Timeout derived from the observed p99: slow enough for normal tails, fast enough to fail over"""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return maximum
+        return max(minimum, min(maximum, p99 * multiplier))
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures, half-open after a cool-down, closed again on success"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.probe_started_at = None
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at < self.reset_timeout:
+            return False
+        # Let a single probe through; a probe that never reported back is replaced after a cool-down
+        if self.probing and now - self.probe_started_at < self.reset_timeout:
+            return False
+        self.state = self.HALF_OPEN
+        self.probing = True
+        self.probe_started_at = now
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+async def hedged(factory, delay, timeout):
+    """Run factory(); if it is not done after `delay`, start a duplicate and return whichever succeeds first"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    tasks = {asyncio.ensure_future(factory())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=min(delay, timeout))
+        if not done and loop.time() < deadline:
+            tasks.add(asyncio.ensure_future(factory()))
+
+        last_error = None
+        while tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        if last_error is not None and not tasks:
+            raise last_error
+        raise asyncio.TimeoutError()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -7,17 +7,363 @@ import random
 from fake_useragent import UserAgent
 import traceback
 import ssl
+import time
+from competitors import CompetitorEngine
+from discovery import ChannelDiscovery
+from indexes import ChannelIndex
+from posting_time import PostingTimeEngine, post_timestamp
+from resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+from search import ChannelSearchIndex, normalize
+from topics import TopicModel, tokenize
+from trends import TrendEngine
+
+# Only one in this many "Returning mock data" messages is logged, they come with every fetch
+MOCK_LOG_SAMPLE = 100
+
+# Channel categories that make up each niche of the niche analysis
+NICHE_CATEGORIES = {
+    'Технологии и IT': ['Технологии', 'Наука', 'Образование'],
+    'Бизнес и финансы': ['Бизнес', 'Финансы', 'Маркетинг', 'Криптовалюты'],
+    'Новости и СМИ': ['Новости'],
+    'Развлечения и хобби': ['Развлечения', 'Музыка', 'Искусство', 'Литература', 'Путешествия', 'Еда', 'Мода'],
+    'Здоровье и спорт': ['Здоровье', 'Спорт', 'Психология']
+}
+
+# Datasets fetched from the source, all of them by every refresh(); the first two build the indexes
+ENDPOINTS = ('top_channels', 'best_posts', 'niche_analysis', 'current_trends', 'new_channels_stats')
+CORE_ENDPOINTS = ('top_channels', 'best_posts')
+
+CATEGORY_NICHES = {category: niche for niche, categories in NICHE_CATEGORIES.items() for category in categories}
+
+# English names that users may type instead of the Russian category and niche names
+CATEGORY_ALIASES = {
+    'technology': 'Технологии', 'tech': 'Технологии', 'science': 'Наука', 'education': 'Образование',
+    'business': 'Бизнес', 'finance': 'Финансы', 'marketing': 'Маркетинг', 'crypto': 'Криптовалюты',
+    'news': 'Новости', 'entertainment': 'Развлечения', 'music': 'Музыка', 'art': 'Искусство',
+    'books': 'Литература', 'literature': 'Литература', 'travel': 'Путешествия', 'food': 'Еда',
+    'fashion': 'Мода', 'health': 'Здоровье', 'sport': 'Спорт', 'psychology': 'Психология',
+}
+
+NICHE_ALIASES = {
+    'tech': 'Технологии и IT', 'business': 'Бизнес и финансы', 'finance': 'Бизнес и финансы',
+    'news': 'Новости и СМИ', 'media': 'Новости и СМИ', 'entertainment': 'Развлечения и хобби',
+    'hobby': 'Развлечения и хобби', 'health': 'Здоровье и спорт', 'sport': 'Здоровье и спорт',
+}
+
+def match_niches(query):
+    """Niches whose name, any word of it or an English alias starts with the query"""
+    query = normalize(query)
+    if not query:
+        return list(NICHE_CATEGORIES)
+    matches = []
+    for niche in NICHE_CATEGORIES:
+        name = normalize(niche)
+        if name.startswith(query) or any(word.startswith(query) for word in name.split() if len(word) > 1):
+            matches.append(niche)
+    for alias, niche in NICHE_ALIASES.items():
+        if alias.startswith(query) and niche not in matches:
+            matches.append(niche)
+    return matches
+
+def match_categories(query):
+    """Channel categories matching the query by name, English alias or niche"""
+    query = normalize(query)
+    if not query:
+        return []
+    matches = [category for category in CATEGORY_NICHES if normalize(category).startswith(query)]
+    for alias, category in CATEGORY_ALIASES.items():
+        if alias.startswith(query) and category not in matches:
+            matches.append(category)
+    if not matches:
+        for niche in match_niches(query):
+            matches.extend(NICHE_CATEGORIES[niche])
+    return matches
 
 class TelegramAnalytics:
-    def __init__(self, api_token=None):
+    MAX_SEEN_POSTS = 100000
+
+    def __init__(self, api_token=None, hedge_requests=False):
         self.api_token = api_token
         self.session = None
         self.user_agent = UserAgent()
+        self.hedge_requests = hedge_requests
+        self.breakers = {}
+        self.latencies = {}
+        self.snapshots = {}
+        self.data_version = 0
+        self.refreshed_at = None
+        self.channel_index = None
+        self.search_index = ChannelSearchIndex()
+        self.competitor_engine = None
+        self.posting_times = PostingTimeEngine()
+        self.topic_model = TopicModel()
+        self.topic_trends = TrendEngine()
+        self.format_trends = TrendEngine(capacity=64)
+        self._seen_posts = {}
+        self.discovery = ChannelDiscovery()
+        self.inflight_fetches = 0
+        self._refresh_lock = asyncio.Lock()
         logging.info("Using mock data instead of API calls due to Cloudflare protection")
+
+    async def start(self, refresh=True):
+        """Open connections and warm datasets before the bot starts serving requests"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={'User-Agent': self.user_agent.random}
+            )
+        if not refresh:
+            return
+        await self.refresh()
+        await self.search_index.wait()
+        await self.topic_model.wait()
+        logging.info(f"Analytics warmed up: data v{self.data_version}")
+
+    async def ensure_ready(self):
+        """Build datasets on first use; concurrent callers share one refresh"""
+        if self.channel_index is None:
+            async with self._refresh_lock:
+                if self.channel_index is None:
+                    await self._refresh()
+
+    async def refresh(self):
+        """Reload datasets and rebuild derived indexes"""
+        async with self._refresh_lock:
+            await self._refresh()
+
+    async def _refresh(self):
+        self.inflight_fetches += 1
+        try:
+            await self._load_datasets()
+        finally:
+            self.inflight_fetches -= 1
+
+    async def _load_datasets(self):
+        channels = await self._fetch('top_channels', self._load_top_channels)
+        posts = await self._fetch('best_posts', self._load_best_posts)
+        for endpoint in ENDPOINTS:
+            if endpoint in CORE_ENDPOINTS:
+                continue
+            try:
+                await self._fetch(endpoint, getattr(self, f'_load_{endpoint}'))
+            except Exception as e:
+                # Screens of this dataset show "no data" until a later refresh gets it
+                logging.warning(f"No {endpoint} data for v{self.data_version + 1}: {type(e).__name__}: {e}")
+        self._build(channels, posts, self.data_version + 1)
+        self.topic_model.schedule(self._group_by_niche(posts), self.data_version)
+        self.refreshed_at = datetime.now()
+
+    def _build(self, channels, posts, version):
+        """Rebuild indexes and feed the engines for a new data version"""
+        # The first sightings are the existing universe, not newly created channels
+        self.ingest_channels(channels, seed=self.channel_index is None)
+        self.data_version = version
+        self.channel_index = ChannelIndex(channels, version=version)
+        self.search_index.schedule(channels)
+        self.competitor_engine = CompetitorEngine(channels, version=version)
+        self.ingest_posts(posts)
+
+    def export_state(self):
+        """Last good datasets and topics in a JSON-serializable form for persistence"""
+        return {
+            'version': self.data_version,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'datasets': {
+                endpoint: {'data': snapshot['data'], 'fetched_at': snapshot['fetched_at'].isoformat()}
+                for endpoint, snapshot in self.snapshots.items()
+            },
+            'topics': self.topic_model.state(),
+        }
+
+    def restore(self, state):
+        """Rebuild indexes from persisted state; returns False if it lacks the core datasets"""
+        datasets = state.get('datasets') or {}
+        if 'top_channels' not in datasets or 'best_posts' not in datasets:
+            return False
+
+        for endpoint, snapshot in datasets.items():
+            self.snapshots[endpoint] = {
+                'data': snapshot['data'],
+                'fetched_at': datetime.fromisoformat(snapshot['fetched_at']),
+            }
+        posts = datasets['best_posts']['data']
+        self._build(datasets['top_channels']['data'], posts, state['version'])
+        if state.get('refreshed_at'):
+            self.refreshed_at = datetime.fromisoformat(state['refreshed_at'])
+
+        topics = state.get('topics')
+        if topics and topics['version'] == self.data_version:
+            self.topic_model.load(topics)
+        else:
+            self.topic_model.schedule(self._group_by_niche(posts), self.data_version)
+        return True
+
+    def _group_by_niche(self, posts):
+        """Group post records by the niche of their category"""
+        posts_by_niche = {niche: [] for niche in NICHE_CATEGORIES}
+        for post in posts:
+            niche = CATEGORY_NICHES.get(post.get('category'))
+            if niche is not None:
+                posts_by_niche[niche].append(post)
+        return posts_by_niche
+
+    def ingest_posts(self, posts):
+        """Feed post records that were not seen before into the streaming engines"""
+        new_posts = []
+        for post in posts:
+            post_id = post.get('link')
+            if post_id in self._seen_posts:
+                continue
+            self._seen_posts[post_id] = None
+            new_posts.append(post)
+        # Bounded dedup: forget the oldest post ids first
+        while len(self._seen_posts) > self.MAX_SEEN_POSTS:
+            del self._seen_posts[next(iter(self._seen_posts))]
+        
+        if not new_posts:
+            return
+        
+        self.posting_times.add_posts(new_posts, niche_of=lambda post: CATEGORY_NICHES.get(post.get('category')))
+        
+        now = datetime.now()
+        for post in new_posts:
+            # Posts scheduled later today are counted in the current bucket
+            timestamp = min(post_timestamp(post, now) or now, now)
+            topics = {word.capitalize() for word in tokenize(post.get('topic'))}
+            if post.get('category'):
+                topics.add(post['category'])
+            for topic in topics:
+                self.topic_trends.observe(topic, timestamp)
+            for content_format in str(post.get('format') or '').split('+'):
+                if content_format.strip():
+                    self.format_trends.observe(content_format.strip().capitalize(), timestamp)
+
+    async def _fetch(self, endpoint, loader):
+        """Load an endpoint through its circuit breaker with an adaptive timeout.
+
+        Successful results are kept as the endpoint's last good snapshot;
+        while the breaker is open or a request fails, that snapshot is
+        served instead of waiting for the source. Only refresh() fetches,
+        the getters serve the snapshots of the current data version.
+        """
+        breaker = self.breakers.setdefault(endpoint, CircuitBreaker())
+        latency = self.latencies.setdefault(endpoint, LatencyTracker())
+        snapshot = self.snapshots.get(endpoint)
+
+        if not breaker.allow():
+            if snapshot is not None:
+                return snapshot['data']
+            raise CircuitOpenError(f"Circuit for {endpoint} is open")
+
+        timeout = latency.adaptive_timeout()
+        started = time.monotonic()
+        try:
+            hedge_delay = latency.percentile(95)
+            if self.hedge_requests and hedge_delay is not None:
+                data = await hedged(loader, delay=max(hedge_delay, 0.05), timeout=timeout)
+            else:
+                data = await asyncio.wait_for(loader(), timeout)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                # A timed-out attempt took at least the timeout; without the sample the timeout
+                # could never grow past a source that has become permanently slower
+                latency.record(timeout)
+            breaker.record_failure()
+            logging.warning(f"Fetching {endpoint} failed ({type(e).__name__}: {e}), breaker {breaker.state}")
+            if snapshot is not None:
+                return snapshot['data']
+            raise
+
+        latency.record(time.monotonic() - started)
+        breaker.record_success()
+        self.snapshots[endpoint] = {'data': data, 'fetched_at': datetime.now()}
+        return data
+
+    def endpoint_status(self):
+        """Breaker state, latency percentiles and snapshot age per endpoint"""
+        status = {}
+        for endpoint, breaker in self.breakers.items():
+            latency = self.latencies[endpoint]
+            snapshot = self.snapshots.get(endpoint)
+            status[endpoint] = {
+                'state': breaker.state,
+                'p50': latency.percentile(50),
+                'p95': latency.percentile(95),
+                'timeout': latency.adaptive_timeout(),
+                'snapshot_age': (datetime.now() - snapshot['fetched_at']).total_seconds() if snapshot else None,
+            }
+        return status
+
+    async def refresh_endpoint(self, endpoint):
+        """Fetch one endpoint now, closing its breaker first; the core datasets trigger a full refresh.
+
+        New data of the endpoint becomes a new data version, so that everything cached per
+        version (screens, inline answers, charts, exports, readers of the snapshot) moves on."""
+        if endpoint not in ENDPOINTS:
+            raise KeyError(endpoint)
+        if endpoint in CORE_ENDPOINTS:
+            await self.refresh()
+            return
+        async with self._refresh_lock:
+            self.breakers[endpoint] = CircuitBreaker()
+            previous = self.snapshots.get(endpoint)
+            await self._fetch(endpoint, getattr(self, f'_load_{endpoint}'))
+            if self.snapshots.get(endpoint) is previous:
+                return
+            # Topics come from the core datasets, which did not change: carry them to the new version
+            await self.topic_model.wait()
+            current_topics = self.topic_model.version == self.data_version
+            self.data_version += 1
+            if current_topics:
+                self.topic_model.load({**self.topic_model.state(), 'version': self.data_version})
+            self.refreshed_at = datetime.now()
+            logging.info(f"Refreshed {endpoint} as data v{self.data_version}")
+
+    async def _dataset(self, endpoint):
+        """Data of an endpoint as of the last refresh, or None if it has never been fetched"""
+        await self.ensure_ready()
+        snapshot = self.snapshots.get(endpoint)
+        return snapshot['data'] if snapshot is not None else None
+
+    async def get_channel_index(self):
+        """Return the channel index, building it on first use"""
+        await self.ensure_ready()
+        return self.channel_index
+
+    async def search_channels(self, query, limit=10):
+        """Find channels by name or username prefix/substring"""
+        await self.ensure_ready()
+        await self.search_index.ready()
+        return self.search_index.search(query, limit=limit)
+
+    async def get_channel(self, username):
+        """Return a channel by exact username, or None if it is unknown"""
+        await self.ensure_ready()
+        await self.search_index.ready()
+        return self.search_index.get(username)
+
+    async def get_competitors(self, username, k=5):
+        """Find the channels most similar to the given one by category, size, ERR, growth and frequency"""
+        await self.ensure_ready()
+        return self.competitor_engine.find(username, k=k)
+
+    async def get_posting_windows(self, niche):
+        """Return precomputed best posting windows of a niche, or None without enough posts"""
+        await self.ensure_ready()
+        return self.posting_times.best_windows(niche)
+
+    async def get_content_topics(self, niche):
+        """Return keywords, themes and top topics of a niche from the topic model"""
+        await self.ensure_ready()
+        return await self.topic_model.get(niche)
         
     async def get_top_channels(self):
+        """Return top 20 channels of the current data version"""
+        return await self._dataset('top_channels')
+
+    async def _load_top_channels(self):
         """Return mock data for top 20 channels"""
-        logging.info("Returning mock data for top 20 channels")
+        logging.info("Returning mock data for top 20 channels", extra={'sample_every': MOCK_LOG_SAMPLE})
         
         # Sample channel data with extensive metrics
         channels = [
@@ -326,13 +672,19 @@ class TelegramAnalytics:
         return channels
             
     async def get_best_posts(self):
+        """Return best posts of the day of the current data version"""
+        return await self._dataset('best_posts')
+
+    async def _load_best_posts(self):
         """Return mock data for best posts"""
-        logging.info("Returning mock data for best posts")
+        logging.info("Returning mock data for best posts", extra={'sample_every': MOCK_LOG_SAMPLE})
         
         posts = [
             {
                 'channel': 'IT and Programming',
                 'channel_size': '450K subscribers',
+                'category': 'Технологии',
+                'format': 'Текст + фото',
                 'topic': 'Новые технологии в AI',
                 'views': '245,600',
                 'forwards': '12,340',
@@ -347,6 +699,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Business Daily',
                 'channel_size': '820K subscribers',
+                'category': 'Бизнес',
+                'format': 'Текст + графики',
                 'topic': 'Финансовая аналитика',
                 'views': '196,800',
                 'forwards': '8,970',
@@ -361,6 +715,8 @@ class TelegramAnalytics:
             {
                 'channel': 'World News',
                 'channel_size': '1.2M subscribers',
+                'category': 'Новости',
+                'format': 'Текст + фото',
                 'topic': 'Международные новости',
                 'views': '732,150',
                 'forwards': '23,456',
@@ -375,6 +731,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Tech Reviews',
                 'channel_size': '390K subscribers',
+                'category': 'Технологии',
+                'format': 'Видео',
                 'topic': 'Обзор iPhone 16',
                 'views': '184,700',
                 'forwards': '7,820',
@@ -389,6 +747,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Crypto News',
                 'channel_size': '570K subscribers',
+                'category': 'Криптовалюты',
+                'format': 'Текст + графики',
                 'topic': 'Анализ рынка криптовалют',
                 'views': '218,500',
                 'forwards': '9,760',
@@ -403,6 +763,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Health & Wellness',
                 'channel_size': '630K subscribers',
+                'category': 'Здоровье',
+                'format': 'Инфографика',
                 'topic': 'Новое исследование о питании',
                 'views': '165,300',
                 'forwards': '6,450',
@@ -417,6 +779,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Science Today',
                 'channel_size': '420K subscribers',
+                'category': 'Наука',
+                'format': 'Текст + фото',
                 'topic': 'Новое открытие в физике',
                 'views': '142,800',
                 'forwards': '5,930',
@@ -431,6 +795,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Travel Experiences',
                 'channel_size': '480K subscribers',
+                'category': 'Путешествия',
+                'format': 'Фото',
                 'topic': 'Скрытые места для отдыха',
                 'views': '154,600',
                 'forwards': '6,230',
@@ -445,6 +811,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Movie Reviews',
                 'channel_size': '350K subscribers',
+                'category': 'Развлечения',
+                'format': 'Видео',
                 'topic': 'Анализ нового фильма',
                 'views': '128,700',
                 'forwards': '4,890',
@@ -459,6 +827,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Fashion Trends',
                 'channel_size': '510K subscribers',
+                'category': 'Мода',
+                'format': 'Фото',
                 'topic': 'Тренды сезона',
                 'views': '175,400',
                 'forwards': '7,340',
@@ -473,6 +843,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Gaming News',
                 'channel_size': '680K subscribers',
+                'category': 'Развлечения',
+                'format': 'Видео',
                 'topic': 'Анонс новой игры',
                 'views': '312,500',
                 'forwards': '15,670',
@@ -487,6 +859,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Education Hub',
                 'channel_size': '290K subscribers',
+                'category': 'Образование',
+                'format': 'Инфографика',
                 'topic': 'Новые методы обучения',
                 'views': '98,700',
                 'forwards': '3,450',
@@ -501,6 +875,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Space Exploration',
                 'channel_size': '340K subscribers',
+                'category': 'Наука',
+                'format': 'Фото',
                 'topic': 'Новости с Марса',
                 'views': '145,800',
                 'forwards': '6,120',
@@ -515,6 +891,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Psychology Insights',
                 'channel_size': '380K subscribers',
+                'category': 'Психология',
+                'format': 'Текст',
                 'topic': 'Исследование поведения',
                 'views': '124,600',
                 'forwards': '4,950',
@@ -529,6 +907,8 @@ class TelegramAnalytics:
             {
                 'channel': 'Economic Analysis',
                 'channel_size': '520K subscribers',
+                'category': 'Финансы',
+                'format': 'Текст + графики',
                 'topic': 'Экономический прогноз',
                 'views': '187,300',
                 'forwards': '8,340',
@@ -545,8 +925,12 @@ class TelegramAnalytics:
         return posts
             
     async def get_niche_analysis(self):
+        """Return niche analysis of the current data version"""
+        return await self._dataset('niche_analysis')
+
+    async def _load_niche_analysis(self):
         """Return mock data for niche analysis"""
-        logging.info("Returning mock data for niche analysis")
+        logging.info("Returning mock data for niche analysis", extra={'sample_every': MOCK_LOG_SAMPLE})
         
         niches = {
             'Технологии и IT': {
@@ -664,10 +1048,26 @@ class TelegramAnalytics:
         return niches
             
     async def get_current_trends(self):
+        """Return current trends from the post stream, falling back to source data"""
+        trends = await self._dataset('current_trends')
+        if trends is None:
+            return None
+        trends = dict(trends)
+        
+        top_topics = self.topic_trends.top(5)
+        if len(top_topics) >= 2:
+            trends['top_topics'] = top_topics
+        growing_formats = self.format_trends.top(5)
+        if len(growing_formats) >= 2:
+            trends['growing_formats'] = [{'format': row['name'], 'growth': row['growth']} for row in growing_formats]
+        
+        return trends
+
+    async def _load_current_trends(self):
         """Return mock data for current trends"""
-        logging.info("Returning mock data for current trends")
+        logging.info("Returning mock data for current trends", extra={'sample_every': MOCK_LOG_SAMPLE})
         
-        # Sample trends data
+        # Sample trends data, used until the post stream provides enough topics
         trends = {
             'top_topics': [
                 {'name': 'Искусственный интеллект', 'growth': '+210%', 'posts_count': 1240},
@@ -694,11 +1094,23 @@ class TelegramAnalytics:
         
         return trends
         
+    def ingest_channels(self, channels, seed=False):
+        """Feed channel sightings into the new-channel discovery pipeline; returns the number of new channels"""
+        return self.discovery.observe(channels, seed=seed)
+
     async def get_new_channels_stats(self):
+        """Return new channel statistics from discovery, falling back to source data"""
+        await self.ensure_ready()
+        stats = self.discovery.stats()
+        if stats['total_created_24h']:
+            return stats
+        return await self._dataset('new_channels_stats')
+
+    async def _load_new_channels_stats(self):
         """Return mock data for new channels statistics"""
-        logging.info("Returning mock data for new channels statistics")
+        logging.info("Returning mock data for new channels statistics", extra={'sample_every': MOCK_LOG_SAMPLE})
         
-        # Sample new channels statistics
+        # Sample new channels statistics, used until discovery has seen new channels
         new_channels = {
             'total_created_24h': 1240,
             'by_category': [
@@ -710,16 +1122,25 @@ class TelegramAnalytics:
                 {'category': 'Здоровье', 'count': 98, 'share': '7.9%'},
                 {'category': 'Другие', 'count': 127, 'share': '10.2%'}
             ],
-            'growth_rate': '+15.3%',
+            'growth_rate': 15.3,
             'avg_initial_posts': 3.5,
-            'avg_growth_first_week': '+127 подписчиков',
-            'survival_rate': '43%'  # Процент каналов, продолжающих публикации после первой недели
+            'avg_growth_first_week': 127,
+            'survival_rate': 43  # Процент каналов, продолжающих публикации после первой недели
         }
         
         return new_channels
             
-    async def close(self):
-        """Close the session if it exists"""
+    async def close(self, timeout=10):
+        """Drain in-flight fetches and close the session if it exists"""
+        try:
+            # Wait for a running refresh to finish instead of cutting it off
+            await asyncio.wait_for(self._refresh_lock.acquire(), timeout)
+            self._refresh_lock.release()
+        except asyncio.TimeoutError:
+            logging.warning(f"Refresh still running after {timeout}s, closing anyway")
+        await self.search_index.wait(timeout)
+        await self.topic_model.wait(timeout)
+        self.topic_model.close()
         if self.session:
             await self.session.close()
             self.session = None 
\ No newline at end of file
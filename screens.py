@@ -0,0 +1,36 @@
+class ScreenCache:
+    """Rendered screen texts, each valid for the data version it was rendered from"""
+
+    def __init__(self):
+        self._screens = {}      # (screen, locale) -> (version, text)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Return the cached text of a screen, or None if it is missing or stale"""
+        entry = self._screens.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, text):
+        self._screens[key] = (version, text)
+
+    def dump(self):
+        """Cached screens in a JSON-serializable form"""
+        return [[list(key), version, text] for key, (version, text) in self._screens.items()]
+
+    def load(self, screens):
+        """Add screens produced by dump()"""
+        for key, version, text in screens:
+            self._screens[tuple(key)] = (version, text)
+
+    def invalidate(self, screen=None):
+        """Drop the cached texts of one screen in every locale, or of all screens"""
+        for key in [key for key in self._screens if screen is None or key[0] == screen]:
+            del self._screens[key]
+
+    def __len__(self):
+        return len(self._screens)
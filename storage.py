@@ -0,0 +1,86 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime
+
+import codec
+
+MAGIC = b'TGAS'
+FORMAT_VERSION = 2
+
+# magic, format version, directory length
+_HEADER = struct.Struct('<4sHI')
+
+
+class SnapshotStore:
+    """Persists datasets and rendered screens to a single local file.
+
+    The file is a fixed header, a JSON directory of sections and the
+    section payloads in the compact codec format. It is written to a
+    temporary file that atomically replaces the previous snapshot, so a
+    crash never leaves a torn file, and read through mmap so that only the
+    sections themselves are copied out of the page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, version, sections):
+        """Write {name: JSON-like value} sections for a data version"""
+        payloads = []
+        directory = {'version': version, 'saved_at': datetime.now().isoformat(), 'sections': {}}
+        offset = 0
+        for name, value in sections.items():
+            payload = codec.encode(value)
+            directory['sections'][name] = {'offset': offset, 'length': len(payload)}
+            payloads.append(payload)
+            offset += len(payload)
+        directory_bytes = json.dumps(directory, separators=(',', ':')).encode('utf-8')
+
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.snapshot-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(directory_bytes)))
+                f.write(directory_bytes)
+                for payload in payloads:
+                    f.write(payload)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logging.info(f"Snapshot v{version} saved to {self.path} ({_HEADER.size + len(directory_bytes) + offset} bytes)")
+
+    def stamp(self):
+        """Identity of the current snapshot file; changes whenever a new snapshot replaces it"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """Return {'version', 'saved_at', 'sections'} from the snapshot file, or None if it is missing or unreadable"""
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, format_version, directory_length = _HEADER.unpack_from(data)
+                if magic != MAGIC or format_version != FORMAT_VERSION:
+                    logging.warning(f"Ignoring snapshot {self.path} with unsupported format")
+                    return None
+                directory = json.loads(data[_HEADER.size:_HEADER.size + directory_length])
+                base = _HEADER.size + directory_length
+                sections = {
+                    name: codec.decode(data[base + entry['offset']:base + entry['offset'] + entry['length']])
+                    for name, entry in directory['sections'].items()
+                }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, IndexError, struct.error) as e:
+            logging.warning(f"Could not read snapshot {self.path}: {e}")
+            return None
+        return {'version': directory['version'], 'saved_at': directory['saved_at'], 'sections': sections}
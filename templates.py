@@ -0,0 +1,71 @@
+import keyword
+import logging
+from string import Formatter
+
+DEFAULT_LOCALE = 'ru'
+
+_CONVERSIONS = {'s': 'str', 'r': 'repr', 'a': 'ascii'}
+
+
+def template_fields(text):
+    """Names of the fields used by a str.format-style template"""
+    return {field for _, field, _, _ in Formatter().parse(text) if field is not None}
+
+
+def compile_template(text):
+    """Compile a str.format-style template into a function of a dict of values.
+
+    Only plain field names are allowed, e.g. '{name}' or '{score:,.0f}'.
+    The template is parsed once here; rendering is a single join without
+    any parsing.
+    """
+    pieces = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        if literal:
+            pieces.append(repr(literal))
+        if field is None:
+            continue
+        if not field.isidentifier() or keyword.iskeyword(field) or '{' in (spec or ''):
+            raise ValueError(f"Unsupported template field {{{field}}} in {text!r}")
+        expression = f"values[{field!r}]"
+        if conversion:
+            expression = f"{_CONVERSIONS[conversion]}({expression})"
+        pieces.append(f"format({expression}, {spec!r})")
+
+    namespace = {}
+    exec(f"def render(values):\n    return ''.join([{', '.join(pieces)}])", namespace)
+    return namespace['render']
+
+
+class Locale:
+    """Compiled templates of one language: tr('screen.key', field=value)"""
+
+    def __init__(self, code, templates):
+        self.code = code
+        self._renderers = {key: compile_template(text) for key, text in templates.items()}
+
+    def __call__(self, key, /, **values):
+        return self._renderers[key](values)
+
+
+class TemplateEngine:
+    """Per-locale screen templates, compiled once at startup"""
+
+    def __init__(self, templates, default=DEFAULT_LOCALE):
+        base = templates[default]
+        self.default = default
+        self.locales = {}
+        for code, texts in templates.items():
+            for key in texts.keys() & base.keys():
+                if template_fields(texts[key]) != template_fields(base[key]):
+                    raise ValueError(f"Template {code}:{key} uses other fields than {default}:{key}")
+            missing = base.keys() - texts.keys()
+            if missing:
+                logging.warning(f"Locale {code} falls back to {default} for {len(missing)} templates")
+            self.locales[code] = Locale(code, {**base, **texts})
+        logging.info(f"Compiled templates for locales: {', '.join(self.locales)}")
+
+    def locale(self, language_code=None):
+        """Pick the locale for a Telegram language_code like 'en' or 'en-US'"""
+        code = (language_code or '').split('-')[0].lower()
+        return self.locales.get(code, self.locales[self.default])
@@ -0,0 +1,16 @@
+import pytest
+
+import bot
+from screens import ScreenCache
+
+
+@pytest.fixture
+async def analytics(monkeypatch):
+    """A warmed-up mock TelegramAnalytics installed as the bot's instance, with empty caches"""
+    instance = bot.TelegramAnalytics()
+    await instance.start()
+    monkeypatch.setattr(bot, 'analytics', instance)
+    monkeypatch.setattr(bot, 'screen_cache', ScreenCache())
+    bot.inline_memo.clear()
+    yield instance
+    await instance.close()
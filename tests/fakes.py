@@ -0,0 +1,98 @@
+"""A minimal fake of the Bot API objects the handlers use; every call is recorded in a shared list"""
+
+import asyncio
+import itertools
+
+_message_ids = itertools.count(1)
+
+
+class FakeUser:
+    def __init__(self, user_id, language_code='ru'):
+        self.id = user_id
+        self.language_code = language_code
+
+
+class FakeChat:
+    def __init__(self, chat_id):
+        self.id = chat_id
+
+
+class FakePhotoSize:
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+
+class FakeMessage:
+    def __init__(self, calls, chat_id, text=None, photo=()):
+        self.calls = calls
+        self.chat = FakeChat(chat_id)
+        self.message_id = next(_message_ids)
+        self.text = text
+        self.photo = list(photo)
+
+    async def edit_text(self, text, reply_markup=None, **kwargs):
+        await asyncio.sleep(0)  # a network round trip: let concurrent handlers interleave
+        self.calls.append(('edit', self.chat.id, text, reply_markup))
+        return self
+
+    async def reply_text(self, text, reply_markup=None, **kwargs):
+        await asyncio.sleep(0)
+        self.calls.append(('reply', self.chat.id, text, reply_markup))
+        return FakeMessage(self.calls, self.chat.id, text)
+
+    async def reply_photo(self, photo, caption=None, **kwargs):
+        """Uploaded bytes get a new file_id, a file_id is sent as is"""
+        await asyncio.sleep(0)
+        self.calls.append(('photo', self.chat.id, photo, caption))
+        file_id = photo if isinstance(photo, str) else f"file-{next(_message_ids)}"
+        return FakeMessage(self.calls, self.chat.id, photo=[FakePhotoSize(file_id)])
+
+
+class FakeCallbackQuery:
+    def __init__(self, calls, data, user, message):
+        self.calls = calls
+        self.data = data
+        self.from_user = user
+        self.message = message
+
+    async def answer(self, *args, **kwargs):
+        self.calls.append(('answer', self.message.chat.id, self.data, None))
+
+
+class FakeInlineQuery:
+    def __init__(self, calls, query, user):
+        self.calls = calls
+        self.query = query
+        self.from_user = user
+
+    async def answer(self, results, cache_time=None, is_personal=None, **kwargs):
+        self.calls.append(('inline', self.from_user.id, results, {'cache_time': cache_time, 'is_personal': is_personal}))
+
+
+class FakeUpdate:
+    def __init__(self, user, callback_query=None, message=None, inline_query=None):
+        self.effective_user = user
+        self.effective_chat = FakeChat(user.id)
+        self.callback_query = callback_query
+        self.message = message
+        self.inline_query = inline_query
+
+
+class FakeContext:
+    def __init__(self, user_data=None, args=None):
+        self.user_data = {} if user_data is None else user_data
+        self.args = args or []
+
+
+def callback(calls, user, data):
+    """An update for a press of an inline button with `data` under a bot message in the user's chat"""
+    message = FakeMessage(calls, user.id)
+    return FakeUpdate(user, callback_query=FakeCallbackQuery(calls, data, user, message))
+
+
+def command(calls, user, text):
+    return FakeUpdate(user, message=FakeMessage(calls, user.id, text))
+
+
+def inline(calls, user, query):
+    return FakeUpdate(user, inline_query=FakeInlineQuery(calls, query, user))
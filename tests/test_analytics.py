@@ -0,0 +1,83 @@
+import pytest
+
+from scraper import ENDPOINTS, TelegramAnalytics
+
+
+def count_loads(monkeypatch):
+    calls = []
+    for endpoint in ENDPOINTS:
+        loader = getattr(TelegramAnalytics, f'_load_{endpoint}')
+
+        async def counted(self, loader=loader, endpoint=endpoint):
+            calls.append(endpoint)
+            return await loader(self)
+        monkeypatch.setattr(TelegramAnalytics, f'_load_{endpoint}', counted)
+    return calls
+
+
+async def serve_every_dataset(analytics):
+    await analytics.get_top_channels()
+    await analytics.get_best_posts()
+    await analytics.get_niche_analysis()
+    await analytics.get_current_trends()
+    await analytics.get_new_channels_stats()
+
+
+async def test_getters_serve_the_last_refresh(monkeypatch):
+    calls = count_loads(monkeypatch)
+    analytics = TelegramAnalytics()
+    await analytics.start()
+    assert sorted(calls) == sorted(ENDPOINTS)
+
+    for _ in range(3):
+        await serve_every_dataset(analytics)
+    assert len(calls) == len(ENDPOINTS)
+    await analytics.close()
+
+
+async def test_restored_reader_never_calls_the_source(monkeypatch):
+    refresher = TelegramAnalytics()
+    await refresher.start()
+    state = refresher.export_state()
+    await refresher.close()
+
+    calls = count_loads(monkeypatch)
+    reader = TelegramAnalytics()
+    assert reader.restore(state)
+    await reader.start(refresh=False)
+    await serve_every_dataset(reader)
+    assert await reader.get_niche_analysis() == state['datasets']['niche_analysis']['data']
+    assert calls == []
+    await reader.close()
+
+
+async def test_only_known_endpoints_can_be_refreshed(monkeypatch):
+    calls = count_loads(monkeypatch)
+    analytics = TelegramAnalytics()
+    await analytics.start()
+    for name in ('datasets', 'unknown'):
+        with pytest.raises(KeyError):
+            await analytics.refresh_endpoint(name)
+    assert 'datasets' not in analytics.snapshots and 'datasets' not in analytics.breakers
+
+    await analytics.refresh_endpoint('niche_analysis')
+    assert calls.count('niche_analysis') == 2
+    await analytics.close()
+
+
+async def test_endpoint_refresh_publishes_a_new_version(monkeypatch):
+    analytics = TelegramAnalytics()
+    await analytics.start()
+    version = analytics.data_version
+    await analytics.refresh_endpoint('current_trends')
+    assert analytics.data_version == analytics.topic_model.version == version + 1
+    assert analytics.export_state()['version'] == version + 1
+
+    async def failing(self):
+        raise ConnectionError('source is down')
+
+    # A failed fetch keeps serving the last snapshot under the same version
+    monkeypatch.setattr(TelegramAnalytics, '_load_current_trends', failing)
+    await analytics.refresh_endpoint('current_trends')
+    assert analytics.data_version == version + 1
+    await analytics.close()
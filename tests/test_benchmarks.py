@@ -0,0 +1,44 @@
+import os
+import statistics
+import time
+
+import pytest
+
+import bot
+from screens import ScreenCache
+
+pytestmark = pytest.mark.benchmark
+
+# Budgets are medians with ample headroom over a laptop; slower CI machines can scale them
+FACTOR = float(os.getenv('BENCH_FACTOR', '1'))
+UNCACHED_BUDGET = 0.005 * FACTOR
+CACHED_BUDGET = 0.00005 * FACTOR
+ROUNDS = 30
+
+
+async def median_time(call, rounds=ROUNDS):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+@pytest.mark.parametrize('locale', ['ru', 'en'])
+@pytest.mark.parametrize('screen', list(bot.SCREENS))
+async def test_uncached_render(analytics, screen, locale):
+    tr = bot.templates.locale(locale)
+    await bot.SCREENS[screen](analytics, tr)  # warm up the indexes a screen builds lazily
+    elapsed = await median_time(lambda: bot.SCREENS[screen](analytics, tr))
+    assert elapsed <= UNCACHED_BUDGET, f"{screen}/{locale}: {elapsed * 1000:.2f} ms"
+
+
+@pytest.mark.parametrize('locale', ['ru', 'en'])
+async def test_cached_render(analytics, locale, monkeypatch):
+    monkeypatch.setattr(bot, 'screen_cache', ScreenCache())
+    tr = bot.templates.locale(locale)
+    for screen in bot.SCREENS:
+        await bot.render_screen(analytics, screen, tr)
+        elapsed = await median_time(lambda: bot.render_screen(analytics, screen, tr), rounds=200)
+        assert elapsed <= CACHED_BUDGET, f"{screen}/{locale}: {elapsed * 1e6:.1f} µs"
@@ -0,0 +1,27 @@
+import pytest
+
+from charts import CHARTS, ChartRenderer
+
+pytest.importorskip('matplotlib')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.mark.parametrize('kind, args', [
+    ('shares', ('New channels', ['Tech', 'Крипта', 'News'], [12, 7, 3])),
+    ('grouped', ('Niches', ['IT', 'Бизнес'], {'Growth': [1.5, 2.0], 'ERR': [4.2, 3.1]})),
+])
+def test_charts_are_drawn_as_png(kind, args):
+    assert CHARTS[kind](*args).startswith(PNG_SIGNATURE)
+
+
+async def test_renderer_draws_in_a_worker_and_caches_the_image():
+    renderer = ChartRenderer(max_workers=1)
+    try:
+        args = ('New channels', ['Tech', 'News'], [5, 2])
+        png = await renderer.render(('new_channels', 'en'), '1.1', 'shares', *args)
+        assert png.startswith(PNG_SIGNATURE)
+        assert await renderer.render(('new_channels', 'en'), '1.1', 'shares', *args) is png
+        assert renderer.stats() == {'images': 1, 'uploaded': 0, 'rendering': 0}
+    finally:
+        renderer.close()
@@ -0,0 +1,58 @@
+import pytest
+from hypothesis import given, strategies as st
+
+import codec
+from utils import format_number
+
+scalars = st.one_of(
+    st.none(),
+    st.booleans(),
+    st.integers(min_value=-2**63, max_value=2**63 - 1),
+    st.floats(allow_nan=False),
+    st.text(max_size=30),
+)
+json_like = st.recursive(
+    scalars,
+    lambda children: st.one_of(
+        st.lists(children, max_size=6),
+        st.dictionaries(st.text(max_size=10), children, max_size=6),
+    ),
+    max_leaves=40,
+)
+
+# Dataset-like tables: same keys in every row, with the display numbers the datasets use
+display_numbers = st.one_of(
+    st.integers(min_value=0, max_value=10**9).map(format_number),
+    st.integers(min_value=0, max_value=10**6).map(lambda n: f"+{n:,}"),
+    st.integers(min_value=-10**6, max_value=-1).map(format_number),
+    st.sampled_from(['Высокая', 'Средняя', 'Низкая']),
+    st.text(max_size=12),
+)
+tables = st.integers(min_value=1, max_value=5).flatmap(
+    lambda width: st.lists(
+        st.fixed_dictionaries({f"column{i}": display_numbers for i in range(width)}),
+        min_size=2,
+        max_size=40,
+    )
+)
+
+
+@given(json_like)
+def test_values_round_trip(value):
+    assert codec.decode(codec.encode(value)) == value
+
+
+@given(tables)
+def test_tables_round_trip(rows):
+    assert codec.decode(codec.encode(rows)) == rows
+
+
+def test_truncated_buffer_is_rejected():
+    data = codec.encode({'rows': [{'a': '1,000'}, {'a': '2,000'}]})
+    with pytest.raises(codec.CodecError):
+        codec.decode(data[:len(data) // 2])
+
+
+def test_foreign_buffer_is_rejected():
+    with pytest.raises(codec.CodecError):
+        codec.decode(b'{"version": 1}')
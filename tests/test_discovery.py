@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from discovery import ChannelDiscovery
+
+START = datetime(2026, 1, 1)
+
+
+def sighting(username, subscribers):
+    return [{'username': username, 'subscribers': str(subscribers), 'category': 'Технологии'}]
+
+
+def test_first_week_growth_ignores_later_growth():
+    discovery = ChannelDiscovery(capacity=1000)
+    discovery.observe(sighting('known', 10), now=START, seed=True)
+    for day, subscribers in ((0, 100), (3, 250), (7, 400), (12, 5000)):
+        discovery.observe(sighting('fresh', subscribers), now=START + timedelta(days=day))
+
+    stats = discovery.stats(now=START + timedelta(days=12))
+    assert stats['survival_rate'] == 100
+    assert stats['avg_growth_first_week'] == 300
+
+
+def test_seeded_channels_are_not_new():
+    discovery = ChannelDiscovery(capacity=1000)
+    assert discovery.observe(sighting('known', 10), now=START, seed=True) == 0
+    assert discovery.observe(sighting('known', 20), now=START + timedelta(hours=1)) == 0
+    assert discovery.observe(sighting('fresh', 5), now=START + timedelta(hours=2)) == 1
+    assert discovery.stats(now=START + timedelta(hours=3))['total_created_24h'] == 1
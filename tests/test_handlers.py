@@ -0,0 +1,250 @@
+import asyncio
+
+from telegram.error import BadRequest
+
+import bot
+from charts import ChartRenderer
+from fakes import FakeCallbackQuery, FakeContext, FakeMessage, FakeUpdate, FakeUser, callback, inline
+from utils import TELEGRAM_MESSAGE_LIMIT, utf16_length
+
+
+def texts_for(calls, chat_id, kind='edit'):
+    return [text for call, chat, text, _ in calls if call == kind and chat == chat_id]
+
+
+async def test_concurrent_niche_flows_keep_user_data_apart(analytics):
+    calls = []
+    users = [FakeUser(1000 + i, 'ru' if i % 2 else 'en') for i in range(24)]
+    contexts = {user.id: FakeContext() for user in users}
+
+    async def flow(user, position):
+        context = contexts[user.id]
+        await bot.button_handler(callback(calls, user, 'niche_analysis'), context)
+        await bot.button_handler(callback(calls, user, f'niche_{position}'), context)
+
+    niches = await analytics.get_niche_analysis()
+    names = list(niches)
+    await asyncio.gather(*(flow(user, i % len(niches)) for i, user in enumerate(users)))
+
+    for i, user in enumerate(users):
+        context = contexts[user.id]
+        tr = bot.templates.locale(user.language_code)
+        niche_name = context.user_data['niches_list'][i % len(niches)]
+        title, details = texts_for(calls, user.id)[-2:]
+        assert title == tr('niche_analysis.title')
+        assert details.startswith(tr('niche.title', niche=niche_name, **niches[niche_name]))
+
+    # Changing one user's data leaves the other users and the shared dataset alone
+    first, second = (contexts[user.id].user_data for user in users[:2])
+    first['niches_list'].reverse()
+    first['niches_list'].append('Чужая ниша')
+    assert second['niches_list'] == names
+    assert list(await analytics.get_niche_analysis()) == names
+    assert set(second) == {'niches_list'}
+
+
+async def test_niche_details_without_a_list_is_not_found(analytics):
+    calls = []
+    for code in ('ru', 'en'):
+        user = FakeUser(2000, code)
+        await bot.button_handler(callback(calls, user, 'niche_0'), FakeContext())
+        tr = bot.templates.locale(code)
+        assert texts_for(calls, user.id)[-1] == tr('status.no_data', text=tr('niche.not_found'))
+
+
+async def test_concurrent_screens_are_rendered_in_each_users_locale(analytics):
+    calls = []
+    users = [FakeUser(3000 + i, ('ru', 'en')[i % 2]) for i in range(2 * len(bot.SCREENS))]
+    updates = [
+        (user, screen, callback(calls, user, screen))
+        for user in users for screen in bot.SCREENS
+    ]
+    await asyncio.gather(*(bot.button_handler(update, FakeContext()) for _, _, update in updates))
+
+    for user in users:
+        tr = bot.templates.locale(user.language_code)
+        texts = texts_for(calls, user.id)
+        for screen in bot.SCREENS:
+            expected = await bot.render_screen(analytics, screen, tr)
+            if utf16_length(expected) <= TELEGRAM_MESSAGE_LIMIT:
+                assert expected in texts, (user.language_code, screen)
+
+
+async def test_long_screens_are_split_under_the_utf16_limit(analytics, monkeypatch):
+    calls = []
+    text = '📊 ERR 4.75% | 👥 1,245,678\n' * 600
+
+    async def render_long(analytics_instance, tr):
+        return text
+
+    monkeypatch.setitem(bot.SCREENS, 'top_50', render_long)
+    user = FakeUser(4000, 'en')
+    await bot.button_handler(callback(calls, user, 'top_50'), FakeContext())
+
+    pages = texts_for(calls, user.id) + texts_for(calls, user.id, 'reply')
+    tr = bot.templates.locale('en')
+    assert pages[-1] == tr('menu.back_prompt')
+    assert ''.join(pages[:-1]) == text
+    assert all(utf16_length(page) <= TELEGRAM_MESSAGE_LIMIT for page in pages)
+
+
+async def test_inline_results_are_memoized_per_locale(analytics):
+    calls = []
+    ru, en = FakeUser(5000, 'ru'), FakeUser(5001, 'en')
+    await asyncio.gather(*(bot.inline_query(inline(calls, user, 'niche'), FakeContext()) for user in (ru, en, ru, en)))
+
+    answers = {}
+    for call, user_id, results, options in calls:
+        assert call == 'inline' and results
+        assert options['is_personal']
+        answers.setdefault(user_id, []).append(results)
+    # Each locale is answered from its own memo entry, and a repeated query reuses it
+    assert answers[ru.id][-1] is not answers[en.id][-1]
+    assert bot.inline_memo[(bot.screen_version(analytics), 'ru', 'niche')] is answers[ru.id][-1]
+    ru_text = answers[ru.id][-1][0].input_message_content.message_text
+    en_text = answers[en.id][-1][0].input_message_content.message_text
+    assert ru_text != en_text
+
+
+async def test_repeated_presses_run_the_handler_once(analytics):
+    calls = []
+    user = FakeUser(6000, 'ru')
+    message = FakeMessage(calls, user.id)
+    handler = bot.coalesced(bot.button_handler)
+    presses = [FakeUpdate(user, callback_query=FakeCallbackQuery(calls, 'trends', user, message)) for _ in range(5)]
+    await asyncio.gather(*(handler(update, FakeContext()) for update in presses))
+
+    assert [call[0] for call in calls].count('answer') == 5
+    assert texts_for(calls, user.id) == [await bot.render_screen(analytics, 'trends', bot.templates.locale('ru'))]
+    assert bot.repeated_presses['trends'] >= 4
+    assert not bot.pressed_callbacks
+
+
+async def test_going_back_right_after_a_screen_is_handled(analytics):
+    calls = []
+    user = FakeUser(6001, 'en')
+    message = FakeMessage(calls, user.id)
+    handler = bot.coalesced(bot.button_handler)
+    context = FakeContext()
+    for data in ('niche_analysis', 'niche_0', 'niche_analysis', 'back_to_menu', 'trends', 'back_to_menu'):
+        await handler(FakeUpdate(user, callback_query=FakeCallbackQuery(calls, data, user, message)), context)
+
+    tr = bot.templates.locale('en')
+    texts = texts_for(calls, user.id)
+    assert texts.count(tr('niche_analysis.title')) == 2
+    assert len(texts) == 6
+
+
+async def test_ready_screens_are_shown_with_one_edit(analytics):
+    calls = []
+    user = FakeUser(7000, 'en')
+    await bot.render_screen(analytics, 'trends', bot.templates.locale('en'))
+    await bot.button_handler(callback(calls, user, 'trends'), FakeContext())
+    assert texts_for(calls, user.id) == [await bot.render_screen(analytics, 'trends', bot.templates.locale('en'))]
+
+
+async def test_slow_screens_show_the_placeholder_first(analytics, monkeypatch):
+    calls = []
+
+    async def render_slow(analytics_instance, tr):
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    monkeypatch.setattr(bot, 'PLACEHOLDER_DELAY', 0.01)
+    monkeypatch.setitem(bot.SCREENS, 'top_news', render_slow)
+    user = FakeUser(7001, 'ru')
+    await bot.button_handler(callback(calls, user, 'top_news'), FakeContext())
+    tr = bot.templates.locale('ru')
+    assert texts_for(calls, user.id) == [tr('status.loading', text=tr('top_news.loading')), 'done']
+
+
+async def test_engine_statistics_are_rendered_in_the_users_locale(analytics, monkeypatch):
+    stats = {
+        'total_created_24h': 3,
+        'by_category': [{'category': 'Технологии', 'count': 3, 'share': '100.0%'}],
+        'growth_rate': None,
+        'avg_initial_posts': None,
+        'survival_rate': 50.0,
+        'avg_growth_first_week': None,
+    }
+    trends = {
+        'top_topics': [{'name': 'AI', 'growth': None, 'posts_count': 3}, {'name': 'Crypto', 'growth': '+50%', 'posts_count': 2}],
+        'growing_formats': [{'format': 'Video', 'growth': None}, {'format': 'Polls', 'growth': '+20%'}],
+        'audience_interests': [],
+    }
+
+    async def get_new_channels_stats():
+        return stats
+
+    async def get_current_trends():
+        return trends
+
+    monkeypatch.setattr(analytics, 'get_new_channels_stats', get_new_channels_stats)
+    monkeypatch.setattr(analytics, 'get_current_trends', get_current_trends)
+    en = bot.templates.locale('en')
+    new_channels = await bot.render_new_channels_stats(analytics, en)
+    assert 'н/д' not in new_channels and 'подписчиков' not in new_channels
+    assert '(growth n/a)' in new_channels and 'Survival: 50%' in new_channels
+    current_trends = await bot.render_current_trends(analytics, en)
+    assert 'новое' not in current_trends and 'Activity growth: new' in current_trends
+
+
+async def test_inline_niches_do_not_call_the_data_source(analytics, monkeypatch):
+    loads = []
+
+    async def load_niche_analysis():
+        loads.append(1)
+        return {}
+
+    monkeypatch.setattr(analytics, '_load_niche_analysis', load_niche_analysis)
+    calls = []
+    user = FakeUser(8000, 'en')
+    for query in ('niche', 'niche it', 'niche crypto'):
+        await bot.inline_query(inline(calls, user, query), FakeContext())
+    assert loads == []
+    assert calls[0][2]
+
+
+class FakeRenderer(ChartRenderer):
+    """Returns fixed bytes instead of drawing in worker processes, counting the renders"""
+
+    def __init__(self):
+        super().__init__()
+        self.renders = []
+
+    async def render(self, key, version, kind, *args):
+        self.renders.append((key, version))
+        return b'png'
+
+
+async def test_charts_are_uploaded_once_and_then_sent_by_file_id(analytics, monkeypatch):
+    renderer = FakeRenderer()
+    monkeypatch.setattr(bot, 'charts', renderer)
+    calls = []
+    user = FakeUser(9000, 'en')
+    for _ in range(3):
+        await bot.send_chart(callback(calls, user, 'chart_niche_growth'), FakeContext(), 'niche_growth')
+
+    photos = [photo for call, _, photo, _ in calls if call == 'photo']
+    assert photos[0] == b'png'
+    assert photos[1] == photos[2] == renderer.file_id(('niche_growth', 'en'), bot.screen_version(analytics))
+    assert len(renderer.renders) == 1
+
+    # A file_id Telegram no longer accepts is forgotten and the chart is uploaded again
+    async def rejected(self, photo, **kwargs):
+        if isinstance(photo, str):
+            raise BadRequest('Wrong file identifier')
+        return await original(self, photo, **kwargs)
+
+    original = FakeMessage.reply_photo
+    monkeypatch.setattr(FakeMessage, 'reply_photo', rejected)
+    await bot.send_chart(callback(calls, user, 'chart_niche_growth'), FakeContext(), 'niche_growth')
+    assert len(renderer.renders) == 2
+    assert calls[-1][:3] == ('photo', user.id, b'png')
+
+    # A new data version is drawn and uploaded again
+    monkeypatch.setattr(FakeMessage, 'reply_photo', original)
+    analytics.data_version += 1
+    await bot.send_chart(callback(calls, user, 'chart_niche_growth'), FakeContext(), 'niche_growth')
+    assert renderer.renders[-1] == (('niche_growth', 'en'), bot.screen_version(analytics))
+    assert len(renderer.renders) == 3
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from resilience import CircuitBreaker, LatencyTracker
+from scraper import TelegramAnalytics
+
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.allow()
+    breaker.record_failure()
+    return breaker
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = open_breaker()
+    breaker.reset_timeout = 30
+    breaker.opened_at -= 30
+    assert [breaker.allow() for _ in range(5)] == [True, False, False, False, False]
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again():
+    breaker = open_breaker()
+    breaker.reset_timeout = 30
+    breaker.opened_at -= 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_the_cool_down():
+    breaker = open_breaker()
+    assert breaker.allow()          # this probe never reports back
+    breaker.probe_started_at -= breaker.reset_timeout
+    assert breaker.allow()
+
+
+async def test_timeouts_let_the_adaptive_timeout_grow():
+    analytics = TelegramAnalytics()
+    tracker = analytics.latencies['slow'] = LatencyTracker()
+    analytics.breakers['slow'] = CircuitBreaker(failure_threshold=100)
+    for _ in range(50):
+        tracker.record(0.01)
+    first = tracker.adaptive_timeout()
+
+    async def slow_source():
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await analytics._fetch('slow', slow_source)
+    assert tracker.adaptive_timeout() > first
@@ -0,0 +1,57 @@
+import asyncio
+
+from hypothesis import given, strategies as st
+
+from search import ChannelSearchIndex, normalize
+
+words = st.sampled_from(['tech', 'news', 'crypto', 'daily', 'дизайн', 'новости', 'ai', 'te', 'ёж'])
+channel_lists = st.lists(
+    st.tuples(st.lists(words, min_size=1, max_size=3), st.integers(min_value=0, max_value=10**6)),
+    max_size=40,
+).map(lambda rows: [
+    {'name': ' '.join(name).title(), 'username': f"{'_'.join(name)}{i}", 'subscribers': str(subscribers)}
+    for i, (name, subscribers) in enumerate(rows)
+])
+
+
+def expected_results(channels, query, limit):
+    """Every matching channel ranked by a full scan: prefix matches first, then substrings, by subscribers"""
+    query = normalize(query)
+    ranked = sorted(channels, key=lambda channel: int(channel['subscribers']), reverse=True)
+    prefix, substring = [], []
+    for channel in ranked:
+        name, username = normalize(channel['name']), normalize(channel['username'])
+        if name.startswith(query) or username.startswith(query) or any(w.startswith(query) for w in name.split()):
+            prefix.append(channel)
+        elif len(query) >= 3 and (query in name or query in username):
+            substring.append(channel)
+    return (prefix + substring)[:limit]
+
+
+@given(channel_lists, st.sampled_from(['t', 'te', 'tec', 'ews', 'ch n', 'новост', 'ост', 'Ё', '@crypto', 'zz']))
+def test_search_matches_a_full_scan(channels, query):
+    index = ChannelSearchIndex()
+    index.update(channels)
+    assert index.search(query, limit=5) == expected_results(channels, query, 5)
+
+
+def test_update_drops_renamed_and_removed_channels():
+    index = ChannelSearchIndex()
+    index.update([
+        {'name': 'Tech Daily', 'username': 'techdaily', 'subscribers': '10'},
+        {'name': 'Crypto News', 'username': 'cryptonews', 'subscribers': '20'},
+    ])
+    index.update([{'name': 'Gadgets Daily', 'username': 'techdaily', 'subscribers': '10'}])
+    assert index.search('crypto') == []
+    assert [channel['name'] for channel in index.search('gadg')] == ['Gadgets Daily']
+    assert index.get('@techdaily')['name'] == 'Gadgets Daily'
+
+
+async def test_scheduled_rebuild_serves_the_previous_build_until_swapped():
+    index = ChannelSearchIndex()
+    index.update([{'name': 'Tech Daily', 'username': 'techdaily', 'subscribers': '10'}])
+    index.schedule([{'name': 'Crypto News', 'username': 'cryptonews', 'subscribers': '20'}])
+    assert index.get('techdaily') is not None
+    await index.wait()
+    assert index.get('techdaily') is None
+    assert [channel['username'] for channel in index.search('cry')] == ['cryptonews']
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+from aiohttp import web
+from hypothesis import given, strategies as st
+from telegram.request import RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from transport import BotRequest, PayloadCache
+
+values = st.text(max_size=600)
+
+
+@given(st.dictionaries(st.sampled_from(['chat_id', 'message_id', 'text', 'reply_markup']), values, min_size=1))
+def test_bodies_match_httpx_form_encoding(data):
+    payloads = PayloadCache(min_length=20)
+    expected = httpx.Request('POST', 'https://api.telegram.org', data=data).content
+    assert payloads.encode(data) == expected
+    assert payloads.encode(data) == expected  # and again from the cached parts
+
+
+def test_long_values_are_encoded_once_per_text():
+    payloads = PayloadCache(max_size=2)
+    screen = 'Топ каналов 📊\n' * 100
+    for chat_id in range(5):
+        payloads.encode({'chat_id': str(chat_id), 'text': screen})
+    assert (payloads.hits, payloads.misses) == (4, 1)
+
+    for version in range(3):
+        payloads.encode({'chat_id': '1', 'text': f"{screen}v{version}"})
+    assert len(payloads) == 2
+
+
+async def test_pool_wait_is_measured_when_connections_run_out():
+    async def slow_api(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({'ok': True, 'result': True})
+
+    app = web.Application()
+    app.router.add_post('/{method}', slow_api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    host, port = runner.addresses[0][:2]
+
+    request = BotRequest(connection_pool_size=2, pool_timeout=5)
+    await request.initialize()
+    data = RequestData([RequestParameter.from_input('chat_id', 1)])
+    try:
+        await asyncio.gather(*(request.post(f'http://{host}:{port}/sendMessage', data) for _ in range(6)))
+    finally:
+        await request.shutdown()
+        await runner.cleanup()
+
+    pool = request.metrics.summary()
+    assert pool['requests'] == 6 and pool['in_flight'] == 0 and pool['peak_in_flight'] == 6
+    # Two requests at a time: the last pair waits for two rounds of the slow API
+    assert pool['wait_p99'] >= 0.09
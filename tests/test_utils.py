@@ -0,0 +1,79 @@
+import pytest
+from hypothesis import given, strategies as st
+
+from utils import format_number, paginate, parse_number, parse_post_frequency, utf16_length
+
+# Cyrillic, emoji outside the BMP, joiners and newlines: the characters that make screen texts hard to split
+screen_text = st.lists(
+    st.one_of(
+        st.characters(codec='utf-8', exclude_categories=('Cs',)),
+        st.sampled_from(['\n', '📊', '👨\u200d💻', '🇷🇺', 'Ё', 'ж', ' ']),
+    ),
+    max_size=3000,
+).map(''.join)
+
+
+@given(st.integers(min_value=-10**15, max_value=10**15))
+def test_integers_round_trip_through_display_format(number):
+    assert parse_number(format_number(number)) == number
+
+
+@given(st.floats(min_value=-1e12, max_value=1e12, allow_nan=False))
+def test_floats_round_trip_to_two_decimals(number):
+    assert parse_number(format_number(number)) == pytest.approx(round(number, 2), abs=0.01)
+
+
+@given(st.integers(min_value=0, max_value=10**9), st.sampled_from(['+', '']), st.sampled_from(['', '%', ' подписчиков']))
+def test_parse_number_ignores_sign_and_units(number, sign, unit):
+    assert parse_number(f"{sign}{number:,}{unit}") == number
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('450K subscribers', 450_000),
+    ('1.2M', 1_200_000),
+    ('4.75', 4.75),
+    ('-', 0),
+    (None, 0),
+])
+def test_parse_number_examples(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3-5 в день', 4.0),
+    ('1-2 в неделю', 1.5 / 7),
+    ('10 в месяц', 10 / 30),
+    ('по настроению', 1.0),
+])
+def test_parse_post_frequency(text, expected):
+    assert parse_post_frequency(text) == pytest.approx(expected)
+
+
+@given(screen_text, st.integers(min_value=2, max_value=200))
+def test_pages_rebuild_the_text_and_fit_the_limit(text, limit):
+    pages = paginate(text, limit)
+    assert ''.join(pages) == text
+    assert all(utf16_length(page) <= limit for page in pages)
+    assert all(pages) or pages == ['']
+
+
+@given(st.lists(st.text(alphabet='абв📊 ', max_size=40), min_size=1, max_size=200))
+def test_pages_break_at_line_ends_when_lines_fit(lines):
+    text = '\n'.join(lines) + '\n'
+    pages = paginate(text, limit=100)
+    assert all(page.endswith('\n') for page in pages)
+
+
+def test_large_emoji_text_counts_utf16_units():
+    text = ('📊 ERR 4.75% | 👥 1,245,678\n' * 5000)
+    pages = paginate(text)
+    assert ''.join(pages) == text
+    assert all(utf16_length(page) <= 4096 for page in pages)
+    # Every page is filled with whole lines up to the limit
+    line = utf16_length('📊 ERR 4.75% | 👥 1,245,678\n')
+    assert all(utf16_length(page) > 4096 - line for page in pages[:-1])
+
+
+def test_short_text_is_one_page():
+    assert paginate('') == ['']
+    assert paginate('hello') == ['hello']
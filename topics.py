@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from utils import parse_number
+
+_WORD_RE = re.compile(r'[a-zа-яё][a-zа-яё0-9]+', re.IGNORECASE)
+
+STOPWORDS = {
+    'это', 'этот', 'эти', 'также', 'более', 'менее', 'после', 'перед', 'через', 'между', 'среди',
+    'когда', 'который', 'которые', 'которых', 'своих', 'свои', 'своей', 'всех', 'всего', 'очень',
+    'включая', 'новые', 'новый', 'новое', 'новой', 'новых', 'нового', 'главные', 'главных', 'ключевые',
+    'ключевым', 'последние', 'последних', 'подробный', 'подробности', 'подробное', 'описание', 'обзор',
+    'анализ', 'текущее', 'текущей', 'результаты', 'рекомендации', 'советы', 'области', 'различных',
+    'about', 'with', 'from', 'that', 'this', 'today', 'news', 'their',
+}
+
+
+def tokenize(text):
+    """Lowercase words of a text without stopwords and short tokens"""
+    return [word for word in (w.lower() for w in _WORD_RE.findall(text or '')) if len(word) >= 4 and word not in STOPWORDS]
+
+
+def _stem(word):
+    """Crude prefix stemming so that inflected forms of a word are counted together"""
+    return word[:6] if len(word) > 6 else word
+
+
+def extract_topics(posts_by_niche, top_n=8):
+    """Build per-niche keywords, co-occurring themes and top topics with TF-IDF.
+
+    Runs in a worker process: takes plain dicts and returns plain dicts.
+    Every niche is one document for IDF, terms are weighted by the
+    engagement of the posts they appear in.
+    """
+    term_weights = {}
+    surface_forms = Counter()
+    pair_counts = {}
+    document_frequency = Counter()
+
+    for niche, posts in posts_by_niche.items():
+        weights = Counter()
+        pairs = Counter()
+        for post in posts:
+            # Log-scaled views so that one viral post does not dominate the niche
+            weight = 1.0 + math.log1p(parse_number(post.get('views')))
+            stems = []
+            for word in tokenize(f"{post.get('topic', '')} {post.get('summary', '')}"):
+                stem = _stem(word)
+                surface_forms[(stem, word)] += 1
+                stems.append(stem)
+            for stem in set(stems):
+                weights[stem] += weight
+            for first, second in combinations(sorted(set(stems)), 2):
+                pairs[(first, second)] += 1
+        term_weights[niche] = weights
+        pair_counts[niche] = pairs
+        document_frequency.update(weights.keys())
+
+    display = {}
+    for (stem, word), count in surface_forms.most_common():
+        display.setdefault(stem, word)
+
+    niche_count = len(posts_by_niche)
+    result = {}
+    for niche, weights in term_weights.items():
+        scores = {
+            stem: weight * math.log((1 + niche_count) / (1 + document_frequency[stem])) + weight * 0.01
+            for stem, weight in weights.items()
+        }
+        keywords = sorted(scores, key=lambda stem: (-scores[stem], stem))[:top_n]
+        keyword_set = set(keywords)
+        themes = [
+            (display[first], display[second], count)
+            for (first, second), count in pair_counts[niche].most_common()
+            if first in keyword_set and second in keyword_set
+        ][:top_n // 2]
+        posts = sorted(posts_by_niche[niche], key=lambda post: parse_number(post.get('views')), reverse=True)
+        result[niche] = {
+            'keywords': [(display[stem], round(scores[stem], 2)) for stem in keywords],
+            'themes': themes,
+            'top_topics': [post.get('topic') for post in posts[:3] if post.get('topic')],
+            'posts': len(posts),
+        }
+    return result
+
+
+class TopicModel:
+    """Per-niche topic model rebuilt in a background process pool.
+
+    rebuild() ships the post records to a worker process and swaps in the
+    result when it is ready; handlers only read the cached per-niche
+    results.
+    """
+
+    def __init__(self, max_workers=1):
+        self.max_workers = max_workers
+        self.version = 0
+        self._executor = None
+        self._by_niche = {}
+        self._pending = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # The bot runs threads (log listener, HTTP client) whose locks a forked worker could copy
+            # while held; forkserver workers start from a clean single-threaded server instead
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('forkserver')
+            )
+        return self._executor
+
+    async def rebuild(self, posts_by_niche, version):
+        """Recompute topics off the event loop and publish them for the given data version"""
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), extract_topics, posts_by_niche)
+        except Exception as e:
+            logging.error(f"Topic extraction failed: {e}")
+            return
+        if version >= self.version:
+            self._by_niche = result
+            self.version = version
+            logging.info(f"Topic model v{version} ready for {len(result)} niches")
+
+    def schedule(self, posts_by_niche, version):
+        """Start a rebuild in the background without waiting for it"""
+        self._pending = asyncio.ensure_future(self.rebuild(posts_by_niche, version))
+        return self._pending
+
+    async def wait(self, timeout=None):
+        """Wait for the pending rebuild, if any"""
+        if self._pending is None or self._pending.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._pending), timeout)
+        except asyncio.TimeoutError:
+            logging.warning("Topic model rebuild is still running")
+
+    async def get(self, niche):
+        """Return cached topics of a niche, waiting only for the very first build"""
+        if not self._by_niche and self._pending is not None:
+            await asyncio.shield(self._pending)
+        return self._by_niche.get(niche)
+
+    def state(self):
+        """Current topics in a JSON-serializable form"""
+        return {'version': self.version, 'by_niche': self._by_niche}
+
+    def load(self, state):
+        """Publish topics produced by state(), unless a newer build is already in place"""
+        if state['version'] >= self.version:
+            self._by_niche = state['by_niche']
+            self.version = state['version']
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
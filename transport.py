@@ -0,0 +1,152 @@
+import logging
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import httpx
+from telegram.request import HTTPXRequest
+
+from resilience import LatencyTracker
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+# Parameter values at least this long (screen texts, keyboards) are encoded once and reused
+CACHED_VALUE_SIZE = 256
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+
+def _encode(name, value):
+    return urllib.parse.urlencode(((name, value),)).encode('ascii')
+
+
+class PayloadCache:
+    """Form-encoded `name=value` parts of long Bot API parameters, least recently used dropped first.
+
+    The same screen text and keyboard are sent to every chat that opens the screen, so only the
+    short per-send parameters (chat_id, message_id) are encoded again. Parts of an older data
+    version are simply no longer looked up and fall out of the cache."""
+
+    def __init__(self, max_size=512, min_length=CACHED_VALUE_SIZE):
+        self.max_size = max_size
+        self.min_length = min_length
+        self._parts = OrderedDict()     # (name, value) -> encoded part
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._parts)
+
+    def part(self, name, value):
+        if len(value) < self.min_length:
+            return _encode(name, value)
+        key = (name, value)
+        part = self._parts.get(key)
+        if part is None:
+            self.misses += 1
+            part = self._parts[key] = _encode(name, value)
+            if len(self._parts) > self.max_size:
+                self._parts.popitem(last=False)
+        else:
+            self.hits += 1
+            self._parts.move_to_end(key)
+        return part
+
+    def encode(self, data):
+        """The form body for a mapping of parameter names to string values, as httpx would encode it"""
+        return b'&'.join(self.part(name, value) for name, value in data.items())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'parts': len(self._parts),
+            'bytes': sum(len(part) for part in self._parts.values()),
+            'hit rate': f"{self.hits / lookups:.0%}" if lookups else '-',
+        }
+
+    def clear(self):
+        self._parts.clear()
+
+
+class PoolMetrics:
+    """Requests in flight and the time they wait for a pooled connection before being sent"""
+
+    # httpcore trace events that mark the end of the wait: a new connection or a request on a free one
+    SENT_EVENTS = ('connection.connect_tcp.started', 'http11.send_request_headers.started', 'http2.send_request_headers.started')
+
+    def __init__(self, window=1000):
+        self.wait = LatencyTracker(size=window)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+
+    def tracer(self):
+        """A trace extension for one request, recording how long it waited for the pool"""
+        started = time.perf_counter()
+        waiting = True
+
+        async def trace(event, info):
+            nonlocal waiting
+            if waiting and event in self.SENT_EVENTS:
+                waiting = False
+                self.wait.record(time.perf_counter() - started)
+        return trace
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'wait_p50': self.wait.percentile(50),
+            'wait_p95': self.wait.percentile(95),
+            'wait_p99': self.wait.percentile(99),
+        }
+
+
+class _PayloadClient(httpx.AsyncClient):
+    """httpx client that builds form bodies from a PayloadCache instead of encoding them per request,
+    and records its connection pool usage in PoolMetrics"""
+
+    def __init__(self, payloads, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.payloads = payloads
+        self.metrics = metrics
+
+    async def send(self, request, **kwargs):
+        metrics = self.metrics
+        request.extensions = {**request.extensions, 'trace': metrics.tracer()}
+        metrics.requests += 1
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        try:
+            return await super().send(request, **kwargs)
+        finally:
+            metrics.in_flight -= 1
+
+    def build_request(self, method, url, *, content=None, data=None, files=None, headers=None, **kwargs):
+        if content is None and data and not files and all(isinstance(value, str) for value in data.values()):
+            headers = {**(headers or {}), 'Content-Type': FORM_CONTENT_TYPE}
+            return super().build_request(method, url, content=self.payloads.encode(data), headers=headers, **kwargs)
+        return super().build_request(method, url, content=content, data=data, files=files, headers=headers, **kwargs)
+
+
+class BotRequest(HTTPXRequest):
+    """HTTPXRequest with cached encoding of repeated payloads and connection pool metrics.
+
+    HTTP/2 multiplexes all requests over one connection per host; it needs the optional h2
+    package and falls back to HTTP/1.1 with a warning without it."""
+
+    def __init__(self, payload_cache_size=512, http2=False, **kwargs):
+        # HTTPXRequest builds its client in __init__, so the cache and metrics have to exist first
+        self.payloads = PayloadCache(max_size=payload_cache_size)
+        self.metrics = PoolMetrics()
+        self.pool_size = kwargs.get('connection_pool_size', 1)
+        if http2 and h2 is None:
+            logging.warning("HTTP/2 for the Bot API needs the h2 package (pip install httpx[http2]), using HTTP/1.1")
+            http2 = False
+        super().__init__(http_version='2' if http2 else '1.1', **kwargs)
+
+    def _build_client(self):
+        return _PayloadClient(self.payloads, self.metrics, **self._client_kwargs)
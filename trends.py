@@ -0,0 +1,150 @@
+import hashlib
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch: estimates never undercount, memory does not depend on the number of keys"""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key):
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype='<u4') % self.width
+
+    def add(self, key, count=1):
+        self.table[self._rows, self._columns(key)] += count
+
+    def estimate(self, key):
+        return int(self.table[self._rows, self._columns(key)].min())
+
+    def merge(self, other, sign=1):
+        """Add (or subtract with sign=-1) another sketch of the same shape"""
+        if sign > 0:
+            self.table += other.table
+        else:
+            self.table -= other.table
+
+    def clear(self):
+        self.table.fill(0)
+
+
+class TrendEngine:
+    """Sliding-window mention counts with growth against the previous window.
+
+    The window is split into buckets, each with its own count-min sketch.
+    Running sums of the current and previous windows are kept up to date
+    as buckets rotate, so estimates for both windows are O(1). Only a
+    bounded set of candidate keys is remembered for ranking.
+    """
+
+    def __init__(self, window=timedelta(hours=24), buckets=24, width=2048, depth=4, capacity=256):
+        self.window = window
+        self.buckets = buckets
+        self.capacity = capacity
+        self._span = window.total_seconds() / buckets
+        self._width = width
+        self._depth = depth
+        self._history = deque()     # 2 * buckets sketches, oldest first
+        self._current = CountMinSketch(width, depth)
+        self._previous = CountMinSketch(width, depth)
+        self._head = None           # bucket number of the newest bucket
+        self._candidates = {}       # key -> None, bounded by capacity
+        self._top = None
+
+    def _bucket_number(self, timestamp):
+        return int(timestamp.timestamp() // self._span)
+
+    def _reset(self, head):
+        self._history = deque(CountMinSketch(self._width, self._depth) for _ in range(2 * self.buckets))
+        self._current.clear()
+        self._previous.clear()
+        self._head = head
+        self._top = None
+
+    def advance(self, now=None):
+        """Rotate buckets up to the given time"""
+        target = self._bucket_number(now or datetime.now())
+        if self._head is None or target - self._head >= 2 * self.buckets:
+            # Nothing recorded yet or both windows expired: start from scratch
+            self._reset(target)
+            return
+        if target <= self._head:
+            return
+
+        while self._head < target:
+            self._head += 1
+            self._history.append(CountMinSketch(self._width, self._depth))
+            # The bucket leaving the current window moves into the previous one
+            leaving = self._history[-self.buckets - 1]
+            self._current.merge(leaving, sign=-1)
+            self._previous.merge(leaving)
+            self._previous.merge(self._history.popleft(), sign=-1)
+        self._top = None
+
+    def observe(self, key, timestamp=None, count=1):
+        """Count one mention of a key at the given time"""
+        timestamp = timestamp or datetime.now()
+        number = self._bucket_number(timestamp)
+        if self._head is None or number > self._head:
+            self.advance(timestamp)
+
+        age = self._head - number
+        if age >= len(self._history):
+            return
+        self._history[-1 - age].add(key, count)
+        if age < self.buckets:
+            self._current.add(key, count)
+        else:
+            self._previous.add(key, count)
+
+        self._candidates[key] = None
+        if len(self._candidates) > self.capacity:
+            self._prune_candidates()
+        self._top = None
+
+    def _prune_candidates(self):
+        """Keep the half of the candidates with the most mentions in both windows"""
+        ranked = sorted(
+            self._candidates,
+            key=lambda key: self._current.estimate(key) + self._previous.estimate(key),
+            reverse=True
+        )
+        self._candidates = dict.fromkeys(ranked[:self.capacity // 2])
+
+    def top(self, n=5):
+        """Return the fastest growing keys of the current window"""
+        self.advance()
+        if self._top is None:
+            rows = []
+            for key in self._candidates:
+                current = self._current.estimate(key)
+                if current <= 0:
+                    continue
+                previous = self._previous.estimate(key)
+                rows.append({
+                    'name': key,
+                    'posts_count': current,
+                    'previous_count': previous,
+                    'growth': format_growth(current, previous),
+                })
+            rows.sort(key=lambda row: (row['posts_count'] - row['previous_count'], row['posts_count']), reverse=True)
+            self._top = rows
+        return self._top[:n]
+
+    def memory_bytes(self):
+        """Approximate memory used by the sketches"""
+        return (2 * self.buckets + 2) * self._width * self._depth * 8
+
+
+def format_growth(current, previous):
+    """Format window-over-window growth like '+210%', or None for a key that is new in this window"""
+    if previous <= 0:
+        return None
+    return f"{(current - previous) / previous * 100:+.0f}%"
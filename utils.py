@@ -0,0 +1,87 @@
+import re
+
+_NUMBER_RE = re.compile(r'[-+]?\d[\d,]*(?:\.\d+)?')
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_number(value, default=0):
+    """Parse display numbers like '1,245,678', '+956', '4.5%' or '450K subscribers'"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return value
+
+    text = str(value).strip()
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return default
+
+    raw = match.group(0).replace(',', '')
+    number = float(raw) if '.' in raw else int(raw)
+
+    suffix = text[match.end():match.end() + 1].lower()
+    if suffix in _SUFFIXES:
+        number = number * _SUFFIXES[suffix]
+        if isinstance(number, float) and number.is_integer():
+            number = int(number)
+    return number
+
+
+def format_number(value):
+    """Format a number the way the datasets display it, e.g. 1245678 -> '1,245,678'"""
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:,.2f}"
+    return f"{int(value):,}"
+
+
+_FREQUENCY_RE = re.compile(r'(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*в\s*(день|неделю|месяц)')
+_FREQUENCY_PERIOD_DAYS = {'день': 1, 'неделю': 7, 'месяц': 30}
+
+
+def parse_post_frequency(value, default=1.0):
+    """Convert a frequency like '3-5 в день' or '1-2 в неделю' to posts per day"""
+    match = _FREQUENCY_RE.search(str(value or ''))
+    if not match:
+        return default
+    low = float(match.group(1))
+    high = float(match.group(2) or low)
+    return (low + high) / 2 / _FREQUENCY_PERIOD_DAYS[match.group(3)]
+
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def utf16_length(text):
+    """Length of a text the way Telegram counts it: in UTF-16 code units, so most emoji count twice"""
+    return len(text) if text.isascii() else len(text.encode('utf-16-le')) // 2
+
+
+def paginate(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Split a text into messages of at most `limit` UTF-16 code units.
+
+    Pages break after a newline where possible; a single line longer than
+    the limit is split between characters. Joining the pages gives the
+    original text back.
+    """
+    pages = []
+    current = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        length = utf16_length(line)
+        if size + length > limit and current:
+            pages.append(''.join(current))
+            current, size = [], 0
+        if length <= limit:
+            current.append(line)
+            size += length
+            continue
+        for char in line:
+            width = 2 if ord(char) > 0xFFFF else 1
+            if size + width > limit and current:
+                pages.append(''.join(current))
+                current, size = [], 0
+            current.append(char)
+            size += width
+    if current or not pages:
+        pages.append(''.join(current))
+    return pages